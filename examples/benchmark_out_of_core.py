@@ -0,0 +1,60 @@
+# benchmark_out_of_core.py
+# Peak resident memory added by the MaRiQ and tornado analyses of a saved run,
+# read into memory or memory-mapped and processed block by block.
+#
+# A run is simulated and saved once, then every mode is analysed in a fresh
+# process so that its peak RSS is its own.
+#
+#   python examples/benchmark_out_of_core.py [data_file] [iterations]
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from QRALib.api import SimulationResults, simulate
+from QRALib.analysis.mariq import MaRiQAnalysis
+from QRALib.analysis.tornado import TornadoAnalysis
+from QRALib.utils.importer import RiskDataImporter
+
+TOLERANCE = ([0, 600_000, 1_000_000, 1_500_000], [100, 90, 50, 20])
+
+
+def peak_rss_mb():
+    # the high-water mark of this process image (ru_maxrss survives exec)
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+
+
+def analyse(path, mmap):
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    sim = SimulationResults.load(path, mmap=mmap)
+    mariq = MaRiQAnalysis(sim, TOLERANCE)
+    total, single = mariq.compute_total(), mariq.compute_single()
+    tornado = TornadoAnalysis(sim).compute_variation("total")
+    elapsed = time.perf_counter() - t0
+    peak = peak_rss_mb() - baseline
+    digest = float(total["exceedance"].sum() + single["mean_expected_loss"].sum() + tornado["positive_variation"].sum())
+    print(f"{'mmap' if mmap else 'in memory':<10} {elapsed:>8.2f} {peak:>10.0f} {digest!r}")
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--analyse":
+    analyse(sys.argv[2], sys.argv[3] == "mmap")
+    sys.exit()
+
+here = os.path.dirname(os.path.abspath(__file__))
+data_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "test_data_60.csv")
+iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+risks = RiskDataImporter.import_risks(data_file)
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "run")
+    sim = simulate(risks, iterations=iterations, seed=1)
+    sim.save(path)
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    del sim
+    print(f"{len(risks)} risks, {iterations} iterations, {size / 2**20:,.0f} MB on disk\n")
+    print(f"{'mode':<10} {'seconds':>8} {'peak MB':>10} result digest (equal in both modes)")
+    for mode in ("memory", "mmap"):
+        subprocess.run([sys.executable, __file__, "--analyse", path, mode], check=True)
@@ -0,0 +1,65 @@
+# benchmark_qmc_poisson.py
+# Convergence of the randomized QMC simulator with inverse-CDF Poisson
+# occurrences (their own Sobol dimension) against the previous sampler, which
+# drew occurrences from a pseudo-random Poisson stream.
+#
+# The errors are the relative root mean square errors, over independently
+# scrambled replications, of the expected number of events per year,
+# sum(E[frequency]), and of the portfolio ALE, sum(E[frequency] * E[impact]).
+#
+#   python examples/benchmark_qmc_poisson.py [data_file] [replications]
+import os
+import sys
+
+import numpy as np
+
+from QRALib.utils.importer import RiskDataImporter
+from QRALib.simulation.rmc import RandomQuasiMonteCarlo
+from QRALib.simulation.streams import (
+    OCCURRENCE, STREAM_BLOCK, FREQUENCY, SobolSampler, iter_stream_blocks, rng
+)
+
+
+class PseudoRandomPoissonSampler(SobolSampler):
+    """Previous behaviour: Sobol frequencies, pseudo-random Poisson occurrences."""
+
+    def occurrences(self, risk, num_of_iter, start=0, cursors=None):
+        first = start - start % STREAM_BLOCK
+        frequency = risk.get_frequency_ppf(self._column(risk, FREQUENCY, start + num_of_iter - first, first))
+        occurances, skipped = [], 0
+        for block, lo, hi in iter_stream_blocks(start, num_of_iter):
+            offset = block * STREAM_BLOCK - first
+            block_occurances = rng(self.seed, risk.uniq_id, block, OCCURRENCE).poisson(frequency[offset:offset + hi])
+            if not occurances:
+                skipped = int(block_occurances[:lo].sum())
+            occurances.append(block_occurances[lo:])
+        return frequency[start - first:], np.concatenate(occurances), skipped
+
+
+def portfolio_means(risks, sampler_cls, seed, iterations):
+    sim = RandomQuasiMonteCarlo(risks, seed=seed, backend="serial")
+    sim.sampler = sampler_cls(sim.seed, [r.uniq_id for r in risks], scramble=True)
+    results = sim.simulation(iterations)["results"]
+    return sum(r["occurances"].mean() for r in results), sum(r["total"].mean() for r in results)
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+data_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "test_data_18.csv")
+replications = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+risks = RiskDataImporter.import_risks(data_file)
+exact = np.array([
+    sum(r.frequency_model.distribution.mean() for r in risks),
+    sum(r.frequency_model.distribution.mean() * r.impact_model.distribution.mean() for r in risks),
+])
+print(f"{len(risks)} risks, {exact[0]:.2f} events and ALE {exact[1]:,.0f} per year, {replications} replications\n")
+print(f"{'':>10} {'events per year':^25} {'portfolio ALE':^25}")
+print(f"{'iterations':>10}" + f" {'pseudo-rnd':>10} {'inv-CDF':>8} {'ratio':>5}" * 2)
+for iterations in (256, 1024, 4096, 16384):
+    errors = []
+    for sampler_cls in (PseudoRandomPoissonSampler, SobolSampler):
+        means = np.array([portfolio_means(risks, sampler_cls, seed, iterations) for seed in range(replications)])
+        errors.append(np.sqrt(np.mean((means - exact) ** 2, axis=0)) / exact)
+    row = "".join(
+        f" {errors[0][i]:>10.3%} {errors[1][i]:>8.3%} {errors[0][i] / errors[1][i]:>5.1f}" for i in range(2)
+    )
+    print(f"{iterations:>10}{row}")
@@ -0,0 +1,41 @@
+# benchmark_threads.py
+# Scaling of the simulation backends with the number of workers.
+#
+# Run it on a regular and on a free-threaded interpreter (python3.13t) to
+# compare: with the GIL disabled the thread backend scales like processes,
+# without pickling the portfolio or copying results between processes.
+#
+#   python examples/benchmark_threads.py [data_file] [iterations]
+import os
+import sys
+import time
+
+import numpy as np
+
+from QRALib.utils.importer import RiskDataImporter
+from QRALib.api import simulate
+from QRALib.simulation.backends import GIL_ENABLED, available_workers
+
+here = os.path.dirname(os.path.abspath(__file__))
+data_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "test_data_600.csv")
+iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+risks = RiskDataImporter.import_risks(data_file)
+
+print(f"Python {sys.version.split()[0]}, GIL enabled: {GIL_ENABLED}")
+print(f"{len(risks)} risks, {iterations} iterations, {available_workers()} CPUs available\n")
+
+workers = sorted({1, 2, 4, 8, available_workers()} & set(range(1, available_workers() + 1)))
+reference = None
+print(f"{'backend':<10} {'workers':>7} {'seconds':>8} {'speedup':>8}")
+for backend in ("serial", "threads", "processes"):
+    for n in ([1] if backend == "serial" else workers):
+        t0 = time.perf_counter()
+        sim = simulate(risks, method="smc", iterations=iterations, seed=1,
+                       backend=backend, max_workers=n)
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference, totals = elapsed, [r["total"] for r in sim.results.values()]
+        else:
+            # every backend draws from the same seeded streams
+            assert all(np.array_equal(a["total"], b) for a, b in zip(sim.results.values(), totals))
+        print(f"{backend:<10} {n:>7} {elapsed:>8.2f} {reference / elapsed:>7.2f}x")
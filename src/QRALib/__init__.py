@@ -16,10 +16,13 @@ from .risk.portfolio           import RiskPortfolio
 from .simulation.smc           import StandardMonteCarlo
 from .simulation.qmc           import QuasiMonteCarlo
 from .simulation.rmc           import RandomQuasiMonteCarlo
+from .simulation.matrix        import MatrixMonteCarlo
+from .simulation.executor      import SimulationExecutor
 from .analysis.mariq           import MaRiQAnalysis
 from .analysis.sensitivity_analysis import SensitivityAnalysis
 from .analysis.tornado         import TornadoAnalysis
 from .analysis.single_risk_analysis import SingleRiskAnalysis
+from .analysis.accumulators    import SimulationAccumulator
 from .pipeline                 import QRAPipeline
 from .api                      import run_full_qra
 
@@ -29,10 +32,13 @@ __all__ = [
     "StandardMonteCarlo",
     "QuasiMonteCarlo",
     "RandomQuasiMonteCarlo",
+    "MatrixMonteCarlo",
+    "SimulationExecutor",
     "MaRiQAnalysis",
     "SensitivityAnalysis",
     "TornadoAnalysis",
     "SingleRiskAnalysis",
+    "SimulationAccumulator",
     "QRAPipeline",
     "run_full_qra",
 ]
@@ -0,0 +1,404 @@
+# src/QRALib/analysis/accumulators.py
+"""
+Mergeable online statistics for simulation output.
+
+Every accumulator is fed block by block with ``update`` and can be combined
+with an accumulator of the same kind, built on another worker or from another
+range of iterations, with ``merge``. None of them keeps the raw samples, so a
+run of any length can be summarised in memory proportional to the portfolio.
+
+``SimulationAccumulator`` guards its state with a lock, so worker threads can
+fold their blocks into one shared accumulator. The lower-level accumulators
+are meant to be owned by a single thread and merged afterwards.
+
+Blocks may hold float32 or float64 values; they are read in their own
+precision and reduced into float64 statistics, without an upcast copy of the
+block: the deviations of ``RunningMoments`` are taken ``MOMENTS_CHUNK`` values
+at a time.
+"""
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..simulation.columnar import as_columnar
+
+# values whose float64 deviations from the mean are held at a time
+MOMENTS_CHUNK = 1 << 16
+
+
+class RunningMoments:
+    """
+    Count, mean and variance along the last axis, using Chan's parallel update.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the statistics, e.g. ``()`` for one series or ``(n_risks,)``
+        when updating with ``(n_risks, n)`` blocks.
+    """
+    def __init__(self, shape: Sequence[int] = ()) -> None:
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, values) -> None:
+        values = np.asarray(values)
+        n = values.shape[-1]
+        if n == 0:
+            return
+        mean = values.mean(axis=-1, dtype=np.float64)
+        m2 = np.zeros(mean.shape)
+        step = max(1, MOMENTS_CHUNK // max(mean.size, 1))
+        for lo in range(0, n, step):
+            deviations = np.subtract(values[..., lo:lo + step], mean[..., None], dtype=np.float64)
+            m2 += np.einsum("...i,...i->...", deviations, deviations)
+        self._combine(n, mean, m2)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, n: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (``ddof=1``)."""
+        if self.count < 2:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    @property
+    def std_error(self) -> np.ndarray:
+        """Standard error of the mean."""
+        return self.std / math.sqrt(self.count) if self.count else np.full_like(self.m2, np.nan)
+
+
+class RunningExtrema:
+    """
+    Minimum and maximum along the last axis.
+    """
+    def __init__(self, shape: Sequence[int] = ()) -> None:
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, values) -> None:
+        values = np.asarray(values)
+        if values.shape[-1] == 0:
+            return
+        self.min = np.minimum(self.min, values.min(axis=-1))
+        self.max = np.maximum(self.max, values.max(axis=-1))
+
+    def merge(self, other: "RunningExtrema") -> None:
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+
+class ExceedanceCounter:
+    """
+    Number of samples greater than or equal to each value of a fixed grid.
+
+    Parameters
+    ----------
+    grid : array-like
+        Increasing impact values, e.g. the MaRiQ tolerance x-values.
+    """
+    def __init__(self, grid) -> None:
+        self.grid = np.asarray(grid, dtype=float)
+        self.counts = np.zeros(self.grid.shape, dtype=np.int64)
+        self.count = 0
+
+    def update(self, values) -> None:
+        values = np.sort(np.asarray(values), axis=None)
+        self.counts += values.size - np.searchsorted(values, self.grid, side="left")
+        self.count += values.size
+
+    def merge(self, other: "ExceedanceCounter") -> None:
+        if not np.array_equal(self.grid, other.grid):
+            raise ValueError("Cannot merge exceedance counters built on different grids")
+        self.counts += other.counts
+        self.count += other.count
+
+    def exceedance(self) -> np.ndarray:
+        """Probability of exceeding each grid value."""
+        return self.counts / self.count if self.count else np.full(self.grid.shape, np.nan)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a non-negative series with bounded relative error.
+
+    Positive samples are counted in logarithmic buckets ``(gamma**(k-1), gamma**k]``
+    with ``gamma = (1 + a) / (1 - a)``, so every reported quantile is within a
+    relative distance ``a`` of a true sample at that rank. Zeros, which are
+    frequent in yearly loss totals, are counted separately and reported exactly.
+
+    Parameters
+    ----------
+    relative_accuracy : float
+        Relative accuracy ``a`` of the reported quantiles (default 0.005).
+    """
+    def __init__(self, relative_accuracy: float = 0.005) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.count = 0
+        self._offset = 0
+        self._bins = np.zeros(0, dtype=np.int64)
+
+    def update(self, values) -> None:
+        values = np.asarray(values).ravel()
+        if np.any(values < 0):
+            raise ValueError("QuantileSketch only accepts non-negative values")
+        positive = values[values > 0]
+        self.zero_count += values.size - positive.size
+        self.count += values.size
+        if positive.size:
+            keys = np.ceil(np.log(positive, dtype=np.float64) / self._log_gamma).astype(np.int64)
+            lo = int(keys.min())
+            self._add_bins(lo, np.bincount(keys - lo))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with a different relative accuracy")
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other._bins.size:
+            self._add_bins(other._offset, other._bins)
+
+    def _add_bins(self, offset: int, bins: np.ndarray) -> None:
+        if not self._bins.size:
+            self._offset, self._bins = offset, bins.astype(np.int64)
+            return
+        lo = min(self._offset, offset)
+        hi = max(self._offset + self._bins.size, offset + bins.size)
+        merged = np.zeros(hi - lo, dtype=np.int64)
+        merged[self._offset - lo:self._offset - lo + self._bins.size] += self._bins
+        merged[offset - lo:offset - lo + bins.size] += bins
+        self._offset, self._bins = lo, merged
+
+    def _values(self) -> np.ndarray:
+        keys = np.arange(self._offset, self._offset + self._bins.size)
+        return 2 * self.gamma ** keys / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s), with ``q`` in [0, 1] as for ``np.quantile``.
+        """
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        rank = np.floor(q * (self.count - 1))
+        cumulative = self.zero_count + np.cumsum(self._bins)
+        idx = np.searchsorted(cumulative, rank, side="right")
+        values = np.concatenate((self._values(), [np.nan]))[np.minimum(idx, self._bins.size)]
+        return np.where(rank < self.zero_count, 0.0, values)
+
+    def percentile(self, p):
+        """Approximate percentile(s), with ``p`` in [0, 100] as for ``np.percentile``."""
+        return self.quantile(np.asarray(p, dtype=float) / 100.0)
+
+    def exceedance(self, grid) -> np.ndarray:
+        """
+        Approximate probability of a sample greater than or equal to each grid value.
+        """
+        grid = np.asarray(grid, dtype=float)
+        if not self.count:
+            return np.full(grid.shape, np.nan)
+        # a bucket counts as exceeding once its representative value reaches the grid value
+        above = np.concatenate((np.cumsum(self._bins[::-1])[::-1], [0]))
+        idx = np.searchsorted(self._values(), grid, side="left")
+        counts = above[idx] + np.where(grid <= 0, self.zero_count, 0)
+        return counts / self.count
+
+
+class SimulationAccumulator:
+    """
+    Online summary of a portfolio simulation, fed one block of iterations at a time.
+
+    Tracks per-risk and portfolio-wide moments, extrema and quantile sketches of
+    the yearly ``total`` loss, plus the per-risk ``frequency`` and
+    ``single_risk_impact`` used by the single-risk and tornado analyses.
+
+    Parameters
+    ----------
+    risk_ids : List[str]
+        Risk IDs in the order the blocks list them.
+    relative_accuracy : float
+        Relative accuracy of the quantile sketches.
+    grid : array-like, optional
+        Impact values for which exact portfolio exceedance counts are kept.
+    fields : sequence of str, optional
+        Fields to track, a subset of ``FIELDS`` that includes ``"total"``;
+        ``("total",)`` for blocks simulated with ``detail="totals"``.
+    """
+    FIELDS = ("frequency", "single_risk_impact", "total")
+
+    def __init__(
+        self,
+        risk_ids: List[str],
+        relative_accuracy: float = 0.005,
+        grid: Optional[Iterable[float]] = None,
+        fields: Sequence[str] = FIELDS,
+    ) -> None:
+        if "total" not in fields or not set(fields) <= set(self.FIELDS):
+            raise ValueError(f"fields must include 'total' and be taken from {self.FIELDS}, got {tuple(fields)}")
+        self.risk_ids = list(risk_ids)
+        self.fields = tuple(f for f in self.FIELDS if f in fields)
+        n = len(self.risk_ids)
+        self.moments = {f: RunningMoments((n,)) for f in self.fields}
+        self.extrema = {f: RunningExtrema((n,)) for f in self.fields}
+        self.sketches = {
+            f: [QuantileSketch(relative_accuracy) for _ in range(n)] for f in self.fields
+        }
+        self.portfolio_moments = RunningMoments()
+        self.portfolio_extrema = RunningExtrema()
+        self.portfolio_sketch = QuantileSketch(relative_accuracy)
+        self.portfolio_exceedance = ExceedanceCounter(grid) if grid is not None else None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[Any], **kwargs) -> "SimulationAccumulator":
+        """
+        Fold an iterable of simulation blocks (e.g. from ``stream_simulation``).
+        Only the fields present in the first block are tracked, so blocks of
+        ``detail="totals"`` runs are summarised from their ``total`` alone.
+
+        Raises
+        ------
+        ValueError
+            If there are no blocks, or they hold no ``total`` per iteration
+            (``detail="summary"``).
+        """
+        acc = None
+        for block in blocks:
+            if acc is None:
+                columns = as_columnar(block)
+                fields = [f for f in cls.FIELDS if f in columns.fields]
+                if "total" not in fields:
+                    raise ValueError(
+                        "Blocks hold no total per iteration, simulate them with detail='full' or 'totals'"
+                    )
+                acc = cls(list(columns.risk_ids), fields=fields, **kwargs)
+            acc.update(block)
+        if acc is None:
+            raise ValueError("No simulation blocks to accumulate")
+        return acc
+
+    @property
+    def count(self) -> int:
+        return self.portfolio_moments.count
+
+    def update(self, block: Any) -> None:
+        """
+        Fold one block. Accepts the nested dictionary returned by the simulators
+        or a ``SimulationResults`` instance. Safe to call from several threads.
+        """
+        matrices = _block_matrices(block, self.risk_ids, self.fields)
+        with self._lock:
+            self._fold(matrices)
+
+    def _fold(self, matrices: Dict[str, np.ndarray]) -> None:
+        for f, matrix in matrices.items():
+            self.moments[f].update(matrix)
+            self.extrema[f].update(matrix)
+            for sketch, row in zip(self.sketches[f], matrix):
+                sketch.update(row)
+            if f == "total":
+                portfolio = matrix.sum(axis=0, dtype=np.float64)
+                self.portfolio_moments.update(portfolio)
+                self.portfolio_extrema.update(portfolio)
+                self.portfolio_sketch.update(portfolio)
+                if self.portfolio_exceedance is not None:
+                    self.portfolio_exceedance.update(portfolio)
+
+    def merge(self, other: "SimulationAccumulator") -> None:
+        """
+        Combine with an accumulator built over other iterations of the same
+        portfolio. ``other`` must no longer be updated while it is merged.
+        """
+        if other.risk_ids != self.risk_ids:
+            raise ValueError("Cannot merge accumulators of different portfolios")
+        if other.fields != self.fields:
+            raise ValueError("Cannot merge accumulators tracking different fields")
+        with self._lock:
+            self._merge(other)
+
+    def _merge(self, other: "SimulationAccumulator") -> None:
+        for f in self.fields:
+            self.moments[f].merge(other.moments[f])
+            self.extrema[f].merge(other.extrema[f])
+            for mine, theirs in zip(self.sketches[f], other.sketches[f]):
+                mine.merge(theirs)
+        self.portfolio_moments.merge(other.portfolio_moments)
+        self.portfolio_extrema.merge(other.portfolio_extrema)
+        self.portfolio_sketch.merge(other.portfolio_sketch)
+        if self.portfolio_exceedance is not None and other.portfolio_exceedance is not None:
+            self.portfolio_exceedance.merge(other.portfolio_exceedance)
+
+    def percentile(self, field: str, p) -> np.ndarray:
+        """Per-risk approximate percentile(s) of ``field``, shape ``(n_risks,) + shape(p)``."""
+        return np.array([s.percentile(p) for s in self.sketches[field]])
+
+    def stats(self, field: str) -> Dict[str, np.ndarray]:
+        """Per-risk min, p5, mean, p95 and max of ``field``."""
+        pct = self.percentile(field, [5, 95])
+        return {
+            "min": self.extrema[field].min,
+            "p5": pct[:, 0],
+            "mean": self.moments[field].mean,
+            "p95": pct[:, 1],
+            "max": self.extrema[field].max,
+        }
+
+    def ale(self) -> Dict[str, Any]:
+        """Annualized loss expectancy per risk and for the portfolio, with standard errors."""
+        return {
+            "risk_ids": self.risk_ids,
+            "ale": self.moments["total"].mean,
+            "ale_std_error": self.moments["total"].std_error,
+            "portfolio_ale": float(self.portfolio_moments.mean),
+            "portfolio_ale_std_error": float(self.portfolio_moments.std_error),
+        }
+
+    def exceedance_curve(self, num_buckets: int = 200) -> Dict[str, np.ndarray]:
+        """
+        Portfolio impact exceedance curve on the same buckets as
+        ``MaRiQAnalysis.compute_total`` (0 to the 99th percentile).
+        """
+        max_outcome = float(self.portfolio_sketch.percentile(99))
+        buckets = np.linspace(0, max_outcome, num_buckets)
+        return {"buckets": buckets, "exceedance": self.portfolio_sketch.exceedance(buckets)}
+
+
+def _block_matrices(block: Any, risk_ids: List[str], fields: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Matrices of ``fields`` with rows in ``risk_ids`` order, copied only if the order differs."""
+    columns = as_columnar(block)
+    if columns.risk_ids == risk_ids:
+        return {f: columns.matrix(f) for f in fields}
+    if isinstance(block, dict) or sorted(columns.risk_ids) != sorted(risk_ids):
+        raise ValueError("Block risk IDs do not match the accumulator")
+    rows = [columns.index[rid] for rid in risk_ids]
+    return {f: columns.matrix(f)[rows] for f in fields}
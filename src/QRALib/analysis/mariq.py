@@ -3,7 +3,9 @@
 Analysis module for MaRiQ quantitative risk analysis (data-only, no visualization).
 """
 import numpy as np
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Sequence, Tuple
+
+from ..simulation.columnar import DEFAULT_BLOCK_BYTES, ColumnarResults, as_columnar, release
 
 class MaRiQAnalysis:
     """
@@ -11,52 +13,129 @@ class MaRiQAnalysis:
 
     Parameters
     ----------
-    sim_result : Dict[str, Any]
+    sim_result : Dict[str, Any] or SimulationResults
         A simulation result structure with keys:
         - "summary": {"number_of_iterations": int, "risk_list": ...}
-        - "results": list of dicts with keys ["id","frequency","impact","single_risk_impact","total"]
+        - "results": list of dicts with keys ["id","frequency","impact","single_risk_impact","total"].
+          Results holding only "total" (detail="totals") support ``compute_total`` only.
+        or a ``SimulationResults``. The result matrices are used as they are
+        (see ``ColumnarResults``); only plain per-risk lists are stacked.
     tolerance : Tuple[List[float], List[float]]
         User-defined risk tolerance as (x_values, y_percentages).
+    block_bytes : int
+        Size of the blocks of the result matrices read at a time. Memory-mapped
+        results (``SimulationResults.load``) are reduced block by block with a
+        bounded resident set; the results do not depend on the block size.
     """
     def __init__(
         self,
         sim_result: Dict[str, Any],
-        tolerance: Tuple[List[float], List[float]]
+        tolerance: Tuple[List[float], List[float]],
+        block_bytes: int = DEFAULT_BLOCK_BYTES
     ):
         self.sim = sim_result
         self.tolerance = tolerance
-        self.num_iter = self.sim["summary"]["number_of_iterations"]
-        results = self.sim["results"]
+        summary = sim_result["summary"] if isinstance(sim_result, dict) else sim_result.summary
+        self.num_iter = summary["number_of_iterations"]
+        self.columns = as_columnar(sim_result)
 
         # Extract risk IDs
-        self.risk_ids: List[str] = [r["id"] for r in results]
+        self.risk_ids: List[str] = self.columns.risk_ids
 
-        # Build matrix of total outcomes: shape (n_risks, num_iter)
-        self._risk_matrix = np.vstack([r["total"] for r in results])
+        # Matrix of total outcomes: shape (n_risks, num_iter)
+        self._risk_matrix = self.columns.matrix("total")
         # Total risk across all risks per iteration
-        self.total_risk: np.ndarray = self._risk_matrix.sum(axis=0)
-
-        # Prepare per-risk lists
-        freq_list = [r["frequency"] for r in results]
-        imp_list = [r["impact"] for r in results]
-        sri_list = [r["single_risk_impact"] for r in results]
-
-        # Compute means
-        self.mean_frequency = np.array([np.mean(f) for f in freq_list])
-        self.mean_impact    = np.array([np.mean(i) for i in imp_list])
-        self.mean_expected_loss = np.array([
-            np.mean(np.asarray(f) * np.asarray(sri))
-            for f, sri in zip(freq_list, sri_list)
-        ])
+        self.total_risk: np.ndarray = self.columns.sum_rows("total", block_bytes)
 
-        # Uncertainty matrix for each risk (single risk impacts)
-        self.uncertainty = np.vstack(sri_list)
+        self.mean_frequency = self.mean_impact = None
+        self.mean_expected_loss = self.uncertainty = None
+        if all(f in self.columns.matrices for f in ("frequency", "impact", "single_risk_impact")):
+            self._compute_means(self.columns, block_bytes)
 
         # Normalize tolerance y-values (percentages to fraction)
         tol_x, tol_y = tolerance
         self.tol_x = np.asarray(tol_x)
         self.tol_y = np.asarray(tol_y) / 100.0
 
+    def _compute_means(self, columns: ColumnarResults, block_bytes: int) -> None:
+        sri = columns.matrix("single_risk_impact")
+
+        # Compute means, accumulated in float64 for float32 results
+        self.mean_frequency = columns.row_means("frequency", block_bytes)
+        self.mean_impact    = np.array([
+            np.mean(columns.impact(row), dtype=np.float64)
+            for lo, hi in columns.impact_blocks(block_bytes) for row in range(lo, hi)
+        ])
+        # row by row, to bound the float64 temporary to one row
+        mean_expected_loss = []
+        for lo, frequency in columns.row_blocks("frequency", block_bytes // 2):
+            mean_expected_loss += [
+                np.mean(np.multiply(f, s, dtype=np.float64)) for f, s in zip(frequency, sri[lo:lo + len(frequency)])
+            ]
+            release(sri)
+        self.mean_expected_loss = np.array(mean_expected_loss)
+
+        # Uncertainty matrix for each risk (single risk impacts)
+        self.uncertainty = sri
+
+    def update(self, sim_result: Dict[str, Any], rows: Sequence[int], block_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
+        """
+        Update the analysis in place after an incremental re-simulation.
+
+        The total risk is summed again; the per-risk means are computed only
+        for ``rows`` and for risks that were not in the previous results, the
+        others are carried over by risk ID. The outcome is identical to a new
+        ``MaRiQAnalysis`` of ``sim_result``.
+
+        Parameters
+        ----------
+        sim_result : Dict[str, Any] or SimulationResults
+            The merged results of the edited portfolio.
+        rows : Sequence[int]
+            Rows of ``sim_result`` that were simulated again.
+        block_bytes : int
+            See the class parameters.
+        """
+        previous = {rid: row for row, rid in enumerate(self.risk_ids)}
+        carried = self.mean_expected_loss is not None
+        old = (self.mean_frequency, self.mean_impact, self.mean_expected_loss)
+
+        self.sim = sim_result
+        summary = sim_result["summary"] if isinstance(sim_result, dict) else sim_result.summary
+        self.num_iter = summary["number_of_iterations"]
+        self.columns = columns = as_columnar(sim_result)
+        self.risk_ids = columns.risk_ids
+        self._risk_matrix = columns.matrix("total")
+        self.total_risk = columns.sum_rows("total", block_bytes)
+
+        if not all(f in columns.matrices for f in ("frequency", "impact", "single_risk_impact")):
+            self.mean_frequency = self.mean_impact = None
+            self.mean_expected_loss = self.uncertainty = None
+            return
+        if not carried:
+            self._compute_means(columns, block_bytes)
+            return
+
+        stale = set(rows)
+        means = np.empty((3, len(columns)))
+        for row, rid in enumerate(self.risk_ids):
+            if row in stale or rid not in previous:
+                means[:, row] = self._risk_means(columns, row)
+            else:
+                means[:, row] = [values[previous[rid]] for values in old]
+        self.mean_frequency, self.mean_impact, self.mean_expected_loss = means
+        self.uncertainty = columns.matrix("single_risk_impact")
+
+    @staticmethod
+    def _risk_means(columns: ColumnarResults, row: int) -> Tuple[float, float, float]:
+        """Mean frequency, impact and expected loss of one risk, as ``_compute_means`` computes them."""
+        frequency = columns.matrix("frequency")[row]
+        return (
+            frequency.mean(dtype=np.float64),
+            np.mean(columns.impact(row), dtype=np.float64),
+            np.mean(np.multiply(frequency, columns.matrix("single_risk_impact")[row], dtype=np.float64)),
+        )
+
     def compute_total(self, num_buckets: int = 200) -> Dict[str, np.ndarray]:
         """
         Compute the impact exceedance (total-risk) curve.
@@ -115,6 +194,8 @@ class MaRiQAnalysis:
               "top_n": top_n
             }
         """
+        if self.mean_expected_loss is None:
+            raise ValueError("compute_single needs the frequency and impacts of every risk (detail='full')")
         # Sort by expected loss ascending, then reverse for descending
         idx_sorted = np.argsort(self.mean_expected_loss)
         top_idx = idx_sorted[::-1][:top_n]
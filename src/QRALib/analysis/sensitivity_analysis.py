@@ -1,13 +1,21 @@
 # src/QRALib/analysis/sensitivity.py
+from functools import partial
+
 import numpy as np
 from SALib.sample import saltelli
 from SALib.analyze import sobol, morris
 from SALib.sample.morris import sample as morris_sample
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 class SensitivityAnalysis:
     """
     Compute Morris & Sobol sensitivity indices, but do not plot.
+
+    Sampling and bootstrap resampling draw from a generator seeded per call
+    rather than from numpy's global random state, so concurrent calls from
+    several threads neither interfere nor change each other's results. A seed
+    of None draws fresh OS entropy. The model is evaluated with the fast PPF
+    kernels of the distributions.
     """
 
     def __init__(self, risks: List):
@@ -16,7 +24,7 @@ class SensitivityAnalysis:
         self.equation: List = []
         for risk in risks:
             self.names += [risk.uniq_id + "_frequency", risk.uniq_id + "_impact"]
-            self.equation += [risk.get_frequency_ppf, risk.get_impact_ppf]
+            self.equation += [partial(risk.get_frequency_ppf, fast=True), partial(risk.get_impact_ppf, fast=True)]
 
         self.num_vars = len(self.names)
         self.problem = {
@@ -26,9 +34,10 @@ class SensitivityAnalysis:
             "bounds": [[0, 0.9999]] * self.num_vars,
         }
 
-    def morris_indices(self, N: int = 1000, num_levels: int = 4) -> Dict[str, Any]:
+    def morris_indices(self, N: int = 1000, num_levels: int = 4, seed: Optional[int] = None) -> Dict[str, Any]:
         """Return SALib Morris result dict (mu_star, sigma, etc)."""
-        params = morris_sample(self.problem, N=N, num_levels=num_levels)
+        rng = _generator(seed)
+        params = morris_sample(self.problem, N=N, num_levels=num_levels, seed=rng)
         # build model output Y
         Y = np.sum([
             self.equation[i](params[:, i]) * self.equation[i + 1](params[:, i + 1])
@@ -38,12 +47,13 @@ class SensitivityAnalysis:
             self.problem, params, Y,
             print_to_console=False,
             num_levels=num_levels,
-            num_resamples=100
+            num_resamples=100,
+            seed=rng
         )
         Si["names"] = self.names
         return Si
 
-    def sobol_indices(self, N: int = 1024) -> Dict[str, Any]:
+    def sobol_indices(self, N: int = 1024, seed: Optional[int] = None) -> Dict[str, Any]:
         """Return SALib Sobol result dict (S1, ST, etc)."""
         params = saltelli.sample(self.problem, N, calc_second_order=False)
         Y = np.sum([
@@ -54,7 +64,8 @@ class SensitivityAnalysis:
             self.problem,
             Y,
             calc_second_order=False,
-            print_to_console=False
+            print_to_console=False,
+            seed=_generator(seed)
         )
         Si["names"] = self.names
         return Si
@@ -66,3 +77,9 @@ class SensitivityAnalysis:
         """
         idx = np.argsort(Si[by])
         return np.array(Si[key])[idx]
+
+
+def _generator(seed: Optional[int]) -> np.random.Generator:
+    # SALib falls back to numpy's global random state for a seed of None or 0,
+    # but takes a Generator as it is; integer seeds draw as SALib seeds them
+    return np.random.default_rng(seed)
@@ -5,16 +5,19 @@ Data-only analysis for single-risk exploration (no plotting).
 import numpy as np
 from typing import Dict, Any, Tuple
 
+from ..simulation.columnar import as_columnar
+
 class SingleRiskAnalysis:
     """
     Compute statistics and exceedance data for one risk from simulation results.
 
     Parameters
     ----------
-    sim_result : Dict[str, Any]
+    sim_result : Dict[str, Any] or SimulationResults
         Simulation result dict with keys:
           - "summary": {"number_of_iterations": int, ...}
           - "results": list of dicts with keys ["id","frequency","impact","single_risk_impact","total"]
+        or a ``SimulationResults``. Rows are read as views of the result matrices.
 
     Attributes
     ----------
@@ -22,8 +25,11 @@ class SingleRiskAnalysis:
         Number of simulation iterations.
     """
     def __init__(self, sim_result: Dict[str, Any]) -> None:
-        self.results = sim_result["results"]
-        self.num_iter = sim_result["summary"]["number_of_iterations"]
+        summary = sim_result["summary"] if isinstance(sim_result, dict) else sim_result.summary
+        self.columns = as_columnar(sim_result)
+        # per-risk dictionaries, as views of the matrices
+        self.results = self.columns.rows()
+        self.num_iter = summary["number_of_iterations"]
 
     def compute_stats(self, risk_idx: int) -> Dict[str, Any]:
         """
@@ -46,7 +52,7 @@ class SingleRiskAnalysis:
               }
             }
         """
-        r = self.results[risk_idx]
+        r = {"id": self.columns.risk_ids[risk_idx], **self.columns.row(risk_idx)}
         freq = np.asarray(r["frequency"])
         imp_ppf = np.asarray(r["single_risk_impact"])
         total = np.asarray(r["total"])
@@ -59,7 +65,7 @@ class SingleRiskAnalysis:
             "table": {
                 "min":   [float(np.min(freq)), float(np.min(imp_ppf))],
                 "p5":    [float(np.percentile(freq, 5)),  float(np.percentile(imp_ppf, 5))],
-                "mean":  [float(np.mean(freq)),         float(np.mean(imp_ppf))],
+                "mean":  [float(np.mean(freq, dtype=np.float64)), float(np.mean(imp_ppf, dtype=np.float64))],
                 "p95":   [float(np.percentile(freq, 95)), float(np.percentile(imp_ppf, 95))],
                 "max":   [float(np.max(freq)),         float(np.max(imp_ppf))],
             }
@@ -75,7 +81,7 @@ class SingleRiskAnalysis:
         Dict[str, np.ndarray]
             {"bins": np.ndarray, "exceedance": np.ndarray}
         """
-        total = np.sort(self.results[risk_idx]["total"])
+        total = np.sort(self.columns.matrix("total")[risk_idx])
         max_val = np.percentile(total, 99)
         bins = np.linspace(0, max_val, num_bins)
         exceedance = np.array([np.mean(total >= b) for b in bins])
@@ -5,18 +5,27 @@ Data-only analysis for Tornado sensitivity charts (no plotting).
 import numpy as np
 from typing import Dict, Any, List, Tuple
 
+from ..simulation.columnar import DEFAULT_BLOCK_BYTES, as_columnar
+
 class TornadoAnalysis:
     """
     Compute Tornado variations for risks based on simulation results.
 
     Parameters
     ----------
-    sim_result : Dict[str, Any]
-        Simulation result dict with keys "results": list of dicts having ["id","frequency","single_risk_impact","total"].
+    sim_result : Dict[str, Any] or SimulationResults
+        Simulation result dict with keys "results": list of dicts having ["id","frequency","single_risk_impact","total"],
+        or a ``SimulationResults``. The result matrices are read without copying.
+    block_bytes : int
+        Size of the blocks of the result matrices read at a time, which bounds
+        the resident set for memory-mapped results.
     """
-    def __init__(self, sim_result: Dict[str, Any]) -> None:
-        self.results = sim_result["results"]
-        self.risk_ids = [r["id"] for r in self.results]
+    def __init__(self, sim_result: Dict[str, Any], block_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
+        self.block_bytes = block_bytes
+        self.columns = as_columnar(sim_result)
+        # per-risk dictionaries, as views of the matrices
+        self.results = self.columns.rows()
+        self.risk_ids = self.columns.risk_ids
 
     def compute_variation(
         self,
@@ -44,11 +53,11 @@ class TornadoAnalysis:
         mean_vals = []
         p5_vals = []
         p95_vals = []
-        for r in self.results:
-            arr = np.asarray(r[attribute])
-            mean_vals.append(np.mean(arr))
-            p5_vals.append(np.percentile(arr, 5))
-            p95_vals.append(np.percentile(arr, 95))
+        for _, block in self.columns.row_blocks(attribute, self.block_bytes):
+            for arr in block:
+                mean_vals.append(np.mean(arr, dtype=np.float64))
+                p5_vals.append(np.percentile(arr, 5))
+                p95_vals.append(np.percentile(arr, 95))
         mean_sum = sum(mean_vals)
 
         neg_var = []
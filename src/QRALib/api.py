@@ -1,26 +1,53 @@
 # src/QRALib/api.py
 from .pipeline import QRAPipeline
 from dataclasses import dataclass
-from typing import Dict, Any, Type, TypeVar, Optional, List, Literal, Tuple
+from typing import Dict, Any, Type, TypeVar, Optional, List, Literal, Mapping, Tuple, Iterator
 import numpy as np
 
 from .risk.portfolio    import RiskPortfolio, Risk
 from .simulation.smc    import StandardMonteCarlo
 from .simulation.qmc    import QuasiMonteCarlo
 from .simulation.rmc    import RandomQuasiMonteCarlo
+from .simulation.matrix import MatrixMonteCarlo
+from .simulation.streaming import stream_simulation, DEFAULT_BLOCK_SIZE
+from .simulation.executor import SimulationExecutor
+from .simulation.adaptive import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ITERATIONS, adaptive_simulation
+from .simulation.shared import result_dtypes
+from .simulation.columnar import ColumnarResults, as_columnar
+from .utils.storage import load_results, save_results
+from .utils.cache import ResultCache, cache_key
+from .utils.checkpoint import Checkpoint
+from .utils.arrow import DEFAULT_CHUNK_SIZE, from_arrow, read_parquet, to_arrow, write_parquet
+from .utils.jsonstream import DEFAULT_CHUNK_SIZE as JSON_CHUNK_SIZE, read_ndjson, write_json, write_ndjson
 from .analysis.mariq    import MaRiQAnalysis
 from .analysis.sensitivity_analysis import SensitivityAnalysis
 from .analysis.single_risk_analysis import SingleRiskAnalysis
 from .analysis.tornado    import TornadoAnalysis
 
 
-Method = Literal["smc", "qmc", "rqmc"]
+Method = Literal["smc", "qmc", "rmc", "matrix"]
+Backend = Literal["auto", "serial", "threads", "processes"]
+DType = Literal["float64", "float32"]
+Detail = Literal["full", "totals", "summary"]
 T = TypeVar("T", bound="SimulationResults")
 
 @dataclass
 class SimulationResults:
+    """
+    Summary and per-risk results of a simulation.
+
+    `results` maps each risk ID to its outputs. Results returned by `simulate`
+    are a `ColumnarResults`: one `(n_risks, iterations)` matrix per field,
+    with `results[risk_id]` a dictionary of views into them and
+    `results.matrix(field)` the whole matrix.
+    """
     summary: Dict[str, Any]
-    results: Dict[str, Any]
+    results: Mapping[str, Any]
+
+    @property
+    def columns(self) -> ColumnarResults:
+        """The results as a `ColumnarResults`, stacked only if they are not columnar yet."""
+        return as_columnar(self)
 
     def to_json(self) -> Dict[str, Any]:
         """
@@ -32,7 +59,7 @@ class SimulationResults:
             if isinstance(obj, np.ndarray):
                 return obj.tolist()
             # dict → serialize each key/value
-            if isinstance(obj, dict):
+            if isinstance(obj, Mapping):
                 return {k: _serialize(v) for k, v in obj.items()}
             # list or tuple → serialize each element
             if isinstance(obj, (list, tuple)):
@@ -59,9 +86,87 @@ class SimulationResults:
             return obj
 
         summary = _rebuild(data["summary"])
-        results = _rebuild(data["results"])
+        results = ColumnarResults.from_mapping(_rebuild(data["results"]))
+        if summary.get("dtype", "float64") != "float64":
+            # restore the stored precision, JSON numbers read back as float64/int64
+            results = results.astype(result_dtypes(summary["dtype"]))
         return cls(summary=summary, results=results)
 
+    def save(self, path: str) -> None:
+        """
+        Save to the directory `path` in a binary format: one `.npy` file per
+        result field plus a `meta.json` header with the summary and risk IDs.
+        Arrays keep their dtype. An existing run at `path` is replaced.
+        """
+        save_results(path, self.summary, self.columns)
+
+    @classmethod
+    def load(cls: Type[T], path: str, mmap: bool = True) -> T:
+        """
+        Open a run saved with `save`.
+
+        With `mmap` (default) the result matrices are read-only memory maps:
+        opening is instant whatever the run size, and only the rows that are
+        read are paged in. Pass `mmap=False` to read everything into memory.
+        """
+        summary, columns = load_results(path, mmap_mode="r" if mmap else None)
+        return cls(summary=summary, results=columns)
+
+    def to_arrow(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Year-loss table as a `pyarrow.Table`: columns `risk_id` (dictionary
+        encoded), `iteration`, `occurrences` and `total`, one row per risk and
+        iteration, in record batches of at most `chunk_size` rows.
+
+        The numeric columns wrap the result matrices, and
+        `table.to_pandas(types_mapper=pd.ArrowDtype)` or `polars.from_arrow`
+        read them without copying. Requires `pyarrow`.
+        """
+        return to_arrow(self.columns, self.summary, chunk_size)
+
+    def to_parquet(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, compression: str = "zstd") -> None:
+        """
+        Stream the year-loss table (see `to_arrow`) to a Parquet file, one row
+        group per chunk. The summary is stored in the file metadata. Requires `pyarrow`.
+        """
+        write_parquet(path, self.columns, self.summary, chunk_size, compression)
+
+    @classmethod
+    def from_arrow(cls: Type[T], table) -> T:
+        """Rebuild results from a year-loss table, see `to_arrow`."""
+        summary, columns = from_arrow(table)
+        return cls(summary=summary, results=columns)
+
+    @classmethod
+    def from_parquet(cls: Type[T], path: str) -> T:
+        """Read results written by `to_parquet`."""
+        summary, columns = read_parquet(path)
+        return cls(summary=summary, results=columns)
+
+    def write_json(self, path: str, chunk_size: int = JSON_CHUNK_SIZE, compress: Optional[bool] = None) -> None:
+        """
+        Stream the document of `to_json` to `path`, formatting at most
+        `chunk_size` values at a time instead of building it in memory.
+        Gzip-compressed when `compress` is set, by default when `path` ends in `.gz`.
+        """
+        write_json(path, self.summary, self.columns, chunk_size, compress)
+
+    def to_ndjson(self, path: str, chunk_size: int = JSON_CHUNK_SIZE, compress: Optional[bool] = None) -> None:
+        """
+        Stream the results to `path` as NDJSON: a header line with the summary,
+        risk IDs and field dtypes, then one line per chunk of at most
+        `chunk_size` values of a risk's field. Compression as for `write_json`.
+        """
+        write_ndjson(path, self.summary, self.columns, chunk_size, compress)
+
+    @classmethod
+    def from_ndjson(cls: Type[T], path: str, compress: Optional[bool] = None) -> T:
+        """
+        Read results written by `to_ndjson` line by line into preallocated
+        arrays of the stored dtypes.
+        """
+        summary, columns = read_ndjson(path, compress)
+        return cls(summary=summary, results=columns)
 
 
 
@@ -69,7 +174,16 @@ class SimulationResults:
 def simulate(
     risks: List[Risk],
     method: Method = "smc",
-    iterations: int = 10000
+    iterations: int = 10000,
+    seed: Optional[int] = None,
+    executor: Optional[SimulationExecutor] = None,
+    backend: Backend = "auto",
+    max_workers: Optional[int] = None,
+    dtype: DType = "float64",
+    detail: Detail = "full",
+    cache: Optional[ResultCache] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_every: int = DEFAULT_BLOCK_SIZE,
 ) -> SimulationResults:
     """
     Run a Monte Carlo (or QMC / RMC) simulation on a list of Risk objects.
@@ -79,53 +193,354 @@ def simulate(
     risks
         A pre-built list of `Risk` instances (e.g. from RiskDataImporter.import_risks()).
     method
-        Which algorithm to use: `"smc"`, `"qmc"` (Quasi Monte Carlo), or `"rmc"` (Randomized Quasi Monte Carlo).
+        Which algorithm to use: `"smc"`, `"qmc"` (Quasi Monte Carlo), `"rmc"` (Randomized Quasi Monte Carlo),
+        or `"matrix"` (portfolio-wide Monte Carlo sampled in-process as 2-D arrays).
     iterations
         Number of simulation years (draws) to perform.
+    seed
+        Seed of the per-risk random streams. The same seed gives identical
+        results whatever the worker count or block size. If None, fresh entropy
+        is used and reported in the summary.
+    executor
+        Optional persistent `SimulationExecutor`. Its workers stay alive
+        between calls and cache the portfolio, so repeated simulations only
+        ship iteration ranges and seeds. Not supported by `"matrix"`.
+    backend
+        Where the per-risk work runs: `"serial"` (calling thread), `"threads"`
+        (thread pool, no pickling), `"processes"` (worker processes writing to
+        shared memory), or `"auto"` to choose from the portfolio size and the
+        iteration count. Ignored when an executor is given; `"matrix"` runs in
+        the calling thread and only accepts `"auto"` and `"serial"`.
+    max_workers
+        Cap on the number of threads or processes. Defaults to the CPUs
+        available to the process (affinity and container quota).
+    dtype
+        Storage precision of the results: `"float64"` (default) or `"float32"`,
+        which stores float32 values and int32 occurrences in half the memory.
+        Draws and totals are still computed in float64 before they are stored.
+    detail
+        Which per-risk outputs to keep:
+          - `"full"` (default): `frequency`, `occurances`, `impact`,
+            `single_risk_impact` and `total`, as needed by every analysis.
+          - `"totals"`: only `total`, enough for the MaRiQ total-risk curve
+            and the tornado of totals. The single-risk impacts are not drawn.
+          - `"summary"`: no per-iteration arrays, only the scalars
+            `mean_frequency`, `mean_occurances`, `ale` and `ale_std_error`.
+    cache
+        Optional `ResultCache`. Seeded runs are looked up by a hash of the
+        portfolio definition, method, iterations, seed, dtype and detail; a hit
+        returns the stored run, memory-mapped, without simulating. Misses are
+        simulated and stored. Unseeded runs bypass the cache.
+    checkpoint
+        Optional directory to checkpoint the run to. The run is simulated in
+        blocks of `checkpoint_every` iterations and every block is saved as it
+        completes. If the directory already holds blocks of this run (same
+        risks and parameters, method, dtype and detail, and `seed`, or any
+        seed when it is None), the run resumes after them; blocks of another
+        run raise a ValueError.
+    checkpoint_every
+        Iterations per checkpointed block.
 
     Returns
     -------
     SimulationResults
         A dataclass containing:
-          - `summary`: metadata (method, iteration count, risk IDs)
-          - `results`: a dict mapping risk_id → per-risk output arrays
+          - `summary`: metadata (method, iteration count, risk IDs, seed, dtype, detail)
+          - `results`: a `ColumnarResults` mapping risk_id → per-risk output arrays
     """
     # 1) Wrap your raw list in a Portfolio so existing sim code can consume it
     portfolio = RiskPortfolio(risks)
 
-    # 2) Pick the simulation class
+    key = None
+    if cache is not None and seed is not None:
+        key = cache_key(portfolio, method, iterations, seed, dtype, detail)
+        hit = cache.get(key)
+        if hit is not None:
+            return SimulationResults(summary=hit[0], results=hit[1])
+
+    if checkpoint is not None:
+        checkpoint = Checkpoint(checkpoint)
+        if seed is None:
+            # resume an unseeded run with the seed it was started with
+            seed = (checkpoint.summary() or {}).get("seed")
+
+    # 2) Run the simulation
+    sim = _get_simulator(method)(
+        portfolio, seed=seed, executor=executor, backend=backend, max_workers=max_workers,
+        dtype=dtype, detail=detail
+    )
+    if checkpoint is None:
+        raw = sim.simulation(iterations)
+    else:
+        raw = _run_checkpointed(sim, method, portfolio, checkpoint, iterations, checkpoint_every)
+    # raw is a dict with keys "summary" and "results" (list of per-risk dicts)
+
+    # 3) Return your typed container
+    result = _to_simulation_results(raw, method, portfolio)
+    if key is not None:
+        cache.put(key, result.summary, result.columns)
+    return result
+
+
+def simulate_blocks(
+    risks: List[Risk],
+    method: Method = "smc",
+    iterations: int = 10000,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: Optional[int] = None,
+    executor: Optional[SimulationExecutor] = None,
+    backend: Backend = "auto",
+    max_workers: Optional[int] = None,
+    dtype: DType = "float64",
+    detail: Detail = "full",
+) -> Iterator[SimulationResults]:
+    """
+    Run a simulation in blocks of at most `block_size` iterations.
+
+    Each block is yielded as its own `SimulationResults`, so callers can fold
+    it into running statistics and discard it. Peak memory is bounded by the
+    block size instead of the total number of iterations.
+
+    Parameters
+    ----------
+    risks
+        A pre-built list of `Risk` instances.
+    method
+        Which algorithm to use, see `simulate`.
+    iterations
+        Total number of simulation years (draws) to perform.
+    block_size
+        Maximum number of iterations per yielded block.
+    seed
+        Seed of the per-risk random streams, see `simulate`. Blocks of a
+        seeded run concatenate to the same arrays as a single `simulate` call.
+    executor
+        Optional persistent `SimulationExecutor`, see `simulate`.
+    backend, max_workers
+        Execution backend and worker cap, see `simulate`.
+    dtype, detail
+        Storage precision and per-risk outputs of the results, see `simulate`.
+
+    Returns
+    -------
+    Iterator[SimulationResults]
+        One container per block. `summary` additionally holds
+        `first_iteration` and `total_iterations`.
+    """
+    portfolio = RiskPortfolio(risks)
+    sim = _get_simulator(method)(
+        portfolio, seed=seed, executor=executor, backend=backend, max_workers=max_workers,
+        dtype=dtype, detail=detail
+    )
+    for raw in stream_simulation(sim, iterations, block_size):
+        block = _to_simulation_results(raw, method, portfolio)
+        block.summary["first_iteration"] = raw["summary"]["first_iteration"]
+        block.summary["total_iterations"] = raw["summary"]["total_iterations"]
+        yield block
+
+
+def simulate_adaptive(
+    risks: List[Risk],
+    method: Method = "smc",
+    ale_rel_se: Optional[float] = 0.01,
+    var_ci_width: Optional[float] = None,
+    var_rel_ci_width: Optional[float] = None,
+    quantile: float = 0.99,
+    confidence: float = 0.95,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    seed: Optional[int] = None,
+    executor: Optional[SimulationExecutor] = None,
+    backend: Backend = "auto",
+    max_workers: Optional[int] = None,
+    dtype: DType = "float64",
+    detail: Detail = "full",
+) -> SimulationResults:
+    """
+    Run a simulation in batches until precision targets are met.
+
+    The run starts with `batch_size` iterations and is extended (see
+    `extend`) until every target is met or `max_iterations` is reached. Each
+    extension is sized from the current shortfall, since the errors shrink as
+    `1 / sqrt(iterations)`, and never more than doubles the run. The result
+    equals a `simulate` call with the final number of iterations and the same seed.
+
+    Parameters
+    ----------
+    risks
+        A pre-built list of `Risk` instances.
+    method
+        Which algorithm to use, see `simulate`. For `"qmc"` and `"rmc"` the
+        precision is estimated as for independent draws, which is conservative.
+    ale_rel_se
+        Target relative standard error of the portfolio ALE (mean of the
+        portfolio total), e.g. 0.01 for 1%. None for no target.
+    var_ci_width
+        Target width of the `confidence` interval of the portfolio VaR at
+        `quantile`, in loss units. None for no target.
+    var_rel_ci_width
+        Target width of that interval relative to the VaR. None for no target.
+    quantile
+        Quantile of the VaR, default the 99th percentile used by `MaRiQAnalysis.compute_total`.
+    confidence
+        Confidence level of the VaR interval.
+    batch_size
+        Iterations of the first batch, and minimum of the following ones.
+    max_iterations
+        Hard cap on the number of iterations.
+    seed, executor, backend, max_workers, dtype
+        See `simulate`.
+    detail
+        `"full"` or `"totals"`; the precision needs the totals of every iteration.
+
+    Returns
+    -------
+    SimulationResults
+        The run, with `summary["precision"]` holding the achieved precision:
+        `iterations`, `ale`, `ale_std_error`, `ale_rel_se`, `var`, `var_ci`,
+        `var_ci_width`, `var_rel_ci_width`, the `targets`, `quantile`,
+        `confidence`, and `converged` (False if the cap was hit first).
+    """
+    portfolio = RiskPortfolio(risks)
+    sim = _get_simulator(method)(
+        portfolio, seed=seed, executor=executor, backend=backend, max_workers=max_workers,
+        dtype=dtype, detail=detail
+    )
+    raw = adaptive_simulation(
+        sim, ale_rel_se, var_ci_width, var_rel_ci_width, quantile, confidence, batch_size, max_iterations
+    )
+    result = _to_simulation_results(raw, method, portfolio)
+    result.summary["precision"] = raw["summary"]["precision"]
+    return result
+
+
+def extend(
+    sim: SimulationResults,
+    risks: List[Risk],
+    extra_iterations: int,
+    executor: Optional[SimulationExecutor] = None,
+    backend: Backend = "auto",
+    max_workers: Optional[int] = None,
+    block_size: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_every: int = DEFAULT_BLOCK_SIZE,
+) -> SimulationResults:
+    """
+    Add iterations to an existing run.
+
+    The new iterations continue the random streams of the run, and the Sobol
+    sequence for `"qmc"` and `"rmc"`, where it stopped: a run of `n`
+    iterations extended by `m` equals a run of `n + m` iterations with the
+    same seed.
+
+    Parameters
+    ----------
+    sim
+        The run to extend, as returned by `simulate` or `extend` or loaded with
+        `SimulationResults.load`. Its method, seed, dtype and detail are reused.
+    risks
+        The risks `sim` was simulated for, in the same order.
+    extra_iterations
+        Number of iterations to add.
+    executor, backend, max_workers
+        Execution of the new iterations, see `simulate`.
+    block_size
+        Simulate the new iterations in blocks of at most this many.
+    checkpoint, checkpoint_every
+        Checkpoint directory and block size, see `simulate`. An empty
+        checkpoint first receives `sim`; one that already holds `sim` and
+        some of the new iterations resumes after them.
+
+    Returns
+    -------
+    SimulationResults
+        The whole run, of `number_of_iterations + extra_iterations` iterations.
+    """
+    method = sim.summary["method"]
+    portfolio = RiskPortfolio(risks)
+    simulator = _get_simulator(method)(
+        portfolio, seed=sim.summary["seed"], executor=executor, backend=backend, max_workers=max_workers,
+        dtype=sim.summary.get("dtype", "float64"), detail=sim.summary.get("detail", "full")
+    )
+    if checkpoint is None:
+        raw = simulator.extend(sim, extra_iterations, block_size)
+    else:
+        total = sim.summary["number_of_iterations"] + extra_iterations
+        raw = _run_checkpointed(simulator, method, portfolio, Checkpoint(checkpoint), total, checkpoint_every, sim)
+    return _to_simulation_results(raw, method, portfolio)
+
+
+def _run_checkpointed(
+    simulator, method: str, portfolio: RiskPortfolio, checkpoint: Checkpoint, iterations: int,
+    checkpoint_every: int, previous: Optional[SimulationResults] = None
+) -> Dict[str, Any]:
+    """Simulate up to `iterations` iterations, resuming from and saving every block to `checkpoint`."""
+    # the blocks record the risk definitions, so that edited parameters are
+    # never joined to blocks simulated before the edit
+    fingerprint = portfolio.fingerprint()
+    stored = checkpoint.load()
+    resumed = False
+    if stored is not None:
+        summary, columns = stored
+        expected = {
+            "method": method, "seed": simulator.seed, "dtype": simulator.dtype,
+            "detail": simulator.detail, "risk_ids": portfolio.ids(), "fingerprint": fingerprint,
+        }
+        different = [key for key, value in expected.items() if summary.get(key) != value]
+        if different:
+            raise ValueError(f"{checkpoint.directory} holds another run, its {', '.join(different)} differ")
+        if previous is None or summary["number_of_iterations"] >= previous.summary["number_of_iterations"]:
+            previous, resumed = SimulationResults(summary=summary, results=columns), True
+    if previous is not None and not resumed:
+        # start the checkpoint with the run being extended
+        checkpoint.clear()
+        checkpoint.append(dict(previous.summary, fingerprint=fingerprint), previous.columns, 0)
+
+    def save(block: Dict[str, Any]) -> None:
+        first = block["summary"]["first_iteration"]
+        summary = dict(_to_simulation_results(block, method, portfolio).summary, fingerprint=fingerprint)
+        checkpoint.append(summary, block["columns"], first)
+
+    if previous is None:
+        first = simulator.simulation(min(checkpoint_every, iterations))
+        first["summary"]["first_iteration"] = 0
+        save(first)
+        del first["summary"]["first_iteration"]
+        previous = SimulationResults(summary=first["summary"], results=first["columns"])
+
+    done = previous.summary["number_of_iterations"]
+    if done > iterations:
+        raise ValueError(f"{checkpoint.directory} already holds {done} iterations, more than the {iterations} requested")
+    if done == iterations:
+        return {"summary": previous.summary, "columns": previous.columns}
+    return simulator.extend(previous, iterations - done, checkpoint_every, save)
+
+
+def _get_simulator(method: str):
     sim_map = {
         "smc" : StandardMonteCarlo,
         "qmc" : QuasiMonteCarlo,
         "rmc": RandomQuasiMonteCarlo,
+        "matrix": MatrixMonteCarlo,
     }
     try:
-        SimClass = sim_map[method]
+        return sim_map[method]
     except KeyError:
         raise ValueError(f"Unknown method {method!r}, choose from {list(sim_map)}")
 
-    # 3) Run the simulation
-    sim = SimClass(portfolio)
-    raw = sim.simulation(iterations)
-    # raw is a dict with keys "summary" and "results" (list of per-risk dicts)
 
-    # 4) Build a clean summary dict of primitives
+def _to_simulation_results(raw: Dict[str, Any], method: str, portfolio: RiskPortfolio) -> SimulationResults:
+    # Build a clean summary dict of primitives
     summary = {
         "method": method,
         "number_of_iterations": raw["summary"]["number_of_iterations"],
         "risk_ids": portfolio.ids(),
+        "seed": raw["summary"]["seed"],
+        "dtype": raw["summary"].get("dtype", "float64"),
+        "detail": raw["summary"].get("detail", "full"),
     }
-
-    # 5) Turn the list-of-dicts into a dict keyed by risk_id
-    results_by_id = {
-        entry["id"]: {
-            k: v for k, v in entry.items() if k != "id"
-        }
-        for entry in raw["results"]
-    }
-
-    # 6) Return your typed container
-    return SimulationResults(summary=summary, results=results_by_id)
+    # The simulators return the result matrices as "columns"
+    return SimulationResults(summary=summary, results=as_columnar(raw))
 
 
 def run_full_qra(
@@ -136,6 +551,7 @@ def run_full_qra(
     morris: int = 1000,
     sobol: int = 1024,
     single_risk_idx: Optional[int] = None,
+    seed: Optional[int] = None,
 ) -> SimulationResults:
     # Import risks via pipeline's importer
     from .utils.importer import RiskDataImporter
@@ -143,7 +559,7 @@ def run_full_qra(
     risks = [Risk(**r) for r in raw_dict]  # or however you reconstruct Risk
 
     # 1) simulate (using your new function)
-    sim_res = simulate(risks, method=method, iterations=iterations)
+    sim_res = simulate(risks, method=method, iterations=iterations, seed=seed)
 
     # 2) run analyses *in place* on the pipeline if you need side-effects*, or
     #    call your pure-analysis functions here:
@@ -158,16 +574,12 @@ def run_full_qra(
     sim_res.summary["morris"] = si.morris_indices(morris)
 
     from .analysis.tornado import TornadoAnalysis
-    ta = TornadoAnalysis({"results": [
-        {"id": rid, **sim_res.results[rid]} for rid in sim_res.summary["risk_ids"]
-    ]})
+    ta = TornadoAnalysis(sim_res)
     sim_res.summary["tornado_total"] = ta.compute_variation("total")
 
     if single_risk_idx is not None:
         from .analysis.single_risk import SingleRiskAnalysis
-        sra = SingleRiskAnalysis({"results": [
-            {"id": rid, **sim_res.results[rid]} for rid in sim_res.summary["risk_ids"]
-        ]})
+        sra = SingleRiskAnalysis(sim_res)
         sim_res.summary["single"] = {
             "stats": sra.compute_stats(single_risk_idx),
             "exceedance": sra.compute_exceedance(single_risk_idx)
@@ -196,34 +608,24 @@ def analyze_mariq(
     Dict[str, Any]
         {
           "total": <output of compute_total()>,
-          "single": <output of compute_single()>
+          "single": <output of compute_single()>, None for results
+                    simulated with detail="totals"
         }
     """
-    # 1) Rebuild the raw dict shape for MaRiQAnalysis
-    raw = {
-        "summary": {
-            "number_of_iterations": sim.summary["number_of_iterations"],
-            # we no longer pass a RiskPortfolio here
-        },
-        "results": [
-            {"id": rid, **{k: v for k, v in data.items()}}
-            for rid, data in sim.results.items()
-        ]
-    }
-
-    # 2) Delegate to the pure‐data MaRiQAnalysis
-    ma = MaRiQAnalysis(raw, tolerance)
+    # 1) Delegate to the pure‐data MaRiQAnalysis, which reads the result matrices
+    ma = MaRiQAnalysis(sim, tolerance)
 
-    # 3) Return both total‐risk and single‐risk data
+    # 2) Return both total‐risk and single‐risk data
     return {
         "total": ma.compute_total(),
-        "single": ma.compute_single()
+        "single": ma.compute_single() if ma.mean_expected_loss is not None else None
     }
 
 def compute_morris(
     risks: List[Risk],
     N: int = 1000,
-    num_levels: int = 4
+    num_levels: int = 4,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Compute Morris sensitivity indices for a list of Risk objects.
@@ -236,6 +638,8 @@ def compute_morris(
         Number of trajectories / samples (default 1000).
     num_levels : int
         Number of grid levels for Morris (default 4).
+    seed : int, optional
+        Seed of the trajectory sampling and the bootstrap.
 
     Returns
     -------
@@ -243,12 +647,13 @@ def compute_morris(
         SALib result dict containing keys 'names','mu_star','mu_star_conf','sigma'.
     """
     sa = SensitivityAnalysis(risks)
-    return sa.morris_indices(N=N, num_levels=num_levels)
+    return sa.morris_indices(N=N, num_levels=num_levels, seed=seed)
 
 
 def compute_sobol(
     risks: List[Risk],
-    N: int = 1024
+    N: int = 1024,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Compute Sobol sensitivity indices for a list of Risk objects.
@@ -259,6 +664,8 @@ def compute_sobol(
         The original Risk instances used in simulate().
     N : int
         Number of base samples (must be a power of 2, default 1024).
+    seed : int, optional
+        Seed of the bootstrap confidence intervals.
 
     Returns
     -------
@@ -266,7 +673,7 @@ def compute_sobol(
         SALib result dict containing keys 'names','S1','S1_conf','ST','ST_conf'.
     """
     sa = SensitivityAnalysis(risks)
-    return sa.sobol_indices(N=N)
+    return sa.sobol_indices(N=N, seed=seed)
 
 
 def compute_single_risk(
@@ -294,27 +701,14 @@ def compute_single_risk(
           "exceedance": output of SingleRiskAnalysis.compute_exceedance
         }
     """
-    # 1) Rebuild the raw dict shape SingleRiskAnalysis expects
-    raw = {
-        "summary": {
-            "number_of_iterations": sim.summary["number_of_iterations"]
-        },
-        "results": [
-            {"id": rid, **data}
-            for rid, data in sim.results.items()
-        ]
-    }
-
-    # 2) Instantiate & find the index for our risk_id
-    sra = SingleRiskAnalysis(raw)
-    # build a map from id → index
-    id_list = [r["id"] for r in raw["results"]]
+    # 1) Instantiate & find the row of our risk_id
+    sra = SingleRiskAnalysis(sim)
     try:
-        idx = id_list.index(risk_id)
-    except ValueError:
+        idx = sra.columns.index[risk_id]
+    except KeyError:
         raise KeyError(f"Risk ID {risk_id!r} not found in SimulationResults")
 
-    # 3) Compute stats & exceedance
+    # 2) Compute stats & exceedance
     stats      = sra.compute_stats(idx)
     exceedance = sra.compute_exceedance(idx, num_bins=num_bins)
 
@@ -328,6 +722,5 @@ def compute_tornado(
     """
     Compute Tornado variation for a given attribute ('single_risk_impact', 'frequency', 'total').
     """
-    raw = {"results": [{"id": rid, **data} for rid, data in sim.results.items()]}
-    ta = TornadoAnalysis(raw)
+    ta = TornadoAnalysis(sim)
     return ta.compute_variation(attribute)
@@ -2,4 +2,5 @@ from .beta import Beta
 from .lognormal import Lognormal
 from .pert import PERT
 from .uniform import Uniform
-__all__ = ["Beta", "Lognormal", "PERT", "Uniform"]
+from .protocol import BufferedDistribution
+__all__ = ["Beta", "Lognormal", "PERT", "Uniform", "BufferedDistribution"]
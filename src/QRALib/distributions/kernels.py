@@ -0,0 +1,113 @@
+"""Fast percent point function (PPF) kernels for the built-in distributions.
+
+The frozen scipy distributions carry a noticeable overhead per ``ppf`` call
+and the beta inverse is slow at millions of points. These kernels are used by
+the quasi-random samplers and the sensitivity analysis:
+
+- lognormal: closed form through the normal inverse, ``exp(mu + sigma * ndtri(u))``
+- uniform: affine map, ``loc + scale * u``
+- beta (and PERT, a scaled beta): linear interpolation in a precomputed table
+  of the beta CDF, refined until the interpolation error is below a given
+  tolerance, with the exact inverse in the far upper tail
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import betainc, betaincinv, ndtri
+
+# default maximum error of the beta tables, relative to the support width
+DEFAULT_PPF_TOLERANCE = 1e-6
+
+# initial number of table intervals and maximum number of refinement passes
+_TABLE_INTERVALS = 256
+_MAX_REFINEMENTS = 40
+
+# points of every interval at which the interpolation error is checked
+_CHECK_POINTS = (0.25, 0.5, 0.75)
+
+# uniforms above 1 - _EXACT_TAIL are inverted exactly: close to 1 the CDF is
+# rounded to steps of 1.1e-16, too coarse to tabulate a steep inverse
+_EXACT_TAIL = 1e-9
+
+
+def lognormal_ppf(u: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    """
+    Inverse CDF of a lognormal distribution with log-mean ``mu`` and log-standard deviation ``sigma``.
+    """
+    return np.exp(mu + sigma * ndtri(u))
+
+
+def uniform_ppf(u: np.ndarray, loc: float, scale: float) -> np.ndarray:
+    """
+    Inverse CDF of the uniform distribution on ``[loc, loc + scale]``.
+    """
+    return loc + scale * np.asarray(u, dtype=float)
+
+
+class BetaPPFTable:
+    """
+    Tabulated inverse CDF of a standard beta distribution.
+
+    The table holds nodes ``(cdf(x), x)`` and evaluates the inverse by linear
+    interpolation. Nodes start evenly spaced in ``x``, which bounds the error
+    where the inverse is steep near the support ends. Every interval is then
+    checked at its quarter points ``x_q``: if the interpolated inverse of
+    ``cdf(x_q)`` misses ``x_q`` by more than half the ``tolerance``, the
+    interval is split at its midpoint, until no interval fails. The margin
+    covers the error between the checked points, which for shapes far below 1
+    peaks away from the midpoint. Only the (cheap) CDF is evaluated, and as
+    the inverse is monotone an interval narrower than ``tolerance`` never
+    needs splitting. Uniforms within ``1e-9`` of 1, where the CDF is too
+    coarsely rounded to tabulate, are inverted exactly.
+
+    :param alpha: First shape parameter
+    :type alpha: float
+    :param beta: Second shape parameter
+    :type beta: float
+    :param tolerance: Maximum absolute error on the support ``[0, 1]``
+    :type tolerance: float
+    """
+    def __init__(self, alpha: float, beta: float, tolerance: float = DEFAULT_PPF_TOLERANCE) -> None:
+        if tolerance <= 0:
+            raise ValueError(f"tolerance must be positive, got {tolerance}")
+        self.alpha = alpha
+        self.beta = beta
+        self.tolerance = tolerance
+        x = np.linspace(0.0, 1.0, _TABLE_INTERVALS + 1)
+        u = betainc(alpha, beta, x)
+        for _ in range(_MAX_REFINEMENTS):
+            width = np.diff(x)
+            du = u[1:] - u[:-1]
+            failed = np.zeros(width.size, dtype=bool)
+            for point in _CHECK_POINTS:
+                x_check = x[:-1] + point * width
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    x_interp = x[:-1] + (betainc(alpha, beta, x_check) - u[:-1]) / du * width
+                failed |= np.where(du > 0, np.abs(x_interp - x_check), 0.0) > tolerance / 2
+            split = np.flatnonzero(failed & (width > tolerance))
+            if not split.size:
+                break
+            x_mid = x[:-1][split] + width[split] / 2
+            order = np.argsort(np.concatenate((x, x_mid)), kind="stable")
+            x = np.concatenate((x, x_mid))[order]
+            u = np.concatenate((u, betainc(alpha, beta, x_mid)))[order]
+        # the cdf rounds to 0 or 1 over the far tails, keep one node per value
+        self.u, first = np.unique(u, return_index=True)
+        self.x = x[first]
+
+    def __len__(self) -> int:
+        return self.x.size
+
+    def __call__(self, u: np.ndarray) -> np.ndarray:
+        u = np.asarray(u)
+        x = np.interp(u, self.u, self.x)
+        if u.size and u.max() > 1 - _EXACT_TAIL:
+            tail = u > 1 - _EXACT_TAIL
+            x[tail] = betaincinv(self.alpha, self.beta, u[tail])
+        return x
+
+
+@lru_cache(maxsize=256)
+def beta_table(alpha: float, beta: float, tolerance: float = DEFAULT_PPF_TOLERANCE) -> BetaPPFTable:
+    """Shared ``BetaPPFTable`` for the given parameters, built on first use."""
+    return BetaPPFTable(alpha, beta, tolerance)
@@ -2,6 +2,11 @@ from scipy.stats import beta as beta_dist
 import numpy as np
 from typing import Optional
 
+from scipy.special import betaincinv
+
+from .kernels import DEFAULT_PPF_TOLERANCE, beta_table
+from .protocol import check_out, check_uniforms
+
 class PERT:
     """
     A model based on the Beta-PERT distribution for impact modelling.
@@ -40,17 +45,19 @@ class PERT:
 
         self.distribution = beta_dist(self.alpha, self.beta, loc=self.location, scale=self.scale)
 
-    def draw(self, n: int = 1) -> np.ndarray:
+    def draw(self, n: int = 1, random_state=None) -> np.ndarray:
         """
         Generate random samples from the Beta-PERT distribution.
 
         :param n: The number of samples to generate.
         :type n: int
+        :param random_state: Seed or numpy.random.Generator used for the draw
+        :type random_state: None, int or numpy.random.Generator
         :return: Array of size n with random values from the distribution.
         :rtype: numpy.ndarray
         """
 
-        return self.distribution.rvs(size=n)
+        return self.distribution.rvs(size=n, random_state=random_state)
 
     def draw_ppf(self, percentile_sequences: np.ndarray) -> np.ndarray:
         """
@@ -61,10 +68,71 @@ class PERT:
         :return: Array of the same size as the input with values from the distribution PPF
         :rtype: numpy.ndarray
         """
-        if not isinstance(percentile_sequences, np.ndarray) or not np.issubdtype(percentile_sequences.dtype, np.number) or not (0 <= percentile_sequences).all() or not (percentile_sequences <= 1).all():
-            raise ValueError("percentile_sequences must be a numpy array of numbers in the range [0, 1)")
+        check_uniforms(percentile_sequences, closed=True)
         return self.distribution.ppf(percentile_sequences)
 
+    def draw_into(self, out: np.ndarray, rng: np.random.Generator, trusted: bool = False) -> np.ndarray:
+        """
+        Fill ``out`` with random samples, identical to ``draw(out.size, random_state=rng)``.
+        NumPy has no in-place beta generator, the draws go through one temporary array.
+
+        :param out: Writeable float64 array receiving the samples
+        :type out: numpy.ndarray
+        :param rng: Generator used for the draw
+        :type rng: numpy.random.Generator
+        :param trusted: Skip the validation of ``out``
+        :type trusted: bool
+        :return: ``out``
+        :rtype: numpy.ndarray
+        """
+        if not trusted:
+            check_out(out)
+        out[...] = rng.beta(self.alpha, self.beta, size=out.shape)
+        np.multiply(out, self.scale, out=out)
+        return np.add(out, self.location, out=out)
+
+    def ppf_into(self, percentile_sequences: np.ndarray, out: np.ndarray, trusted: bool = False) -> np.ndarray:
+        """
+        Write the percent point function of ``percentile_sequences`` into ``out``.
+
+        :param percentile_sequences: Array of numbers in the range [0, 1]
+        :type percentile_sequences: numpy.ndarray
+        :param out: Writeable float array of the same shape
+        :type out: numpy.ndarray
+        :param trusted: Skip the validation of the arguments
+        :type trusted: bool
+        :return: ``out``
+        :rtype: numpy.ndarray
+        """
+        if not trusted:
+            check_uniforms(percentile_sequences, out, closed=True)
+        betaincinv(self.alpha, self.beta, percentile_sequences, out=out)
+        np.multiply(out, self.scale, out=out)
+        return np.add(out, self.location, out=out)
+
+    def fast_ppf(self, percentile_sequences: np.ndarray, tolerance: float = DEFAULT_PPF_TOLERANCE) -> np.ndarray:
+        """
+        Percent point function interpolated in a precomputed table of the
+        underlying beta distribution, without input validation.
+
+        :param percentile_sequences: Array of numbers in the range [0, 1)
+        :type percentile_sequences: numpy.ndarray
+        :param tolerance: Maximum error of the returned values, relative to ``maximum - minimum``
+        :type tolerance: float
+        :return: Array of the same size as the input with values from the distribution PPF
+        :rtype: numpy.ndarray
+        """
+        return self.location + self.scale * beta_table(self.alpha, self.beta, tolerance)(percentile_sequences)
+
+    def parameters(self) -> dict:
+        """
+        Return the constructor parameters of the Beta-PERT distribution.
+
+        :return: Dictionary with the keys ``minimum``, ``mid`` and ``maximum``.
+        :rtype: dict
+        """
+        return {"minimum": self.min, "mid": self.mid, "maximum": self.max}
+
     def mean(self, round_to: Optional[int] = None) -> np.float64:
         """
         Calculate the mean value of the Beta-PERT distribution.
@@ -0,0 +1,55 @@
+"""Buffer protocol for distributions.
+
+``draw`` and ``draw_ppf`` return new arrays. Distributions implementing
+``BufferedDistribution`` can also write into arrays owned by the caller:
+
+- ``draw_into(out, rng, trusted=False)`` fills ``out`` with random draws from
+  the ``numpy.random.Generator`` ``rng``; for the built-in distributions the
+  values are identical to ``draw(out.size, random_state=rng)``.
+- ``ppf_into(u, out, trusted=False)`` writes the percent point function of
+  ``u`` into ``out``.
+
+Both return ``out``. Unless ``trusted`` is set, the arguments are validated
+first; trusted calls skip every check, for engines that own and size the
+buffers themselves.
+"""
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+
+@runtime_checkable
+class BufferedDistribution(Protocol):
+    def draw_into(self, out: np.ndarray, rng: np.random.Generator, trusted: bool = False) -> np.ndarray:
+        ...
+
+    def ppf_into(self, u: np.ndarray, out: np.ndarray, trusted: bool = False) -> np.ndarray:
+        ...
+
+
+def check_out(out: np.ndarray) -> None:
+    """
+    :raises ValueError: If ``out`` is not a writeable, C-contiguous float64 numpy array
+    """
+    if (not isinstance(out, np.ndarray) or out.dtype != np.float64
+            or not out.flags.writeable or not out.flags.c_contiguous):
+        raise ValueError("out must be a writeable, C-contiguous numpy array of float64")
+
+
+def check_uniforms(u: np.ndarray, out: np.ndarray = None, closed: bool = False) -> None:
+    """
+    Validate percentiles in a single pass per bound.
+
+    :param closed: Accept 1, i.e. check ``[0, 1]`` instead of ``[0, 1)``
+    :raises ValueError: If ``u`` is not a numeric array in range, or does not match ``out``
+    """
+    interval = "[0, 1]" if closed else "[0, 1)"
+    if not isinstance(u, np.ndarray) or not np.issubdtype(u.dtype, np.number):
+        raise ValueError(f"percentile_sequences must be a numpy array of numbers in the range {interval}")
+    # written so that NaN bounds fail as well
+    if u.size and not (u.min() >= 0 and (u.max() <= 1 if closed else u.max() < 1)):
+        raise ValueError(f"percentile_sequences must be a numpy array of numbers in the range {interval}")
+    if out is not None:
+        check_out(out)
+        if out.shape != u.shape:
+            raise ValueError(f"out has shape {out.shape}, expected {u.shape}")
@@ -3,6 +3,9 @@
 from scipy.stats import uniform
 import numpy as np
 
+from .kernels import uniform_ppf
+from .protocol import check_out, check_uniforms
+
 class Uniform:
     def __init__(self, low_bound: float, up_bound: float) -> None:
         """
@@ -42,16 +45,18 @@ class Uniform:
         self.scale = max_val - min_val
         self.distribution = uniform(self.loc, self.scale)
 
-    def draw(self, n: int = 1) -> np.ndarray:
+    def draw(self, n: int = 1, random_state=None) -> np.ndarray:
         """
         Generate random samples from the uniform distribution.
 
         :param n: Number of samples to return
         :type n: int
+        :param random_state: Seed or numpy.random.Generator used for the draw
+        :type random_state: None, int or numpy.random.Generator
         :return: Array of size n with random values from distribution
         :rtype: numpy.ndarray
         """
-        return self.distribution.rvs(size=n)
+        return self.distribution.rvs(size=n, random_state=random_state)
 
     def draw_ppf(self, percentile_sequences: np.ndarray) -> np.ndarray:
         """
@@ -62,10 +67,67 @@ class Uniform:
         :return: Array of the same size as the input with values from the distribution PPF
         :rtype: numpy.ndarray
         """
-        if not isinstance(percentile_sequences, np.ndarray) or not np.issubdtype(percentile_sequences.dtype, np.number) or not (0 <= percentile_sequences).all() or not (percentile_sequences < 1).all():
-            raise ValueError("percentile_sequences must be a numpy array of numbers in the range [0, 1)")
+        check_uniforms(percentile_sequences)
         return self.distribution.ppf(percentile_sequences)
 
+    def draw_into(self, out: np.ndarray, rng: np.random.Generator, trusted: bool = False) -> np.ndarray:
+        """
+        Fill ``out`` with random samples, identical to ``draw(out.size, random_state=rng)``.
+
+        :param out: Writeable float64 array receiving the samples
+        :type out: numpy.ndarray
+        :param rng: Generator used for the draw
+        :type rng: numpy.random.Generator
+        :param trusted: Skip the validation of ``out``
+        :type trusted: bool
+        :return: ``out``
+        :rtype: numpy.ndarray
+        """
+        if not trusted:
+            check_out(out)
+        rng.random(out=out)
+        np.multiply(out, self.scale, out=out)
+        return np.add(out, self.loc, out=out)
+
+    def ppf_into(self, percentile_sequences: np.ndarray, out: np.ndarray, trusted: bool = False) -> np.ndarray:
+        """
+        Write the percent point function of ``percentile_sequences`` into ``out``.
+
+        :param percentile_sequences: Array of numbers in the range [0, 1)
+        :type percentile_sequences: numpy.ndarray
+        :param out: Writeable float array of the same shape
+        :type out: numpy.ndarray
+        :param trusted: Skip the validation of the arguments
+        :type trusted: bool
+        :return: ``out``
+        :rtype: numpy.ndarray
+        """
+        if not trusted:
+            check_uniforms(percentile_sequences, out)
+        np.multiply(percentile_sequences, self.scale, out=out)
+        return np.add(out, self.loc, out=out)
+
+    def fast_ppf(self, percentile_sequences: np.ndarray) -> np.ndarray:
+        """
+        Percent point function as an affine map, ``loc + scale * u``, without
+        the overhead of the scipy distribution or input validation.
+
+        :param percentile_sequences: Array of numbers in the range [0, 1)
+        :type percentile_sequences: numpy.ndarray
+        :return: Array of the same size as the input with values from the distribution PPF
+        :rtype: numpy.ndarray
+        """
+        return uniform_ppf(percentile_sequences, self.loc, self.scale)
+
+    def parameters(self) -> dict:
+        """
+        Return the constructor parameters of the uniform distribution.
+
+        :return: Dictionary with the keys ``low_bound`` and ``up_bound``
+        :rtype: dict
+        """
+        return {"low_bound": self.low_bound, "up_bound": self.up_bound}
+
     def mean(self) -> np.float64:
         """
         Calculate the mean value of the uniform distribution.
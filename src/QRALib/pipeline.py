@@ -2,11 +2,16 @@
 # ----------------------
 import os
 
+import numpy as np
+
 from .utils.importer import RiskDataImporter
 from .risk import RiskPortfolio
 from .simulation.smc import StandardMonteCarlo
 from .simulation.qmc import QuasiMonteCarlo
 from .simulation.rmc import RandomQuasiMonteCarlo
+from .simulation.matrix import MatrixMonteCarlo
+from .simulation.incremental import incremental_simulation, risk_fingerprints
+from .simulation.columnar import as_columnar
 from .analysis.mariq import MaRiQAnalysis
 from .analysis.sensitivity_analysis import SensitivityAnalysis
 from .analysis.tornado import TornadoAnalysis
@@ -17,37 +22,96 @@ class QRAPipeline:
     """
     Pipeline for Quantitative Risk Analysis:
       - import data
-      - run simulation (SMC, QMC, RQMC)
+      - run simulation (SMC, QMC, RQMC, matrix)
       - perform analyses (MaRiQ, sensitivity, tornado, single risk)
     """
     SIMULATORS = {
         "smc": StandardMonteCarlo,
         "qmc": QuasiMonteCarlo,
         "rqmc": RandomQuasiMonteCarlo,
+        "matrix": MatrixMonteCarlo,
     }
 
-    def __init__(self, source: str, method: str = "smc", iterations: int = 10000):
+    def __init__(self, source: str, method: str = "smc", iterations: int = 10000, seed=None, executor=None,
+                 backend="auto", max_workers=None, dtype="float64",
+                 detail="full"):
         self.source = source
         self.method = method
         self.iterations = iterations
+        self.seed = seed
+        self.executor = executor
+        self.backend = backend
+        self.max_workers = max_workers
+        self.dtype = dtype
+        self.detail = detail
         self.portfolio = RiskPortfolio(RiskDataImporter.import_risks(source))
         self.results = None
+        # risk ID -> fingerprint of the risks of ``results``
+        self.fingerprints = None
+        self._mariq = None
+
+    def reload(self, source=None):
+        """Import the risk register again, e.g. after it was edited, keeping the results."""
+        if source is not None:
+            self.source = source
+        self.portfolio = RiskPortfolio(RiskDataImporter.import_risks(self.source))
+        return self.portfolio
+
+    def run_simulation(self, incremental=False):
+        """
+        Simulate the portfolio.
 
-    def run_simulation(self):
+        With ``incremental=True`` and the 'smc' method, only the risks added or
+        changed since the previous run are simulated, under its seed, and the
+        rows of the other risks are reused; the results are identical to a full
+        run. A MaRiQ analysis of the previous results is updated in place.
+        ``results["summary"]["resimulated"]`` lists the simulated risk IDs.
+        """
         sim_cls = self.SIMULATORS.get(self.method)
         if not sim_cls:
             raise ValueError(f"Unknown method '{self.method}'. Choose from {list(self.SIMULATORS)}")
-        simulator = sim_cls(self.portfolio)
-        self.results = simulator.simulation(self.iterations)
+        previous = self.results if incremental else None
+        seed = self.seed if previous is None or self.seed is not None else previous["summary"]["seed"]
+        simulator = sim_cls(
+            self.portfolio, seed=seed, executor=self.executor,
+            backend=self.backend, max_workers=self.max_workers, dtype=self.dtype,
+            detail=self.detail
+        )
+        if previous is None:
+            self.results = simulator.simulation(self.iterations)
+            self._mariq = None
+        else:
+            self.results = incremental_simulation(simulator, previous, self.fingerprints, self.iterations)
+            if self._mariq is not None:
+                ids = set(self.results["summary"]["resimulated"])
+                rows = [row for row, risk in enumerate(self.portfolio) if risk.uniq_id in ids]
+                self._mariq.update(self.results, rows)
+        self.fingerprints = risk_fingerprints(self.portfolio)
         return self.results
 
-    def analyze_mariq(self, tolerance):
+    def _require(self, analysis, fields):
+        """Check that the results keep ``fields`` per iteration, which depends on ``detail``."""
         if self.results is None:
             raise RuntimeError("Simulation must be run before analysis.")
-        analysis = MaRiQAnalysis(self.results, tolerance)
+        missing = [f for f in fields if f not in as_columnar(self.results).fields]
+        if missing:
+            raise ValueError(
+                f"The {analysis} analysis needs {', '.join(missing)} per iteration, "
+                f"which detail={self.detail!r} does not keep"
+            )
+
+    def analyze_mariq(self, tolerance):
+        """
+        MaRiQ analysis of the results. ``"single"`` is None for results
+        simulated with detail="totals", which keep the total of every risk only.
+        """
+        self._require("MaRiQ", ["total"])
+        analysis = self._mariq
+        if analysis is None or not _same_tolerance(analysis.tolerance, tolerance):
+            analysis = self._mariq = MaRiQAnalysis(self.results, tolerance)
         return {
             "total": analysis.compute_total(),
-            "single": analysis.compute_single()
+            "single": analysis.compute_single() if analysis.mean_expected_loss is not None else None
         }
 
     def analyze_sensitivity(self, morris_samples: int = 1000, sobol_n: int = 1024):
@@ -57,15 +121,17 @@ class QRAPipeline:
         return {"morris": morris, "sobol": sobol}
 
     def analyze_tornado(self, attribute: str = "total"):
-        if self.results is None:
-            raise RuntimeError("Simulation must be run before analysis.")
+        self._require("tornado", [attribute])
         ta = TornadoAnalysis(self.results)
         return ta.compute_variation(attribute)
 
     def analyze_single_risk(self, risk_index: int):
-        if self.results is None:
-            raise RuntimeError("Simulation must be run before analysis.")
+        self._require("single risk", ["frequency", "single_risk_impact", "total"])
         sra = SingleRiskAnalysis(self.results)
         stats = sra.compute_stats(risk_index)
         exceedance = sra.compute_exceedance(risk_index)
         return {"stats": stats, "exceedance": exceedance}
+
+
+def _same_tolerance(a, b):
+    return all(np.array_equal(x, y) for x, y in zip(a, b))
@@ -1,4 +1,8 @@
 """Container for risk event"""
+import hashlib
+import json
+import pickle
+
 import numpy as np
 
 class Risk:
@@ -28,7 +32,7 @@ class Risk:
         self.impact_group = impact_group
         self.impact_model = impact_model
 
-    def get_impact(self, n: int = 1) -> np.ndarray:
+    def get_impact(self, n: int = 1, random_state=None) -> np.ndarray:
         """
         Returns an array of n random samples drawn from the impact distribution.
 
@@ -36,6 +40,8 @@ class Risk:
         ----------
         n : int, optional
             Number of samples to generate (default is 1). Must be positive.
+        random_state : None, int or numpy.random.Generator, optional
+            Source of randomness for the draw (default is the global state).
 
         Returns
         -------
@@ -50,9 +56,9 @@ class Risk:
         if n <= 0:
             raise ValueError(f"Sample size n must be positive, got {n}")
 
-        return self.impact_model.draw(n)
+        return self.impact_model.draw(n, random_state=random_state)
 
-    def get_frequency(self, n: int = 1) -> np.ndarray:
+    def get_frequency(self, n: int = 1, random_state=None) -> np.ndarray:
         """
         Returns an array of n random samples drawn from the frequency distribution.
 
@@ -60,6 +66,8 @@ class Risk:
         ----------
         n : int, optional
             Number of samples to generate (default is 1). Must be positive.
+        random_state : None, int or numpy.random.Generator, optional
+            Source of randomness for the draw (default is the global state).
 
         Returns
         -------
@@ -74,9 +82,9 @@ class Risk:
         if n <= 0:
             raise ValueError(f"Sample size n must be positive, got {n}")
 
-        return self.frequency_model.draw(n)
+        return self.frequency_model.draw(n, random_state=random_state)
 
-    def get_impact_ppf(self, n) -> np.ndarray:
+    def get_impact_ppf(self, n, fast: bool = False) -> np.ndarray:
         """
         Draw samples from the impact distribution using the percent-point function (inverse CDF).
 
@@ -84,6 +92,9 @@ class Risk:
         ----------
         n : int or array-like
         Number of samples to generate (if scalar) or array of quantiles in [0,1).
+        fast : bool, optional
+        Use the ``fast_ppf`` kernel of the distribution when it has one: a
+        closed form, or a table with a bounded interpolation error.
 
         Returns
         -------
@@ -100,9 +111,9 @@ class Risk:
         arr = np.asarray(n)
         if np.any(arr < 0) or np.any(arr >= 1):
             raise ValueError(f"Quantiles must be in [0, 1), got {arr}")
-        return self.impact_model.draw_ppf(arr)
+        return _ppf(self.impact_model, arr, fast)
 
-    def get_frequency_ppf(self, n) -> np.ndarray:
+    def get_frequency_ppf(self, n, fast: bool = False) -> np.ndarray:
         """
         Draw samples from the frequency distribution using the percent-point function (inverse CDF).
 
@@ -110,6 +121,9 @@ class Risk:
         ----------
         n : int or array-like
             Number of samples to generate (if scalar) or array of quantiles in [0,1).
+        fast : bool, optional
+            Use the ``fast_ppf`` kernel of the distribution when it has one: a
+            closed form, or a table with a bounded interpolation error.
 
         Returns
         -------
@@ -126,4 +140,57 @@ class Risk:
         # If scalar, we still get a 0-d array, so this covers both cases
         if np.any(arr < 0) or np.any(arr >= 1):
             raise ValueError(f"Quantiles must be in [0, 1), got {arr}")
-        return self.frequency_model.draw_ppf(arr)
+        return _ppf(self.frequency_model, arr, fast)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the risk definition in the nested form read by ``RiskDataImporter``.
+
+        Returns
+        -------
+        dict
+            ``{"ID", "name", "frequency": {"distribution", "parameters"}, "impact": {...}}``.
+            ``parameters`` is None for distributions without a ``parameters()`` method.
+        """
+        return {
+            "ID": self.uniq_id,
+            "name": self.name,
+            "frequency": {
+                "distribution": self.frequency_group,
+                "parameters": _model_parameters(self.frequency_model),
+            },
+            "impact": {
+                "distribution": self.impact_group,
+                "parameters": _model_parameters(self.impact_model),
+            },
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Returns a content hash of the risk definition.
+
+        Two risks with the same ID, name, distributions and parameters share the
+        same fingerprint. Distributions without a ``parameters()`` method are
+        hashed from their pickled form.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest.
+        """
+        definition = self.to_dict()
+        for part, model in (("frequency", self.frequency_model), ("impact", self.impact_model)):
+            if definition[part]["parameters"] is None:
+                definition[part]["pickle"] = hashlib.sha256(pickle.dumps(model)).hexdigest()
+        payload = json.dumps(definition, sort_keys=True, default=float)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _model_parameters(model):
+    parameters = getattr(model, "parameters", None)
+    return dict(parameters()) if callable(parameters) else None
+
+
+def _ppf(model, arr, fast):
+    fast_ppf = getattr(model, "fast_ppf", None) if fast else None
+    return fast_ppf(arr) if callable(fast_ppf) else model.draw_ppf(arr)
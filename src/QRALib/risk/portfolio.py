@@ -1,5 +1,6 @@
 # src/QRALib/risk/portfolio.py
 
+import hashlib
 from typing import List, Iterator, Union
 from .model import Risk
 
@@ -39,6 +40,13 @@ class RiskPortfolio:
         """Serialize all risks to dict form."""
         return [r.to_dict() for r in self._risks]
 
+    def fingerprint(self) -> str:
+        """Content hash of the ordered risk definitions."""
+        digest = hashlib.sha256()
+        for r in self._risks:
+            digest.update(r.fingerprint().encode("ascii"))
+        return digest.hexdigest()
+
     def lookup(self, key: Union[int, str]) -> dict:
         """Fetch a single risk as a dict, by index or ID."""
         return self[key].to_dict()
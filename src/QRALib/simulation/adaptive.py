@@ -0,0 +1,147 @@
+"""Adaptive number of iterations, driven by precision targets.
+
+Instead of a fixed ``num_of_iter``, the run is simulated in batches and
+extended (see ``extend_simulation``) until the portfolio estimates are precise
+enough:
+
+- ``ale_rel_se``: relative standard error of the portfolio ALE (mean total
+  loss per iteration), ``std / sqrt(n) / mean``
+- ``var_ci_width``: width of the confidence interval of the portfolio VaR at
+  ``quantile`` (the 99th percentile read by ``MaRiQAnalysis.compute_total``)
+- ``var_rel_ci_width``: the same width relative to the VaR
+
+The VaR interval is the distribution-free interval between the order
+statistics ``n q -+ z sqrt(n q (1 - q))``. All three shrink as ``1 / sqrt(n)``,
+which sizes the next batch from the shortfall of the current one. The run stops
+once every target is met or ``max_iterations`` is reached, and reports the
+achieved precision. For the QMC engines the estimates assume independent
+iterations and are conservative.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .columnar import as_columnar
+
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_MAX_ITERATIONS = 1_000_000
+
+# overshoot of the projected number of iterations, so that a projection that
+# is slightly too low does not cost another batch
+_MARGIN = 1.1
+
+
+def portfolio_precision(total: np.ndarray, quantile: float = 0.99, confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Precision of the portfolio ALE and VaR estimated from the portfolio total of every iteration.
+
+    :param total: Portfolio total loss per iteration
+    :param quantile: Quantile of the VaR
+    :param confidence: Confidence level of the VaR interval
+    :return: Dictionary with ``iterations``, ``ale``, ``ale_std_error``, ``ale_rel_se``,
+        ``var``, ``var_ci`` (lower and upper bound), ``var_ci_width`` and ``var_rel_ci_width``
+    """
+    n = total.size
+    ale = float(total.mean(dtype=np.float64))
+    std_error = float(total.std(dtype=np.float64, ddof=1) / math.sqrt(n)) if n > 1 else math.inf
+    var = float(np.percentile(total, 100 * quantile))
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half = z * math.sqrt(n * quantile * (1 - quantile))
+    lo = min(max(math.floor(n * quantile - half) - 1, 0), n - 1)
+    hi = min(max(math.ceil(n * quantile + half) - 1, 0), n - 1)
+    bounds = np.partition(total, (lo, hi))[[lo, hi]] if lo != hi else np.array([total.min(), total.max()])
+    width = float(bounds[1] - bounds[0])
+    return {
+        "iterations": n,
+        "ale": ale,
+        "ale_std_error": std_error,
+        "ale_rel_se": std_error / abs(ale) if ale else math.inf,
+        "var": var,
+        "var_ci": [float(bounds[0]), float(bounds[1])],
+        "var_ci_width": width,
+        "var_rel_ci_width": width / abs(var) if var else math.inf,
+    }
+
+
+def shortfall(precision: Dict[str, Any], targets: Dict[str, Optional[float]]) -> float:
+    """
+    Factor by which the number of iterations must grow to meet every target,
+    at most 1 once they are all met.
+    """
+    factors = [(precision[name] / target) ** 2 for name, target in targets.items() if target is not None]
+    return max(factors, default=0.0)
+
+
+def adaptive_simulation(
+    simulator,
+    ale_rel_se: Optional[float] = 0.01,
+    var_ci_width: Optional[float] = None,
+    var_rel_ci_width: Optional[float] = None,
+    quantile: float = 0.99,
+    confidence: float = 0.95,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    on_block: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Simulate in batches until the precision targets are met.
+
+    A batch never more than doubles the run, and at least ``batch_size``
+    iterations are added per batch until ``max_iterations``.
+
+    :param simulator: Any simulator, with ``detail`` ``"full"`` or ``"totals"``
+    :param ale_rel_se: Target relative standard error of the portfolio ALE, None for no target
+    :param var_ci_width: Target width of the VaR confidence interval, None for no target
+    :param var_rel_ci_width: Target width of the VaR confidence interval relative to the VaR
+    :param quantile: Quantile of the VaR
+    :param confidence: Confidence level of the VaR interval
+    :param batch_size: Iterations of the first batch, and minimum of the following ones
+    :param max_iterations: Hard cap on the number of iterations
+    :param on_block: Called with every simulated batch, e.g. to checkpoint it
+    :return: Nested dictionary as returned by ``simulation()``. ``summary["precision"]``
+        holds the achieved precision (see ``portfolio_precision``), the ``targets``,
+        ``quantile``, ``confidence`` and whether the run ``converged``.
+    :raises ValueError: If no target is set, a target is not positive, or the detail is ``"summary"``
+    """
+    targets = {"ale_rel_se": ale_rel_se, "var_ci_width": var_ci_width, "var_rel_ci_width": var_rel_ci_width}
+    if all(target is None for target in targets.values()):
+        raise ValueError("Set at least one of ale_rel_se, var_ci_width and var_rel_ci_width")
+    if any(target is not None and target <= 0 for target in targets.values()):
+        raise ValueError(f"Precision targets must be positive, got {targets}")
+    if not 0 < quantile < 1 or not 0 < confidence < 1:
+        raise ValueError("quantile and confidence must be in (0, 1)")
+    if batch_size <= 0 or max_iterations <= 0:
+        raise ValueError("batch_size and max_iterations must be positive")
+    if simulator.detail == "summary":
+        raise ValueError("Adaptive runs need the totals of every iteration, use detail='full' or 'totals'")
+
+    totals = []
+
+    def add_block(block: Dict[str, Any]) -> None:
+        totals.append(as_columnar(block).sum_rows("total"))
+        if on_block is not None:
+            on_block(block)
+
+    raw = simulator.simulation(min(batch_size, max_iterations))
+    raw["summary"]["first_iteration"] = 0
+    add_block(raw)
+    del raw["summary"]["first_iteration"]
+    while True:
+        total = np.concatenate(totals) if len(totals) > 1 else totals[0]
+        totals = [total]
+        precision = portfolio_precision(total, quantile, confidence)
+        factor = shortfall(precision, targets)
+        n = total.size
+        if factor <= 1 or n >= max_iterations:
+            break
+        needed = math.ceil(n * factor * _MARGIN) if math.isfinite(factor) else 2 * n
+        raw = simulator.extend(raw, min(max(needed - n, batch_size), n, max_iterations - n), on_block=add_block)
+
+    raw["summary"]["precision"] = dict(
+        precision, targets=targets, quantile=quantile, confidence=confidence, converged=factor <= 1
+    )
+    return raw
@@ -0,0 +1,98 @@
+"""Execution backends for the per-risk simulation tasks.
+
+``serial``
+    Run every task in the calling thread.
+``threads``
+    Run tasks on a thread pool. NumPy, SciPy and torch release the GIL in
+    their array kernels, and nothing has to be pickled.
+``processes``
+    Run tasks on joblib worker processes, writing into shared memory.
+``auto``
+    Pick one of the above from the portfolio size and the iteration count.
+    On a free-threaded interpreter (e.g. ``python3.13t``) threads run the
+    tasks truly in parallel, so ``auto`` never starts processes there.
+
+The simulators keep no per-call state on the instance and every task draws
+from its own seeded generators, so one simulator may be used from several
+threads at once.
+
+The number of workers is capped by ``max_workers`` and by the CPUs actually
+available to the process (affinity and container CPU quota).
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+import joblib
+from joblib import Parallel, delayed
+
+BACKENDS = ("auto", "serial", "threads", "processes")
+
+# backends of the engines that run the whole portfolio in the calling thread
+IN_PROCESS = ("auto", "serial")
+
+# False on free-threaded builds running with the GIL disabled
+GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# ``auto`` thresholds, in risk-iterations (n_risks * num_of_iter)
+SERIAL_WORK = 200_000
+THREAD_WORK = 20_000_000
+
+
+def check_backend(backend: str, supported: Sequence[str] = BACKENDS) -> str:
+    """
+    Return ``backend`` if it is one of ``supported``.
+
+    :raises ValueError: If ``backend`` is unknown or not in ``supported``
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, choose from {list(BACKENDS)}")
+    if backend not in supported:
+        raise ValueError(f"Backend {backend!r} is not supported by this engine, choose from {list(supported)}")
+    return backend
+
+
+def available_workers(max_workers: Optional[int] = None) -> int:
+    """
+    Number of workers to use: the CPUs available to this process (honouring
+    affinity and cgroup CPU quotas), capped by ``max_workers``.
+    """
+    cpus = max(1, joblib.cpu_count(only_physical_cores=False))
+    if max_workers is not None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be positive, got {max_workers}")
+        cpus = min(cpus, max_workers)
+    return cpus
+
+
+def resolve_backend(backend: str, n_risks: int, num_of_iter: int, n_workers: int) -> str:
+    """
+    Return the concrete backend for a run.
+
+    ``auto`` runs serially when there is a single worker or little work, on
+    threads for moderate work, and on processes beyond that unless the GIL is
+    disabled.
+    """
+    if check_backend(backend) != "auto":
+        return backend
+    work = n_risks * num_of_iter
+    if n_workers == 1 or n_risks == 1 or work <= SERIAL_WORK:
+        return "serial"
+    if work <= THREAD_WORK or not GIL_ENABLED:
+        return "threads"
+    return "processes"
+
+
+def run_tasks(
+    backend: str, n_workers: int, task: Callable, risks: Sequence[Any], args: Sequence[tuple]
+) -> List[Any]:
+    """Run ``task(risk, *args[row])`` for every risk on ``backend``, in risk order."""
+    if backend == "serial" or n_workers == 1:
+        return [task(risk, *a) for risk, a in zip(risks, args)]
+    if backend == "threads":
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            return list(pool.map(lambda pair: task(pair[0], *pair[1]), zip(risks, args)))
+    if backend == "processes":
+        return Parallel(n_jobs=n_workers)(delayed(task)(risk, *a) for risk, a in zip(risks, args))
+    check_backend(backend, ("serial", "threads", "processes"))
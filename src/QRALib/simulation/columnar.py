@@ -0,0 +1,252 @@
+"""Column-oriented storage of simulation results.
+
+The simulators fill one ``(n_risks, num_of_iter)`` matrix per result field and
+hand out per-risk rows of it. ``ColumnarResults`` keeps those matrices
+together with the risk IDs, so analyses can work on a whole field at once
+instead of stacking the rows again, while indexing by risk ID still gives the
+familiar per-risk dictionary, as views into the matrices.
+
+The matrices may be memory-mapped files (see ``SimulationResults.load``). The
+block helpers walk them a bounded number of bytes at a time and drop the pages
+they read from the process afterwards, so reductions over a run larger than
+memory keep a bounded resident set. Their results do not depend on the block
+size, and are identical to those of the same reductions over in-memory arrays.
+"""
+
+import mmap
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# default size of the blocks read at a time by the block helpers
+DEFAULT_BLOCK_BYTES = 64 * 2**20
+
+
+class ColumnarResults(Mapping):
+    """
+    Simulation results as one contiguous array per field, with an ID -> row index.
+
+    The per-iteration fields are ``(n_risks, num_of_iter)`` matrices, the
+    statistics of the ``"summary"`` detail level ``(n_risks,)`` vectors. The
+    flat event impacts, whose number differs per risk, are one array holding
+    the events risk by risk, with ``offsets[row]:offsets[row + 1]`` the events
+    of a risk.
+
+    ``results[risk_id]`` returns a dictionary of views into the arrays, so
+    it reads like the per-risk dictionaries of the simulators; ``rows()``
+    returns those dictionaries in row order, with their ``"id"``.
+
+    :param risk_ids: Risk IDs in row order
+    :param matrices: Field -> array with one row per risk, or the flat ``"impact"`` array
+    :param offsets: Offsets of each risk's events in ``matrices["impact"]``, of length ``n_risks + 1``
+    """
+    def __init__(
+        self, risk_ids: Sequence[str], matrices: Dict[str, np.ndarray], offsets: Optional[np.ndarray] = None
+    ) -> None:
+        self.risk_ids = list(risk_ids)
+        self.index = {rid: row for row, rid in enumerate(self.risk_ids)}
+        if len(self.index) != len(self.risk_ids):
+            raise ValueError("Risk IDs must be unique")
+        if ("impact" in matrices) != (offsets is not None):
+            raise ValueError("The flat impact array and its offsets go together")
+        for field, matrix in matrices.items():
+            if field != "impact" and matrix.shape[0] != len(self.risk_ids):
+                raise ValueError(f"{field} has {matrix.shape[0]} rows, expected {len(self.risk_ids)}")
+        self.matrices = dict(matrices)
+        self.offsets = offsets
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "ColumnarResults":
+        """
+        Stack per-risk dictionaries with an ``"id"`` key, as listed by the simulators.
+        """
+        return cls._stack([r["id"] for r in rows], rows)
+
+    @classmethod
+    def from_mapping(cls, results: Mapping[str, Dict[str, Any]]) -> "ColumnarResults":
+        """
+        Stack a risk ID -> per-risk dictionary mapping.
+        """
+        if isinstance(results, cls):
+            return results
+        return cls._stack(list(results), list(results.values()))
+
+    @classmethod
+    def _stack(cls, risk_ids: List[str], rows: Sequence[Dict[str, Any]]) -> "ColumnarResults":
+        fields = [f for f in (rows[0] if rows else {}) if f != "id"]
+        matrices, offsets = {}, None
+        for field in fields:
+            values = [r[field] for r in rows]
+            if field == "impact":
+                matrices[field] = np.concatenate(values) if values else np.empty(0)
+                offsets = np.concatenate(([0], np.cumsum([np.size(v) for v in values], dtype=np.int64)))
+            else:
+                matrices[field] = np.stack([np.asarray(v) for v in values])
+        return cls(risk_ids, matrices, offsets)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.matrices)
+
+    @property
+    def num_of_iter(self) -> int:
+        """Number of iterations, 0 for summary statistics."""
+        for field, matrix in self.matrices.items():
+            if field != "impact":
+                return matrix.shape[1] if matrix.ndim > 1 else 0
+        return 0
+
+    def matrix(self, field: str) -> np.ndarray:
+        """
+        The array of ``field``, one row per risk (flat for ``"impact"``).
+
+        :raises KeyError: If the field was not kept (see the ``detail`` levels)
+        """
+        try:
+            return self.matrices[field]
+        except KeyError:
+            raise KeyError(f"Field {field!r} is not in these results, they hold {self.fields}") from None
+
+    def impact(self, row: int) -> np.ndarray:
+        """Flat event impacts of the risk in ``row``."""
+        return self.matrices["impact"][self.offsets[row]:self.offsets[row + 1]]
+
+    def row(self, row: int) -> Dict[str, np.ndarray]:
+        """Views of every field of the risk in ``row``."""
+        return {
+            field: self.impact(row) if field == "impact" else matrix[row]
+            for field, matrix in self.matrices.items()
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Per-risk dictionaries with their ``"id"``, in row order."""
+        return [{"id": rid, **self.row(row)} for row, rid in enumerate(self.risk_ids)]
+
+    def row_blocks(self, field: str, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Consecutive row blocks of the matrix of ``field`` as ``(first_row, block)``
+        pairs, each block of at most ``block_bytes`` (one row at least).
+        Memory-mapped pages are released after each block.
+        """
+        matrix = self.matrix(field)
+        row_bytes = max(matrix[:1].nbytes, 1)
+        step = max(1, block_bytes // row_bytes)
+        for lo in range(0, matrix.shape[0], step):
+            yield lo, matrix[lo:lo + step]
+            release(matrix)
+
+    def impact_blocks(self, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Iterator[Tuple[int, int]]:
+        """
+        Consecutive ``(first_row, stop_row)`` ranges whose flat impacts hold at
+        most ``block_bytes`` (one row at least). Memory-mapped pages are
+        released after each range.
+        """
+        impact = self.matrix("impact")
+        per_event = impact.itemsize
+        lo = 0
+        while lo < len(self):
+            limit = self.offsets[lo] + max(block_bytes // per_event, 1)
+            hi = max(lo + 1, int(np.searchsorted(self.offsets, limit, side="right")) - 1)
+            hi = min(hi, len(self))
+            yield lo, hi
+            release(impact)
+            lo = hi
+
+    def sum_rows(self, field: str, block_bytes: int = DEFAULT_BLOCK_BYTES) -> np.ndarray:
+        """
+        Sum of the rows of ``field`` in float64, e.g. the portfolio total per
+        iteration. Rows are added one after the other, as
+        ``matrix.sum(axis=0, dtype=np.float64)`` does.
+        """
+        matrix = self.matrix(field)
+        total = np.zeros(matrix.shape[1:], dtype=np.float64)
+        for _, block in self.row_blocks(field, block_bytes):
+            for row in block:
+                np.add(total, row, out=total)
+        return total
+
+    def row_means(self, field: str, block_bytes: int = DEFAULT_BLOCK_BYTES) -> np.ndarray:
+        """Mean of every row of ``field`` in float64, block by block."""
+        return np.concatenate([
+            block.mean(axis=1, dtype=np.float64) for _, block in self.row_blocks(field, block_bytes)
+        ]) if len(self) else np.empty(0)
+
+    def astype(self, dtypes: Dict[str, np.dtype]) -> "ColumnarResults":
+        """Copy with the fields listed in ``dtypes`` cast to their dtype."""
+        return ColumnarResults(
+            self.risk_ids,
+            {f: m.astype(dtypes[f]) if f in dtypes else m for f, m in self.matrices.items()},
+            self.offsets,
+        )
+
+    def __getitem__(self, risk_id: str) -> Dict[str, np.ndarray]:
+        return self.row(self.index[risk_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.risk_ids)
+
+    def __len__(self) -> int:
+        return len(self.risk_ids)
+
+    def __repr__(self) -> str:
+        return f"ColumnarResults({len(self)} risks, {self.num_of_iter} iterations, fields={self.fields})"
+
+
+def concatenate(parts: Sequence[ColumnarResults]) -> ColumnarResults:
+    """
+    Join the results of consecutive iteration ranges of the same risks, e.g.
+    the blocks of a streamed or extended run, into the results of the whole range.
+
+    :raises ValueError: If the parts hold different risks or fields, or no iterations
+    """
+    first = parts[0]
+    for part in parts[1:]:
+        if part.risk_ids != first.risk_ids or part.fields != first.fields:
+            raise ValueError("Only results of the same risks and fields can be concatenated")
+    if any(matrix.ndim == 1 for field, matrix in first.matrices.items() if field != "impact"):
+        raise ValueError("Summary statistics cannot be concatenated, simulate per-iteration results")
+
+    matrices, offsets = {}, None
+    for field in first.fields:
+        if field == "impact":
+            rows = [[part.impact(row) for part in parts] for row in range(len(first))]
+            counts = [sum(p.size for p in row) for row in rows]
+            offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+            matrices[field] = np.concatenate([p for row in rows for p in row] or [first.matrix(field)[:0]])
+        else:
+            matrices[field] = np.concatenate([part.matrix(field) for part in parts], axis=1)
+    return ColumnarResults(first.risk_ids, matrices, offsets)
+
+
+def release(array: np.ndarray) -> None:
+    """
+    Drop the resident pages of a read-only memory-mapped array from the
+    process. They stay in the page cache and are read back on the next
+    access. Does nothing for other arrays.
+    """
+    while isinstance(array, np.ndarray):
+        base = array.base
+        if isinstance(base, mmap.mmap):
+            # the array over the whole mapping is writeable for copy-on-write
+            # maps, which would lose their private changes
+            if not array.flags.writeable and hasattr(mmap, "MADV_DONTNEED"):
+                base.madvise(mmap.MADV_DONTNEED)
+            return
+        array = base
+
+
+def as_columnar(sim: Any) -> ColumnarResults:
+    """
+    Columnar view of any simulation output: a ``ColumnarResults``, an object
+    with a ``results`` attribute (``SimulationResults``) or the nested
+    dictionary returned by the simulators. Only results that are not columnar
+    yet are stacked.
+    """
+    if isinstance(sim, ColumnarResults):
+        return sim
+    if isinstance(sim, dict):
+        if isinstance(sim.get("columns"), ColumnarResults):
+            return sim["columns"]
+        results = sim["results"]
+        return ColumnarResults.from_mapping(results) if isinstance(results, Mapping) else ColumnarResults.from_rows(results)
+    return ColumnarResults.from_mapping(sim.results)
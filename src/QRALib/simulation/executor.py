@@ -0,0 +1,118 @@
+"""Persistent worker pool for repeated simulations.
+
+Building a joblib pool and pickling every ``Risk`` (with its frozen scipy
+distributions) on each ``simulation()`` call dominates the run time of small
+what-if simulations. A ``SimulationExecutor`` keeps its worker processes alive
+across calls and caches portfolio definitions on the workers, keyed by the
+portfolio content hash. After the first call for a portfolio, a task only
+carries that key, its rows and the per-call arguments (iteration range, seed,
+shared-memory layout).
+
+Example::
+
+    with SimulationExecutor(max_workers=4) as executor:
+        for scenario in scenarios:
+            sim = simulate(scenario, iterations=10000, executor=executor)
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from ..risk.portfolio import RiskPortfolio
+from .backends import available_workers
+
+# number of portfolios each worker keeps in memory
+WORKER_CACHE_SIZE = 8
+
+_PORTFOLIOS: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+
+class _PortfolioMissing(Exception):
+    """Raised in a worker that has not cached the requested portfolio."""
+
+
+class SimulationExecutor:
+    """
+    Long-lived process pool for the simulators.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Number of worker processes (default: the CPUs available to the
+        process, honouring affinity and cgroup CPU quotas).
+    """
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or available_workers()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._sent = set()
+
+    def __enter__(self) -> "SimulationExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown(wait=wait)
+
+    def warm_up(self) -> None:
+        """Start every worker process ahead of the first simulation."""
+        for future in [self._pool.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def map_risks(self, task: Callable, risk_list, args: Sequence[tuple]) -> List[Any]:
+        """
+        Run ``task(risk, *args[row])`` for every risk on the workers.
+
+        The portfolio is shipped to the workers only the first time it is seen
+        (or after a worker restarted); afterwards only its content hash is sent.
+
+        :return: List of task results, in risk order
+        """
+        risks = list(risk_list)
+        if not risks:
+            return []
+        key = RiskPortfolio(risks).fingerprint()
+        payload = None if key in self._sent else pickle.dumps(risks)
+        groups = _split(len(risks), self.max_workers)
+        futures = [
+            self._pool.submit(_run_rows, key, payload, task, [(row, args[row]) for row in rows])
+            for rows in groups
+        ]
+        results: List[Any] = []
+        for rows, future in zip(groups, futures):
+            try:
+                results.extend(future.result())
+            except _PortfolioMissing:
+                payload = pickle.dumps(risks)
+                retry = self._pool.submit(_run_rows, key, payload, task, [(row, args[row]) for row in rows])
+                results.extend(retry.result())
+        self._sent.add(key)
+        return results
+
+
+def _split(n: int, parts: int) -> List[range]:
+    """Split ``range(n)`` into at most ``parts`` contiguous ranges."""
+    parts = max(1, min(parts, n))
+    size, rest = divmod(n, parts)
+    bounds = [0]
+    for i in range(parts):
+        bounds.append(bounds[-1] + size + (i < rest))
+    return [range(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+def _run_rows(key: str, payload: Optional[bytes], task: Callable, rows):
+    risks = _PORTFOLIOS.get(key)
+    if risks is None:
+        if payload is None:
+            raise _PortfolioMissing(key)
+        risks = pickle.loads(payload)
+        _PORTFOLIOS[key] = risks
+        while len(_PORTFOLIOS) > WORKER_CACHE_SIZE:
+            _PORTFOLIOS.popitem(last=False)
+    _PORTFOLIOS.move_to_end(key)
+    return [task(risks[row], *row_args) for row, row_args in rows]
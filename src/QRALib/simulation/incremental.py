@@ -0,0 +1,126 @@
+"""Incremental re-simulation of a portfolio after some of its risks changed.
+
+The pseudo-random streams of ``StandardMonteCarlo`` and ``MatrixMonteCarlo``
+are keyed by the seed and the risk ID only (see ``streams``), so the rows of a
+risk do not depend on the other risks of the portfolio. After an edit, only the risks whose definition
+changed (see ``Risk.fingerprint``) and the added risks need to be simulated
+again under the previous seed; the rows of the other risks are taken over from
+the previous run. The merged results are identical to those of a full
+simulation of the edited portfolio, and a changed risk keeps its random
+streams, so before/after comparisons use common random numbers.
+
+The Sobol samplers of the QMC engines tie the draws of a risk to the rest of
+the portfolio, so they are always simulated in full.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .columnar import ColumnarResults, as_columnar
+from .streams import PseudoRandomSampler
+
+
+def risk_fingerprints(risk_list) -> Dict[str, str]:
+    """
+    :return: Risk ID -> content hash of the risk definition
+    """
+    return {risk.uniq_id: risk.fingerprint() for risk in risk_list}
+
+
+def stale_rows(risk_list, fingerprints: Mapping[str, str]) -> List[int]:
+    """
+    :param fingerprints: Fingerprints of the risks of the previous run, see ``risk_fingerprints``
+    :return: Rows of ``risk_list`` that are new or whose definition changed
+    """
+    return [row for row, risk in enumerate(risk_list) if fingerprints.get(risk.uniq_id) != risk.fingerprint()]
+
+
+def supports_incremental(simulator) -> bool:
+    """True if the rows of a risk drawn by ``simulator`` only depend on that risk."""
+    return type(getattr(simulator, "sampler", None)) is PseudoRandomSampler
+
+
+def merge_rows(risk_ids: Sequence[str], previous: ColumnarResults, fresh: ColumnarResults) -> ColumnarResults:
+    """
+    Results of ``risk_ids``, taking every risk from ``fresh`` if it holds it and
+    from ``previous`` otherwise. Both must hold the same fields and dtypes.
+
+    :raises KeyError: If a risk is in neither of them
+    """
+    sources = [(fresh, fresh.index[rid]) if rid in fresh.index else (previous, previous.index[rid]) for rid in risk_ids]
+    from_fresh = np.array([src is fresh for src, _ in sources], dtype=bool)
+    rows = np.array([row for _, row in sources], dtype=np.intp)
+
+    matrices, offsets = {}, None
+    for field, matrix in fresh.matrices.items():
+        if field == "impact":
+            parts = [src.impact(row) for src, row in sources]
+            offsets = np.concatenate(([0], np.cumsum([p.size for p in parts], dtype=np.int64)))
+            matrices[field] = np.concatenate(parts) if parts else np.empty(0, dtype=matrix.dtype)
+            continue
+        merged = np.empty((len(risk_ids),) + matrix.shape[1:], dtype=matrix.dtype)
+        merged[from_fresh] = matrix[rows[from_fresh]]
+        merged[~from_fresh] = previous.matrix(field)[rows[~from_fresh]]
+        matrices[field] = merged
+    return ColumnarResults(risk_ids, matrices, offsets)
+
+
+def incremental_simulation(
+    simulator, previous: Any, fingerprints: Optional[Mapping[str, str]], num_of_iter: int
+) -> Dict[str, Any]:
+    """
+    Simulate the portfolio of ``simulator``, reusing the rows of ``previous``
+    for the risks whose fingerprint did not change.
+
+    The previous run is reused only if it was simulated with the same seed,
+    number of iterations, dtype and detail, and ``simulator`` draws every risk
+    from its own streams (``StandardMonteCarlo``, ``MatrixMonteCarlo``);
+    otherwise every risk is simulated again.
+
+    :param simulator: Simulator of the edited portfolio, seeded with the seed of ``previous``
+    :param previous: Output of the previous ``simulation()`` call, or a ``SimulationResults``
+    :param fingerprints: Fingerprints of the risks of ``previous``, see ``risk_fingerprints``
+    :param num_of_iter: Number of simulation iterations
+    :return: Nested dictionary as returned by ``simulation()``; ``summary["resimulated"]``
+        lists the IDs of the risks that were simulated
+    """
+    risks = list(simulator.risk_list)
+    summary = previous["summary"] if isinstance(previous, dict) else previous.summary
+    reusable = (
+        fingerprints is not None
+        and supports_incremental(simulator)
+        and summary.get("seed") == simulator.seed
+        and summary.get("number_of_iterations") == num_of_iter
+        and summary.get("dtype", "float64") == simulator.dtype
+        and summary.get("detail", "full") == simulator.detail
+    )
+    if not reusable:
+        raw = simulator.simulation(num_of_iter)
+        raw["summary"]["resimulated"] = [risk.uniq_id for risk in risks]
+        return raw
+
+    stale = [risks[row] for row in stale_rows(risks, fingerprints)]
+    kept = as_columnar(previous)
+    if stale:
+        fresh = type(simulator)(
+            stale, seed=simulator.seed, executor=simulator.executor, backend=simulator.backend,
+            max_workers=simulator.max_workers, dtype=simulator.dtype, detail=simulator.detail
+        ).simulation(num_of_iter)["columns"]
+    else:
+        # nothing to draw, an empty slice of the previous run gives the fields
+        fresh = ColumnarResults([], {field: matrix[:0] for field, matrix in kept.matrices.items()},
+                                None if kept.offsets is None else np.zeros(1, dtype=np.int64))
+    columns = merge_rows([risk.uniq_id for risk in risks], kept, fresh)
+    return {
+        "summary": {
+            "number_of_iterations": num_of_iter,
+            "risk_list": simulator.risk_list,
+            "seed": simulator.seed,
+            "dtype": simulator.dtype,
+            "detail": simulator.detail,
+            "resimulated": [risk.uniq_id for risk in stale],
+        },
+        "results": columns.rows(),
+        "columns": columns,
+    }
@@ -0,0 +1,93 @@
+"""Vectorized numerical kernels shared by the simulators.
+
+The simulators draw a number of events per iteration (the occurrences) and a
+flat array holding the impact of every single event, ordered iteration by
+iteration. The kernels in this module turn those flat structures into per
+iteration results without looping in Python.
+"""
+
+import numpy as np
+
+
+def aggregate_occurrences(occurrences, impact) -> np.ndarray:
+    """
+    Sum the event impacts that belong to each iteration.
+
+    The impacts of iteration ``i`` are the ``occurrences[i]`` consecutive
+    values of ``impact`` that follow the events of iterations ``0..i-1``.
+    Segment offsets are taken from a cumulative sum of the occurrences and the
+    segments are reduced in a single ``np.add.reduceat`` pass.
+
+    :param occurrences: Number of events per iteration, any shape
+    :type occurrences: numpy.ndarray
+    :param impact: Flat array with the impact of every event, of length ``occurrences.sum()``
+    :type impact: numpy.ndarray
+    :return: Total impact per iteration, same shape as ``occurrences``
+    :rtype: numpy.ndarray
+    :raises ValueError: If the number of impacts does not match the number of events
+    """
+    occurrences = np.asarray(occurrences)
+    impact = np.asarray(impact, dtype=float)
+    counts = occurrences.ravel()
+    ends = np.cumsum(counts)
+    num_events = int(ends[-1]) if ends.size else 0
+    if impact.shape != (num_events,):
+        raise ValueError(
+            f"Expected a flat impact array of {num_events} events, got shape {impact.shape}"
+        )
+
+    total = np.zeros(counts.shape, dtype=impact.dtype)
+    has_events = counts > 0
+    if num_events:
+        starts = ends[has_events] - counts[has_events]
+        total[has_events] = np.add.reduceat(impact, starts)
+    return total.reshape(occurrences.shape)
+
+
+# above this rate the search is handed to scipy, exp(-rate) loses precision
+POISSON_SEARCH_MAX_RATE = 50.0
+
+
+def poisson_ppf(u, rate) -> np.ndarray:
+    """
+    Inverse CDF of the Poisson distribution, for quasi-random occurrences.
+
+    Each uniform is mapped to the smallest count whose cumulative probability
+    reaches it, so a low-discrepancy ``u`` gives low-discrepancy occurrences.
+    Counts are found by a sequential search over the cumulative probabilities,
+    advancing all unresolved elements one count per step; rates above
+    ``POISSON_SEARCH_MAX_RATE`` use ``scipy.stats.poisson.ppf``.
+
+    :param u: Uniforms in ``[0, 1)``
+    :type u: numpy.ndarray
+    :param rate: Poisson rates, broadcast against ``u``
+    :type rate: numpy.ndarray
+    :return: Number of events, int64 with the broadcast shape
+    :rtype: numpy.ndarray
+    """
+    u, rate = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(rate, dtype=float))
+    shape = u.shape
+    counts = np.zeros(u.size, dtype=np.int64)
+    u, rate = u.ravel(), rate.ravel()
+
+    search = np.flatnonzero(rate <= POISSON_SEARCH_MAX_RATE)
+    if search.size < u.size:
+        from scipy.stats import poisson
+        large = np.flatnonzero(rate > POISSON_SEARCH_MAX_RATE)
+        counts[large] = poisson.ppf(u[large], rate[large]).astype(np.int64)
+
+    target, lam = u[search], rate[search]
+    pmf = np.exp(-lam)
+    cdf = pmf.copy()
+    found = np.zeros(search.size, dtype=np.int64)
+    active = np.flatnonzero(target > cdf)
+    k = 0
+    while active.size:
+        k += 1
+        pmf[active] *= lam[active] / k
+        cdf[active] += pmf[active]
+        found[active] = k
+        # an underflowed pmf means the cdf has reached 1 up to rounding
+        active = active[(target[active] > cdf[active]) & (pmf[active] > 0)]
+    counts[search] = found
+    return counts.reshape(shape)
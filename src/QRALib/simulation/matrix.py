@@ -0,0 +1,73 @@
+"""Simulate risk portfolio using a portfolio-wide matrix Monte Carlo engine.
+The simulator takes a list of risks when setting up.
+The simulation takes the number of interations as input.
+Output is a nested dictionary. The dictionary has two primary keys 'summary' and
+'results' that contain the information about the simulation and the results.
+
+The whole portfolio is sampled in-process into (n_risks, num_of_iter) arrays,
+risk by risk from the per-risk streams of ``StandardMonteCarlo``: with the same
+seed both engines give the same results. The per-risk entries in 'results' are
+views into those matrices.
+
+The engine never dispatches work to threads, processes or an executor, for
+callers that must stay in the calling thread. It is not faster than
+``StandardMonteCarlo`` on a single core: most of the time goes to numpy's
+draws either way.
+"""
+
+from .backends import IN_PROCESS, available_workers, check_backend
+from .shared import result_dtypes, result_fields, simulate_columns
+from .streaming import Extendable
+from .streams import resolve_seed, PseudoRandomSampler
+
+
+class MatrixMonteCarlo(Extendable):
+
+    def __init__(self, risk_list, seed=None, executor=None, backend="auto", max_workers=None,
+                 dtype="float64", detail="full"):
+        """:param  risk_list = list of the risks to simulate
+        :param  seed = seed of the per-risk random streams, fresh entropy if None
+        :param  executor = must be None, the matrix engine runs in-process
+        :param  backend = 'auto' or 'serial', the portfolio is sampled in the calling thread
+        :param  max_workers = checked like for the other engines, the engine uses one worker
+        :param  dtype = storage precision of the results, 'float64' or 'float32' (float32 values
+                and int32 occurrences, drawn and summed in float64)
+        :param  detail = fields to keep: 'full', 'totals' (only the totals, the single-risk impacts
+                are not drawn) or 'summary' (per-risk mean frequency, occurrences and ALE)
+        """
+        if executor is not None:
+            raise ValueError("The matrix engine runs in-process and takes no executor")
+        self.risk_list = risk_list
+        self.executor = None
+        self.backend = check_backend(backend, IN_PROCESS)
+        self.max_workers = available_workers(max_workers)
+        self.seed = resolve_seed(seed)
+        self.sampler = PseudoRandomSampler(self.seed)
+        self.dtype = result_dtypes(dtype)["total"].name
+        self.detail = detail
+        result_fields(detail)
+
+    def simulation(self, num_of_iter=10000, start=0, cursors=None):
+        """:param  num_of_iter = number of simulation iterations, default 10 000
+        :param  start = index of the first iteration, used when simulating in blocks
+        :param  cursors = StreamCursors of the streaming run the block belongs to, if any
+        :return: nested dictionary with 'summary', 'results' (per-risk dictionaries) and 'columns'
+                (the same results as a ColumnarResults) as keys
+        :rtype: dictionary
+        """
+        columns = simulate_columns(
+            self.sampler, self.risk_list, num_of_iter, start, 1, backend="serial",
+            dtype=self.dtype, detail=self.detail, cursors=cursors
+        )
+        simulation_result = {
+            "summary":{
+                "number_of_iterations": num_of_iter,
+                "risk_list": self.risk_list,
+                "seed": self.seed,
+                "dtype": self.dtype,
+                "detail": self.detail,
+            },
+            "results": columns.rows(),
+            "columns": columns
+        }
+        return simulation_result
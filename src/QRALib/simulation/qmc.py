@@ -5,70 +5,66 @@ Output is a nested dictionary. The dictionary has two primary keys 'summary' and
 'results' that contain the information about the simulation and the results.
 
 The simulator uses a quasi-random (or low discrepency) sequence of numbers.
-The sequence is a suffled Sobolo sequence.
+The sequence is a single unscrambled Sobol sequence over the portfolio, with
+three dedicated dimensions per risk: the frequency, the occurrences (the
+Poisson inverse CDF ``kernels.poisson_ppf`` at the sampled frequency) and the
+single-risk impact. Event impacts use a one-dimensional Sobol sequence per
+risk and stream block (see ``streams.SobolSampler``).
 """
 
-import numpy as np
-from numpy.random import poisson as poisson
-from torch.quasirandom import SobolEngine as SobolEngine
-import multiprocessing
-from joblib import Parallel, delayed
+from .backends import available_workers, check_backend, resolve_backend
+from .shared import result_dtypes, result_fields, simulate_columns
+from .streaming import Extendable
+from .streams import resolve_seed, SobolSampler
 
 
-class QuasiMonteCarlo:
+class QuasiMonteCarlo(Extendable):
 
-    def __init__(self, risk_list):
+    def __init__(self, risk_list, seed=None, executor=None, backend="auto", max_workers=None,
+                 dtype="float64", detail="full"):
         """:param  risk_list = list of the risks to simulate
+        :param  seed = seed of the per-risk random streams, fresh entropy if None
+        :param  executor = optional persistent SimulationExecutor to run the risks on
+        :param  backend = 'serial', 'threads', 'processes' or 'auto' (chosen from the portfolio
+                size and the number of iterations)
+        :param  max_workers = cap on the number of workers, default all available CPUs
+        :param  dtype = storage precision of the results, 'float64' or 'float32' (float32 values
+                and int32 occurrences, drawn and summed in float64)
+        :param  detail = fields to keep: 'full', 'totals' (only the totals, the single-risk impacts
+                are not drawn) or 'summary' (per-risk mean frequency, occurrences and ALE)
         """
         self.risk_list = risk_list
-        self.num_cores = multiprocessing.cpu_count()
+        self.executor = executor
+        self.seed = resolve_seed(seed)
+        self.sampler = SobolSampler(self.seed, [risk.uniq_id for risk in risk_list], scramble=False)
+        self.backend = check_backend(backend)
+        self.max_workers = available_workers(max_workers)
+        self.dtype = result_dtypes(dtype)["total"].name
+        self.detail = detail
+        result_fields(detail)
 
-    def simulation(self, num_of_iter=1000):
+    def simulation(self, num_of_iter=1000, start=0, cursors=None):
         """:param  num_of_iter = number of simulation iterations, default 10 000
-        :return: nested dictionary with a 'summary' and 'results' as keys
+        :param  start = index of the first iteration, used when simulating in blocks
+        :param  cursors = StreamCursors of the streaming run the block belongs to, if any
+        :return: nested dictionary with 'summary', 'results' (per-risk dictionaries) and 'columns'
+                (the same results as a ColumnarResults) as keys
         :rtype: dictionary
         """
-
-        self.num_of_iter = num_of_iter
-        risk_outcome = Parallel(n_jobs=self.num_cores)(delayed(self._simulation)(risk) for risk in self.risk_list)
+        columns = simulate_columns(
+            self.sampler, self.risk_list, num_of_iter, start, self.max_workers, self.executor,
+            resolve_backend(self.backend, len(self.risk_list), num_of_iter, self.max_workers),
+            dtype=self.dtype, detail=self.detail, cursors=cursors
+        )
         simulation_result = {
             "summary":{
                 "number_of_iterations": num_of_iter,
                 "risk_list": self.risk_list,
+                "seed": self.seed,
+                "dtype": self.dtype,
+                "detail": self.detail,
             },
-            "results": risk_outcome
+            "results": columns.rows(),
+            "columns": columns
         }
         return simulation_result
-
-    def _simulation(self, risk):
-        quasi_random_sequence = SobolEngine(3, scramble=False, seed=None)
-        quasi_random_sequence = quasi_random_sequence.fast_forward(30)
-
-        sequence1 = (quasi_random_sequence.draw(self.num_of_iter)[:,0]).tolist()
-        np.random.shuffle(sequence1)
-        r_1 = risk.get_frequency_ppf(sequence1)
-        r_2 = poisson(r_1)
-
-        sequence2 = (quasi_random_sequence.draw(np.sum(r_2))[:,1]).tolist()
-        np.random.shuffle(sequence2)
-        impact = risk.get_impact_ppf(sequence2)
-
-        sequence3 = (quasi_random_sequence.draw(self.num_of_iter)[:,2]).tolist()
-        np.random.shuffle(sequence3)
-        sr_impact = risk.get_impact_ppf(sequence3)
-        last = 0
-        outcome = []
-
-        outcome = [np.sum(impact[last:last+i]) for i in np.nditer(r_2)]
-
-        risk_outcome = {
-            "id" : risk.uniq_id,
-            "frequency" : r_1,
-            "occurances" : r_2,
-            "impact" : impact,
-            "single_risk_impact": sr_impact,
-            "total" : outcome
-        }
-
-
-        return risk_outcome
@@ -0,0 +1,310 @@
+"""Shared-memory transport of simulation results.
+
+The parent process preallocates one shared-memory segment per result field,
+holding a (n_risks, num_of_iter) matrix, and workers write their rows in place.
+Only segment names, shapes and a few integers travel through joblib, so no
+result array is pickled or copied on its way back.
+
+The flat ``impact`` array cannot be sized before the occurrences are known, so
+every risk is simulated in two tasks: the first writes frequencies and
+occurrences and returns the number of events, the parent then allocates the
+impact segment, and the second task writes the impacts, single-risk impacts and
+totals. The seeded streams of the samplers make the split invisible in the
+results.
+
+The serial and thread backends run in the parent process and use the same
+two-phase tasks on plain in-process arrays, without shared memory.
+
+Results are stored in float64/int64 by default. With ``dtype="float32"`` the
+buffers are float32 and occurrences int32, which halves their size; samplers
+still draw, and totals are still summed, in float64 before the rows are stored.
+
+The ``detail`` level decides which fields are kept (see ``DETAILS``). Fields
+that are not kept are not allocated, and the single-risk impacts are not even
+drawn unless they are kept. Occurrences are always written, as the impact
+tasks read them back, but are only returned when kept.
+"""
+
+import weakref
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from .backends import run_tasks
+from .columnar import ColumnarResults
+from .kernels import aggregate_occurrences
+
+FIELDS = {
+    "frequency": np.float64,
+    "occurances": np.int64,
+    "single_risk_impact": np.float64,
+    "total": np.float64,
+}
+
+# storage precision -> dtype of every result field, including the flat impacts
+DTYPES = {
+    "float64": {**FIELDS, "impact": np.float64},
+    "float32": {
+        "frequency": np.float32,
+        "occurances": np.int32,
+        "single_risk_impact": np.float32,
+        "total": np.float32,
+        "impact": np.float32,
+    },
+}
+
+# detail level -> result fields kept per risk. "summary" keeps the fields it
+# needs to reduce every risk to a few statistics, see ``summarize``
+DETAILS = {
+    "full": ("frequency", "occurances", "impact", "single_risk_impact", "total"),
+    "totals": ("total",),
+    "summary": ("frequency", "occurances", "total"),
+}
+
+
+def result_dtypes(dtype="float64") -> Dict[str, np.dtype]:
+    """
+    :param dtype: Storage precision of the results, ``"float64"`` or ``"float32"``
+    :return: Field -> dtype of the result arrays
+    :raises ValueError: If ``dtype`` is not a supported precision
+    """
+    try:
+        name = np.dtype(dtype).name
+    except TypeError:
+        name = None
+    if name not in DTYPES:
+        raise ValueError(f"Unknown result dtype {dtype!r}, choose from {list(DTYPES)}")
+    return {field: np.dtype(t) for field, t in DTYPES[name].items()}
+
+
+def result_fields(detail: str = "full") -> Tuple[str, ...]:
+    """
+    :param detail: ``"full"``, ``"totals"`` or ``"summary"``
+    :return: Result fields kept at that detail level
+    :raises ValueError: If ``detail`` is not a known level
+    """
+    try:
+        return DETAILS[detail]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown detail {detail!r}, choose from {list(DETAILS)}") from None
+
+
+def summarize(columns: ColumnarResults) -> ColumnarResults:
+    """
+    Reduce per-risk results to the statistics of the ``"summary"`` detail level.
+
+    :param columns: Results holding ``frequency``, ``occurances`` and ``total``
+    :return: Per-risk vectors ``mean_frequency``, ``mean_occurances``, ``ale``
+        (mean total) and ``ale_std_error``
+    """
+    total = columns.matrix("total")
+    n = total.shape[1]
+    if n > 1:
+        std_error = total.std(axis=1, dtype=np.float64, ddof=1) / np.sqrt(n)
+    else:
+        std_error = np.full(total.shape[0], np.nan)
+    return ColumnarResults(columns.risk_ids, {
+        "mean_frequency": columns.matrix("frequency").mean(axis=1, dtype=np.float64),
+        "mean_occurances": columns.matrix("occurances").mean(axis=1, dtype=np.float64),
+        "ale": total.mean(axis=1, dtype=np.float64),
+        "ale_std_error": std_error,
+    })
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    # the parent owns the segment, the worker must not unlink it at exit
+    return shared_memory.SharedMemory(name=name, track=False)
+
+
+def _as_array(segment: shared_memory.SharedMemory, shape, dtype) -> np.ndarray:
+    """
+    Array over the whole of ``segment``, which owns the segment handle: the
+    segment is closed once the array, and every view of it, is gone.
+    """
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    weakref.finalize(array, segment.close)
+    return array
+
+
+class SharedResults:
+    """
+    Result buffers owned by the parent process.
+
+    Parameters
+    ----------
+    n_risks : int
+        Number of rows of every result matrix.
+    num_of_iter : int
+        Number of iterations (columns).
+    shared : bool, default True
+        Allocate the buffers in shared memory. In-process buffers are used
+        when the tasks run in the parent process.
+    dtype : str, default "float64"
+        Storage precision, see ``result_dtypes``.
+    fields : sequence of str, optional
+        Fields to return, default all. Occurrences are always allocated.
+    """
+    def __init__(
+        self, n_risks: int, num_of_iter: int, shared: bool = True, dtype="float64",
+        fields: Sequence[str] = DETAILS["full"]
+    ) -> None:
+        self.shape = (n_risks, num_of_iter)
+        self.shared = shared
+        self.dtypes = result_dtypes(dtype)
+        self.fields = tuple(fields)
+        self.offsets = None
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        for field in FIELDS:
+            if field in self.fields or field == "occurances":
+                self._create(field, self.shape, self.dtypes[field])
+
+    def _create(self, field: str, shape: Tuple[int, ...], dtype) -> None:
+        if not self.shared:
+            self.arrays[field] = np.empty(shape, dtype=dtype)
+            return
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        segment = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self._segments[field] = segment
+        self.arrays[field] = _as_array(segment, shape, dtype)
+
+    def layout(self) -> Dict[str, Any]:
+        """
+        Picklable description of the segments: field -> (name, shape, dtype).
+        In-process buffers are passed as the arrays themselves.
+        """
+        if not self.shared:
+            return dict(self.arrays)
+        return {
+            field: (self._segments[field].name, arr.shape, arr.dtype.str)
+            for field, arr in self.arrays.items()
+        }
+
+    def allocate_impact(self, counts: List[int]) -> None:
+        """Create the flat impact segment once the number of events per risk is known."""
+        self.offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        if "impact" in self.fields:
+            self._create("impact", (int(self.offsets[-1]),), self.dtypes["impact"])
+
+    def columns(self, risk_list) -> ColumnarResults:
+        """The kept fields, as the result matrices themselves."""
+        return ColumnarResults(
+            [risk.uniq_id for risk in risk_list],
+            {field: self.arrays[field] for field in self.fields},
+            self.offsets if "impact" in self.fields else None,
+        )
+
+    def release(self) -> None:
+        """
+        Remove the segment names. The arrays stay valid for as long as they, or
+        views of them, are referenced; each segment is closed with its array.
+        """
+        for segment in self._segments.values():
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self._segments.clear()
+
+
+@contextmanager
+def attach(layout: Dict[str, Any]):
+    """Map the segments described by ``layout`` and yield field -> array."""
+    if all(isinstance(entry, np.ndarray) for entry in layout.values()):
+        yield layout
+        return
+    arrays = {
+        field: _as_array(_open_segment(name), shape, dtype)
+        for field, (name, shape, dtype) in layout.items()
+    }
+    try:
+        yield arrays
+    finally:
+        arrays.clear()
+
+
+def simulate_shared(
+    sampler, risk_list, num_of_iter: int, start: int, n_jobs: int, executor=None,
+    backend: str = "processes", dtype="float64", detail: str = "full", cursors=None
+) -> List[Dict[str, Any]]:
+    """
+    Like ``simulate_columns``, listing the results risk by risk.
+
+    :return: List of per-risk result dictionaries (views into the result buffers,
+        or statistics for the ``"summary"`` level)
+    """
+    return simulate_columns(
+        sampler, risk_list, num_of_iter, start, n_jobs, executor, backend, dtype, detail, cursors
+    ).rows()
+
+
+def simulate_columns(
+    sampler, risk_list, num_of_iter: int, start: int, n_jobs: int, executor=None,
+    backend: str = "processes", dtype="float64", detail: str = "full", cursors=None
+) -> ColumnarResults:
+    """
+    Simulate every risk on ``n_jobs`` workers of ``backend``, or on a
+    persistent ``SimulationExecutor`` when one is given. Process workers write
+    into shared memory.
+
+    :param sampler: A ``PseudoRandomSampler`` or ``SobolSampler``
+    :param backend: ``"serial"``, ``"threads"`` or ``"processes"``
+    :param dtype: Storage precision of the results, ``"float64"`` or ``"float32"``
+    :param detail: Fields to keep, ``"full"``, ``"totals"`` or ``"summary"``
+    :param cursors: ``StreamCursors`` of the streaming run, if any; only tasks
+        running in this process keep and continue streams
+    :return: The result matrices (the buffers written by the workers), or the
+        statistics of the ``"summary"`` level
+    """
+    risks = list(risk_list)
+    if executor is not None:
+        run = executor.map_risks
+        shared = True
+    else:
+        def run(task, risks, args):
+            return run_tasks(backend, n_jobs, task, risks, args)
+        shared = backend == "processes" and n_jobs > 1
+    if shared:
+        # streams kept by worker processes would never reach the next chunk
+        cursors = None
+
+    results = SharedResults(len(risks), num_of_iter, shared=shared, dtype=dtype, fields=result_fields(detail))
+    try:
+        layout = results.layout()
+        meta = run(_occurrence_task, risks, [
+            (sampler, row, layout, num_of_iter, start, cursors) for row in range(len(risks))
+        ])
+        results.allocate_impact([events for events, _ in meta])
+        layout = results.layout()
+        run(_impact_task, risks, [
+            (sampler, row, layout, skipped, (int(results.offsets[row]), int(results.offsets[row + 1])), start, cursors)
+            for row, (_, skipped) in enumerate(meta)
+        ])
+        columns = results.columns(risks)
+        return summarize(columns) if detail == "summary" else columns
+    finally:
+        results.release()
+
+
+def _occurrence_task(risk, sampler, row, layout, num_of_iter, start, cursors=None):
+    frequency, occurances, skipped = sampler.occurrences(risk, num_of_iter, start, cursors)
+    with attach(layout) as arrays:
+        if "frequency" in arrays:
+            arrays["frequency"][row] = frequency
+        arrays["occurances"][row] = occurances
+    return int(occurances.sum()), skipped
+
+
+def _impact_task(risk, sampler, row, layout, skipped, span, start, cursors=None):
+    lo, hi = span
+    with attach(layout) as arrays:
+        occurances = arrays["occurances"][row]
+        # the total is summed from the float64 draws, before they are stored
+        impact = sampler.impacts(risk, occurances, skipped, start, cursors)
+        if "impact" in arrays:
+            arrays["impact"][lo:hi] = impact
+        if "single_risk_impact" in arrays:
+            arrays["single_risk_impact"][row] = sampler.single_risk_impact(risk, occurances.size, start, cursors)
+        arrays["total"][row] = aggregate_occurrences(occurances, impact)
+        del occurances
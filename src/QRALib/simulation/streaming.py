@@ -0,0 +1,141 @@
+"""Bounded-memory streaming simulation.
+
+A simulation of ``num_of_iter`` iterations is split into consecutive blocks of
+at most ``block_size`` iterations. Each block is simulated on its own and
+yielded as a regular simulation result (the same nested dictionary returned by
+``simulation()``), so a consumer can fold it into running statistics and drop
+it before the next block is produced. Peak memory therefore depends on the
+block size and the portfolio, not on the total number of iterations.
+
+Because every block draws from the streams of its own iteration range, a run
+can also be continued: ``extend_simulation`` simulates the iterations following
+an existing run and joins them to it, giving the same results as one longer run
+with the same seed.
+
+The blocks of one run share a ``StreamCursors``: a block that stops inside a
+stream block hands its generators to the next block of the run, which continues
+them instead of drawing the stream block from its start. The last block keeps
+nothing, and the cursors go with the run.
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .columnar import as_columnar, concatenate
+from .streams import StreamCursors
+
+DEFAULT_BLOCK_SIZE = 100_000
+
+
+def iter_blocks(num_of_iter: int, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Tuple[int, int]]:
+    """
+    Split ``num_of_iter`` iterations into ``(start, stop)`` ranges.
+
+    :param num_of_iter: Total number of iterations
+    :type num_of_iter: int
+    :param block_size: Maximum number of iterations per block
+    :type block_size: int
+    :return: Iterator over half-open ``(start, stop)`` iteration ranges
+    :raises ValueError: If ``num_of_iter`` or ``block_size`` is not positive
+    """
+    if num_of_iter <= 0:
+        raise ValueError(f"num_of_iter must be positive, got {num_of_iter}")
+    if block_size <= 0:
+        raise ValueError(f"block_size must be positive, got {block_size}")
+    for start in range(0, num_of_iter, block_size):
+        yield start, min(start + block_size, num_of_iter)
+
+
+def stream_simulation(
+    simulator,
+    num_of_iter: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run ``simulator`` block by block and yield one simulation result per block.
+
+    :param simulator: Any simulator instance (``StandardMonteCarlo``, ``QuasiMonteCarlo``,
+        ``RandomQuasiMonteCarlo`` or ``MatrixMonteCarlo``)
+    :param num_of_iter: Total number of iterations
+    :type num_of_iter: int
+    :param block_size: Maximum number of iterations held in memory at once
+    :type block_size: int
+    :return: Iterator of nested dictionaries with 'summary' and 'results' keys. The
+        summary additionally holds ``first_iteration`` and ``total_iterations``.
+    """
+    cursors = StreamCursors()
+    for start, stop in iter_blocks(num_of_iter, block_size):
+        cursors.follows = stop < num_of_iter
+        block = simulator.simulation(stop - start, start=start, cursors=cursors)
+        block["summary"]["first_iteration"] = start
+        block["summary"]["total_iterations"] = num_of_iter
+        yield block
+
+
+def extend_simulation(
+    simulator,
+    previous: Any,
+    extra_iterations: int,
+    block_size: Optional[int] = None,
+    on_block: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Continue a run of ``simulator`` by ``extra_iterations`` iterations.
+
+    The new iterations continue the random streams of the run (and the Sobol
+    sequence of the QMC engines) where it stopped, so a run of ``n`` iterations
+    extended by ``m`` equals a run of ``n + m`` iterations with the same seed.
+
+    :param simulator: Simulator of the portfolio of ``previous``, with its seed, dtype and detail
+    :param previous: Output of ``simulation()`` (or of a previous extension), or a ``SimulationResults``
+    :param extra_iterations: Number of iterations to add
+    :param block_size: Simulate the new iterations in blocks of at most this many, default in one block
+    :param on_block: Called with every simulated block, e.g. to checkpoint it
+    :return: Nested dictionary as returned by ``simulation()``, covering the whole run
+    :raises ValueError: If ``previous`` was not simulated with the settings of ``simulator``
+    """
+    summary = previous["summary"] if isinstance(previous, dict) else previous.summary
+    columns = as_columnar(previous)
+    defaults = {"dtype": "float64", "detail": "full"}
+    for key in ("seed", "dtype", "detail"):
+        stored, used = summary.get(key, defaults.get(key)), getattr(simulator, key)
+        if stored != used:
+            raise ValueError(f"The run was simulated with {key}={stored!r}, the simulator uses {used!r}")
+    if columns.risk_ids != [risk.uniq_id for risk in simulator.risk_list]:
+        raise ValueError("The run was simulated for other risks than those of the simulator")
+    if simulator.detail == "summary":
+        raise ValueError("Runs with detail='summary' hold no iterations and cannot be extended")
+
+    first = summary.get("first_iteration", 0)
+    done = summary["number_of_iterations"]
+    parts = [columns]
+    cursors = StreamCursors()
+    for start, stop in iter_blocks(extra_iterations, block_size or extra_iterations):
+        cursors.follows = stop < extra_iterations
+        block = simulator.simulation(stop - start, start=first + done + start, cursors=cursors)
+        block["summary"]["first_iteration"] = first + done + start
+        if on_block is not None:
+            on_block(block)
+        parts.append(block["columns"])
+    columns = concatenate(parts)
+    extended = dict(block["summary"], number_of_iterations=done + extra_iterations)
+    if "first_iteration" in summary:
+        extended["first_iteration"] = first
+    else:
+        del extended["first_iteration"]
+    return {"summary": extended, "results": columns.rows(), "columns": columns}
+
+
+class Extendable:
+    """Adds ``extend`` to a simulator, see ``extend_simulation``."""
+
+    def extend(self, sim_results, extra_iterations, block_size=None, on_block=None):
+        """:param  sim_results = output of simulation() or extend(), or a SimulationResults, simulated
+                with the seed, dtype and detail of this simulator
+        :param  extra_iterations = number of iterations to add
+        :param  block_size = simulate the new iterations in blocks of at most this many
+        :param  on_block = called with every simulated block, e.g. to checkpoint it
+        :return: nested dictionary as returned by simulation(), for the whole run; it equals a
+                single run of all the iterations with the same seed
+        :rtype: dictionary
+        """
+        return extend_simulation(self, sim_results, extra_iterations, block_size, on_block)
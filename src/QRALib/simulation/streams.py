@@ -0,0 +1,386 @@
+"""Deterministic random streams for the simulators.
+
+Every random quantity of a simulation is drawn from its own stream, derived
+from the simulation seed, the risk ID and the iteration block it belongs to:
+
+    SeedSequence(seed, spawn_key=(risk_key(uniq_id), block, component))
+
+Iterations are grouped in fixed blocks of ``STREAM_BLOCK`` iterations, so the
+stream used for a given iteration never depends on how a run is split across
+workers, chunks or calls. The same seed therefore gives bit-identical results
+whatever the worker count or chunk size, and risks can be reordered, added or
+removed without changing the draws of the other risks.
+
+Draws inside a block are taken as prefixes of the block stream: simulating
+iterations ``[lo, hi)`` of a block keeps the last ``hi - lo`` of its first
+``hi`` values. Within a streaming run, a chunk that stops inside a block keeps
+its generators in the run's ``StreamCursors``, and the next chunk of the block
+continues them instead of drawing the prefix again, so consecutive chunks cost
+their own size rather than the block's.
+"""
+
+import hashlib
+import pickle
+import threading
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.quasirandom import SobolEngine as SobolEngine
+
+from .kernels import poisson_ppf
+
+STREAM_BLOCK = 2 ** 16
+
+# stream components
+FREQUENCY = 0
+OCCURRENCE = 1
+IMPACT = 2
+SINGLE_RISK_IMPACT = 3
+SEQUENCE = 4
+
+# number of leading Sobol points skipped by the QMC simulators
+SOBOL_SKIP = 30
+
+# dimensions of the portfolio Sobol sequence, per risk
+_SOBOL_COMPONENTS = {FREQUENCY: 0, OCCURRENCE: 1, SINGLE_RISK_IMPACT: 2}
+DIMENSIONS_PER_RISK = len(_SOBOL_COMPONENTS)
+
+# direction numbers and shift of the latest portfolio Sobol sequences, from
+# which ``sobol_points`` computes any points of any dimension; a few hundred
+# bytes per dimension
+_DIRECTIONS: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+_DIRECTIONS_LOCK = threading.Lock()
+_DIRECTIONS_KEPT = 4
+
+
+def resolve_seed(seed: Optional[int] = None) -> int:
+    """
+    Return ``seed`` as an integer, drawing fresh OS entropy when it is ``None``.
+
+    The resolved value is reported in the simulation summary so that any run,
+    seeded or not, can be reproduced.
+    """
+    return int(np.random.SeedSequence(seed).entropy)
+
+
+def risk_key(uniq_id) -> int:
+    """Stable 64-bit key for a risk ID, independent of the portfolio order."""
+    digest = hashlib.blake2b(str(uniq_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def seed_sequence(seed: int, uniq_id, *key: int) -> np.random.SeedSequence:
+    return np.random.SeedSequence(seed, spawn_key=(risk_key(uniq_id),) + tuple(key))
+
+
+def rng(seed: int, uniq_id, *key: int) -> np.random.Generator:
+    """Independent ``numpy.random.Generator`` for one risk and stream key."""
+    return np.random.Generator(np.random.PCG64(seed_sequence(seed, uniq_id, *key)))
+
+
+def torch_seed(seed: int, uniq_id, *key: int) -> int:
+    """Integer seed for torch-based engines (e.g. Sobol scrambling)."""
+    return int(seed_sequence(seed, uniq_id, *key).generate_state(1, np.uint64)[0] >> np.uint64(1))
+
+
+def model_key(model) -> Any:
+    """
+    Hashable identity of the draws of a distribution: its type and parameters,
+    or its pickled form for distributions without a ``parameters()`` method.
+    """
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return pickle.dumps(model)
+    return type(model).__qualname__, tuple(sorted(parameters().items()))
+
+
+class StreamCursors:
+    """
+    Generators of the streams that the chunks of one streaming run left inside
+    a block.
+
+    ``stream_simulation`` and ``extend_simulation`` pass one instance to every
+    chunk of a run. A chunk that stops inside a block keeps its generators here
+    if ``follows`` is set, that is if the run requests a next chunk, and that
+    chunk takes them back instead of drawing the block from its start. Runs
+    without cursors keep nothing. The risks of a run use disjoint keys, so the
+    tasks of a chunk may keep and take streams from several threads.
+    """
+
+    def __init__(self) -> None:
+        self.follows = True
+        self._cursors: Dict[tuple, Tuple[int, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+
+def continues(cursors: Optional[StreamCursors], hi: int) -> bool:
+    """Whether a chunk stopping at ``hi`` in its block is to keep its streams in ``cursors``."""
+    return cursors is not None and cursors.follows and hi < STREAM_BLOCK
+
+
+def keep_stream(cursors: Optional[StreamCursors], key: tuple, drawn: int, state: Any) -> None:
+    """
+    Keep the generators of a stream that a chunk left inside its block, if the
+    run continues (see ``continues``).
+
+    :param cursors: Cursors of the run, ``None`` outside a streaming run
+    :param key: Identity of the stream: seed, risk, block, component and
+        the definition of what was drawn (see ``model_key``)
+    :param drawn: Number of values drawn from the stream so far
+    :param state: Generators of the stream and whatever the caller needs to continue it
+    """
+    if cursors is not None and cursors.follows:
+        # positions are only meaningful for the block size they were drawn with
+        cursors._cursors[(STREAM_BLOCK,) + key] = (drawn, state)
+
+
+def resume_stream(cursors: Optional[StreamCursors], key: tuple, position: int) -> Tuple[int, Any]:
+    """
+    Take the generators kept for ``key`` by ``keep_stream``, if they stopped at
+    or before ``position``. The caller owns them until it keeps them again.
+
+    :return: tuple ``(drawn, state)``, ``(0, None)`` if the stream has to be drawn from the block start
+    """
+    cursor = None if cursors is None else cursors._cursors.pop((STREAM_BLOCK,) + key, None)
+    if cursor is None or cursor[0] > position:
+        return 0, None
+    return cursor
+
+
+def sobol_directions(dimension: int, scramble: bool, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Direction numbers ``(dimension, SobolEngine.MAXBIT)`` and shift ``(dimension,)``
+    of the sequence of ``SobolEngine(dimension, scramble, seed)``, kept per process.
+    """
+    key = (dimension, scramble, seed)
+    with _DIRECTIONS_LOCK:
+        directions = _DIRECTIONS.get(key)
+        if directions is None:
+            engine = SobolEngine(dimension, scramble=scramble, seed=seed)
+            directions = engine.sobolstate.numpy(), engine.shift.numpy()
+            if len(_DIRECTIONS) >= _DIRECTIONS_KEPT:
+                del _DIRECTIONS[next(iter(_DIRECTIONS))]
+            _DIRECTIONS[key] = directions
+    return directions
+
+
+def sobol_points(directions: np.ndarray, shift: np.ndarray, first: int, n: int) -> np.ndarray:
+    """
+    Points ``[first, first + n)`` of a Sobol sequence, restricted to the dimensions
+    of ``directions`` and ``shift`` (rows of ``sobol_directions``), shape ``(n, dimensions)``.
+
+    Identical to the points drawn by ``SobolEngine`` after ``fast_forward(first)``
+    for ``first > 0``: point ``i`` is the shift XOR the direction numbers of
+    the set bits of the Gray code of ``i``, and each point flips the direction
+    of the lowest set bit of its index relative to the previous one.
+    """
+    bits = np.arange(SobolEngine.MAXBIT)
+    gray = first ^ (first >> 1)
+    index = np.arange(first + 1, first + n, dtype=np.int64)
+    steps = np.bitwise_count((index & -index) - 1).astype(np.intp)
+    quasi = np.empty((n, shift.size), dtype=np.int64)
+    quasi[0] = shift ^ np.bitwise_xor.reduce(directions[:, (gray >> bits) & 1 == 1], axis=1)
+    np.take(directions.T, steps, axis=0, out=quasi[1:])
+    np.bitwise_xor.accumulate(quasi, axis=0, out=quasi)
+    return quasi * 2.0 ** -SobolEngine.MAXBIT
+
+
+def iter_stream_blocks(start: int, num_of_iter: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Split the iterations ``[start, start + num_of_iter)`` along stream blocks.
+
+    :return: Iterator of ``(block, lo, hi)`` with ``lo``/``hi`` relative to the block start
+    """
+    stop = start + num_of_iter
+    while start < stop:
+        block, lo = divmod(start, STREAM_BLOCK)
+        hi = min(STREAM_BLOCK, lo + stop - start)
+        yield block, lo, hi
+        start += hi - lo
+
+
+class PseudoRandomSampler:
+    """
+    Pseudo-random draws for one risk, from the seeded block streams.
+
+    Sampling is split in two phases so that a caller can size the event
+    buffers before the impacts are drawn: ``occurrences`` returns the
+    frequencies, the occurrences and the number of events of the first block
+    that precede ``start``; ``impacts`` then draws the impact of every event.
+    """
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+
+    def sample(self, risk, num_of_iter: int, start: int = 0, cursors: Optional[StreamCursors] = None):
+        """
+        :param cursors: Cursors of the streaming run the draws belong to, if any
+        :return: tuple ``(frequency, occurances, impact, single_risk_impact)``
+        """
+        frequency, occurances, skipped = self.occurrences(risk, num_of_iter, start, cursors)
+        impact = self.impacts(risk, occurances, skipped, start, cursors)
+        return frequency, occurances, impact, self.single_risk_impact(risk, num_of_iter, start, cursors)
+
+    def occurrences(self, risk, num_of_iter: int, start: int = 0, cursors: Optional[StreamCursors] = None):
+        """
+        :return: tuple ``(frequency, occurances, skipped)``
+        """
+        parts = [self._occurrence_block(risk, *b, cursors) for b in iter_stream_blocks(start, num_of_iter)]
+        frequency, occurances, skipped = zip(*parts)
+        return np.concatenate(frequency), np.concatenate(occurances), skipped[0]
+
+    def _occurrence_block(self, risk, block, lo, hi, cursors):
+        uid = risk.uniq_id
+        key = (self.seed, uid, block, FREQUENCY, model_key(risk.frequency_model))
+        drawn, state = resume_stream(cursors, key, lo)
+        if state is None:
+            state = rng(self.seed, uid, block, FREQUENCY), rng(self.seed, uid, block, OCCURRENCE), 0
+        frequency_stream, occurrence_stream, events = state
+        frequency = risk.get_frequency(hi - drawn, random_state=frequency_stream)
+        occurances = occurrence_stream.poisson(frequency)
+        skip = lo - drawn
+        skipped = events + int(occurances[:skip].sum())
+        if continues(cursors, hi):
+            events = skipped + int(occurances[skip:].sum())
+            keep_stream(cursors, key, hi, (frequency_stream, occurrence_stream, events))
+        return frequency[skip:], occurances[skip:], skipped
+
+    def impacts(self, risk, occurances, skipped: int = 0, start: int = 0,
+                cursors: Optional[StreamCursors] = None) -> np.ndarray:
+        """
+        Impact of every event of ``occurances``, ordered iteration by iteration.
+        """
+        parts = [np.empty(0)]
+        for (block, lo, hi), before, events in _block_events(start, occurances, skipped):
+            if events:
+                parts.append(self._event_impacts(risk, block, before, events, cursors, continues(cursors, hi)))
+        return np.concatenate(parts)
+
+    def _event_impacts(self, risk, block, before, events, cursors=None, keep=False):
+        """
+        Impacts of the ``events`` following the first ``before`` events of the
+        block; ``keep`` the stream in ``cursors`` if the next chunk continues the block.
+        """
+        key = (self.seed, risk.uniq_id, block, IMPACT, model_key(risk.impact_model))
+        drawn, stream = resume_stream(cursors, key, before)
+        if stream is None:
+            stream = rng(self.seed, risk.uniq_id, block, IMPACT)
+        values = risk.get_impact(before + events - drawn, random_state=stream)[before - drawn:]
+        if keep:
+            keep_stream(cursors, key, before + events, stream)
+        return values
+
+    def single_risk_impact(self, risk, num_of_iter: int, start: int = 0,
+                           cursors: Optional[StreamCursors] = None) -> np.ndarray:
+        return np.concatenate([
+            self._single_risk_block(risk, *b, cursors) for b in iter_stream_blocks(start, num_of_iter)
+        ])
+
+    def _single_risk_block(self, risk, block, lo, hi, cursors):
+        key = (self.seed, risk.uniq_id, block, SINGLE_RISK_IMPACT, model_key(risk.impact_model))
+        drawn, stream = resume_stream(cursors, key, lo)
+        if stream is None:
+            stream = rng(self.seed, risk.uniq_id, block, SINGLE_RISK_IMPACT)
+        values = risk.get_impact(hi - drawn, random_state=stream)[lo - drawn:]
+        if continues(cursors, hi):
+            keep_stream(cursors, key, hi, stream)
+        return values
+
+
+class SobolSampler(PseudoRandomSampler):
+    """
+    Quasi-random draws from one Sobol sequence spanning the whole portfolio.
+
+    The sequence has three dedicated dimensions per risk, ``3 * row`` for the
+    frequency, ``3 * row + 1`` for the occurrences and ``3 * row + 2`` for the
+    single-risk impact, indexed by the global iteration so that successive
+    calls continue the same sequence and the low-discrepancy property holds
+    jointly across the portfolio. A risk task computes only the points of its
+    own dimensions and iterations from the direction numbers of the sequence
+    (see ``sobol_points``), so memory does not grow with the portfolio.
+    Occurrences are the Poisson inverse CDF of their own dimension at the
+    sampled rate. Event impacts use a one-dimensional Sobol sequence per risk
+    and stream block. Uniforms are mapped through the fast PPF kernels of the
+    distributions (see ``QRALib.distributions.kernels``).
+
+    Unlike the pseudo-random streams, the draws of a risk depend on its
+    position in ``risk_ids``.
+
+    :param seed: Seed of the scrambling
+    :param risk_ids: IDs of the portfolio risks, in dimension order
+    :param scramble: Use scrambled (randomized) Sobol sequences
+    """
+    def __init__(self, seed: int, risk_ids: Sequence, scramble: bool = True) -> None:
+        super().__init__(seed)
+        self.scramble = scramble
+        self.rows = {uid: row for row, uid in enumerate(risk_ids)}
+        self.dimension = DIMENSIONS_PER_RISK * max(len(self.rows), 1)
+        if self.dimension > SobolEngine.MAXDIM:
+            raise ValueError(
+                f"A Sobol sequence supports at most {SobolEngine.MAXDIM // DIMENSIONS_PER_RISK} risks, "
+                f"got {len(self.rows)}"
+            )
+        self._key = (seed, scramble, hashlib.blake2b(
+            "\x1f".join(map(str, risk_ids)).encode("utf-8"), digest_size=16
+        ).digest())
+
+    def _columns(self, risk, components: Sequence[int], num_of_iter: int, start: int) -> np.ndarray:
+        """
+        Uniforms of ``risk`` for ``components`` (``FREQUENCY``, ``OCCURRENCE`` or
+        ``SINGLE_RISK_IMPACT``) for the iterations ``[start, start + num_of_iter)``,
+        shape ``(num_of_iter, len(components))``.
+        """
+        directions, shift = sobol_directions(self.dimension, self.scramble, torch_seed(self.seed, "", SEQUENCE))
+        row = DIMENSIONS_PER_RISK * self.rows[risk.uniq_id]
+        dimensions = [row + _SOBOL_COMPONENTS[component] for component in components]
+        return sobol_points(directions[dimensions], shift[dimensions], SOBOL_SKIP + start, num_of_iter)
+
+    def _column(self, risk, component: int, num_of_iter: int, start: int) -> np.ndarray:
+        """Uniforms of ``risk`` for one component, see ``_columns``."""
+        return self._columns(risk, [component], num_of_iter, start)[:, 0]
+
+    def _occurrence_block(self, risk, block, lo, hi, cursors):
+        # the occurrences before ``lo`` fix where this range's events start in the
+        # impact stream of the block; the previous chunk of the block keeps their sum
+        key = self._key + (risk.uniq_id, block, OCCURRENCE, model_key(risk.frequency_model))
+        drawn, events = resume_stream(cursors, key, lo)
+        if events is None:
+            events = 0
+        columns = self._columns(risk, [FREQUENCY, OCCURRENCE], hi - drawn, block * STREAM_BLOCK + drawn)
+        frequency = risk.get_frequency_ppf(columns[:, 0], fast=True)
+        occurances = poisson_ppf(columns[:, 1], frequency)
+        skip = lo - drawn
+        skipped = events + int(occurances[:skip].sum())
+        if continues(cursors, hi):
+            keep_stream(cursors, key, hi, skipped + int(occurances[skip:].sum()))
+        return frequency[skip:], occurances[skip:], skipped
+
+    def _event_impacts(self, risk, block, before, events, cursors=None, keep=False):
+        uid = risk.uniq_id
+        engine = SobolEngine(1, scramble=self.scramble, seed=torch_seed(self.seed, uid, block, IMPACT))
+        offset = SOBOL_SKIP
+        if not self.scramble:
+            # unscrambled one-dimensional sequences are identical for every
+            # risk, start each at a seeded random offset
+            offset += int(rng(self.seed, uid, block, IMPACT).integers(STREAM_BLOCK))
+        engine.fast_forward(offset + before)
+        return risk.get_impact_ppf(engine.draw(events, dtype=torch.float64).numpy()[:, 0], fast=True)
+
+    def single_risk_impact(self, risk, num_of_iter: int, start: int = 0,
+                           cursors: Optional[StreamCursors] = None) -> np.ndarray:
+        return risk.get_impact_ppf(self._column(risk, SINGLE_RISK_IMPACT, num_of_iter, start), fast=True)
+
+
+def _block_events(start, occurances, skipped):
+    """
+    Yield ``((block, lo, hi), before, events)`` for the stream blocks covered by
+    ``occurances``: the number of block events preceding the range and the
+    number of events inside it.
+    """
+    offset = 0
+    for block, lo, hi in iter_stream_blocks(start, len(occurances)):
+        events = int(occurances[offset:offset + hi - lo].sum())
+        yield (block, lo, hi), (skipped if lo else 0), events
+        offset += hi - lo
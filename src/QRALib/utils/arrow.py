@@ -0,0 +1,182 @@
+# src/QRALib/utils/arrow.py
+# -------------------------
+"""
+Apache Arrow and Parquet export of simulation results as a year-loss table.
+
+A year-loss table (YLT) has one row per risk and iteration (simulated year)
+with the columns
+
+- ``risk_id``: dictionary-encoded risk ID (int32 indices into the IDs)
+- ``iteration``: index of the simulated year (int64)
+- ``occurrences``: number of events of the risk in that year, when kept
+- ``total``: total impact of the risk in that year
+
+Rows are ordered risk by risk and are produced in record batches of at most
+``chunk_size`` rows, sliced straight from the result matrices: the numeric
+columns wrap the matrix rows without copying and no Python object is created
+per row. ``write_parquet`` streams those batches to disk. The summary and the
+risk IDs travel in the schema metadata, so ``read_parquet`` and ``from_arrow``
+rebuild the original ``ColumnarResults``.
+
+Requires the optional ``pyarrow`` dependency (``pip install qralib[arrow]``).
+"""
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from ..simulation.columnar import ColumnarResults
+from .storage import to_jsonable
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+METADATA_KEY = b"qralib"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Arrow and Parquet export requires pyarrow, install it with 'pip install qralib[arrow]'"
+        ) from None
+    return pyarrow
+
+
+def ylt_schema(columns: ColumnarResults, summary: Optional[Dict[str, Any]] = None):
+    """
+    Arrow schema of the year-loss table of ``columns``, carrying the summary and risk IDs as metadata.
+    """
+    pa = _pyarrow()
+    if "total" not in columns.matrices or columns.num_of_iter == 0:
+        raise ValueError("A year-loss table needs per-iteration totals (detail='full' or 'totals')")
+    fields = [
+        pa.field("risk_id", pa.dictionary(pa.int32(), pa.string()), nullable=False),
+        pa.field("iteration", pa.int64(), nullable=False),
+    ]
+    if "occurances" in columns.matrices:
+        fields.append(pa.field("occurrences", pa.from_numpy_dtype(columns.matrix("occurances").dtype), nullable=False))
+    fields.append(pa.field("total", pa.from_numpy_dtype(columns.matrix("total").dtype), nullable=False))
+    metadata = {"summary": to_jsonable(summary or {}), "risk_ids": list(columns.risk_ids)}
+    return pa.schema(fields, metadata={METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+
+def iter_ylt_batches(
+    columns: ColumnarResults,
+    summary: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """
+    Year-loss table of ``columns`` as Arrow record batches of at most ``chunk_size`` rows.
+
+    :param summary: Summary of the run; its ``first_iteration`` offsets the iteration column
+    :param chunk_size: Maximum number of rows per batch
+    """
+    pa = _pyarrow()
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    schema = ylt_schema(columns, summary)
+    dictionary = pa.array(columns.risk_ids, type=pa.string())
+    first = int((summary or {}).get("first_iteration", 0))
+    n_risks, n_iter = len(columns), columns.num_of_iter
+    flat = {
+        name: np.ascontiguousarray(columns.matrix(field)).reshape(-1)
+        for name, field in (("occurrences", "occurances"), ("total", "total"))
+        if field in columns.matrices
+    }
+    for lo in range(0, n_risks * n_iter, chunk_size):
+        hi = min(lo + chunk_size, n_risks * n_iter)
+        rows = np.arange(lo, hi, dtype=np.int64)
+        risk_ids = pa.DictionaryArray.from_arrays(pa.array((rows // n_iter).astype(np.int32)), dictionary)
+        arrays = [risk_ids, pa.array(first + rows % n_iter)]
+        arrays += [pa.array(values[lo:hi]) for values in flat.values()]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def to_arrow(
+    columns: ColumnarResults, summary: Optional[Dict[str, Any]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    """Year-loss table of ``columns`` as a ``pyarrow.Table``, one chunk per batch."""
+    pa = _pyarrow()
+    return pa.Table.from_batches(
+        list(iter_ylt_batches(columns, summary, chunk_size)), schema=ylt_schema(columns, summary)
+    )
+
+
+def write_parquet(
+    path: str,
+    columns: ColumnarResults,
+    summary: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: str = "zstd",
+) -> None:
+    """
+    Stream the year-loss table of ``columns`` to a Parquet file, one row group per batch.
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(path, ylt_schema(columns, summary), compression=compression) as writer:
+        for batch in iter_ylt_batches(columns, summary, chunk_size):
+            writer.write_batch(batch)
+
+
+def from_arrow(table) -> Tuple[Dict[str, Any], ColumnarResults]:
+    """
+    Rebuild the results from a year-loss table.
+
+    Tables written by this module restore their summary and the row order of
+    the risks; for other tables risks are ordered by first appearance. Every
+    risk must have one row per iteration.
+
+    :return: Tuple ``(summary, columns)``
+    :raises ValueError: If the table is not a complete year-loss table
+    """
+    pa = _pyarrow()
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+    summary = metadata.get("summary", {})
+
+    risk_column = table.column("risk_id")
+    if not pa.types.is_dictionary(risk_column.type):
+        risk_column = risk_column.dictionary_encode()
+    risk_column = risk_column.unify_dictionaries().combine_chunks()
+    dictionary = risk_column.dictionary.to_pylist()
+    codes = risk_column.indices.to_numpy().astype(np.int64)
+    risk_ids = metadata.get("risk_ids") or [dictionary[i] for i in _first_appearance(codes)]
+    position = {rid: row for row, rid in enumerate(risk_ids)}
+    try:
+        rows = np.array([position[rid] for rid in dictionary], dtype=np.int64)[codes]
+    except KeyError as err:
+        raise ValueError(f"Risk ID {err.args[0]!r} is not listed in the table metadata") from None
+
+    iteration = table.column("iteration").to_numpy()
+    n_risks = len(risk_ids)
+    n_iter = table.num_rows // n_risks if n_risks else 0
+    if n_risks * n_iter != table.num_rows:
+        raise ValueError("Every risk must have one row per iteration")
+    first = int(iteration.min()) if iteration.size else 0
+    order = np.lexsort((iteration, rows))
+    expected = np.arange(n_iter) + first
+    if not (np.array_equal(rows[order], np.repeat(np.arange(n_risks), n_iter))
+            and np.array_equal(iteration[order].reshape(n_risks, n_iter), np.broadcast_to(expected, (n_risks, n_iter)))):
+        raise ValueError("Every risk must have one row per iteration")
+    already_sorted = np.array_equal(order, np.arange(order.size))
+
+    matrices = {}
+    for name, field in (("occurrences", "occurances"), ("total", "total")):
+        if name in table.column_names:
+            values = table.column(name).to_numpy()
+            matrices[field] = (values if already_sorted else values[order]).reshape(n_risks, n_iter)
+    return summary, ColumnarResults(risk_ids, matrices)
+
+
+def read_parquet(path: str) -> Tuple[Dict[str, Any], ColumnarResults]:
+    """Read a year-loss table written by ``write_parquet``, see ``from_arrow``."""
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    return from_arrow(pq.read_table(path))
+
+
+def _first_appearance(codes: np.ndarray) -> np.ndarray:
+    unique, first = np.unique(codes, return_index=True)
+    return unique[np.argsort(first)]
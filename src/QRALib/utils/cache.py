@@ -0,0 +1,156 @@
+# src/QRALib/utils/cache.py
+# -------------------------
+"""
+Content-addressed on-disk cache of simulation runs.
+
+A run is fully determined by the portfolio definition (IDs, distributions and
+their parameters), the method, the iteration count, the seed and the storage
+options (``dtype``, ``detail``): the per-risk streams make it independent of
+the backend and the worker count. ``cache_key`` hashes exactly those inputs,
+and ``ResultCache`` stores one run per key in the binary format of
+``save_results``, so a hit opens memory-mapped results in milliseconds instead
+of simulating again.
+
+The cache is bounded in bytes. A hit refreshes the modification time of the
+run's header, and storing a run evicts the least recently used runs until the
+cache fits again. Runs are written atomically, so several processes may share
+a cache directory.
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..risk.portfolio import RiskPortfolio
+from ..simulation.columnar import ColumnarResults
+from .storage import META_FILE, is_results_dir, load_results, save_results
+
+# bump when the sampling changes, so that older runs are no longer hit
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 2**30
+
+
+def cache_key(portfolio, method: str, iterations: int, seed: int, dtype: str = "float64",
+              detail: str = "full") -> str:
+    """
+    Hash of everything that determines a simulation run.
+
+    :param portfolio: ``RiskPortfolio`` or list of risks, in result order
+    :return: Hexadecimal SHA-256 digest
+    """
+    from .. import __version__
+
+    if not isinstance(portfolio, RiskPortfolio):
+        portfolio = RiskPortfolio(portfolio)
+    definition = {
+        "cache_version": CACHE_VERSION,
+        "qralib": __version__,
+        "portfolio": portfolio.fingerprint(),
+        "method": method,
+        "iterations": int(iterations),
+        "seed": int(seed),
+        "dtype": dtype,
+        "detail": detail,
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of simulation runs in a directory, one saved run per key.
+
+    :param directory: Cache directory, created if missing
+    :param max_bytes: Total size of the cached runs above which the least recently used are evicted
+    """
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], ColumnarResults]]:
+        """
+        Open the run stored under ``key``, memory-mapped, and mark it as recently used.
+
+        :return: Tuple ``(summary, columns)``, or None if the run is not cached
+        """
+        path = self._path(key)
+        if not is_results_dir(path):
+            return None
+        try:
+            summary, columns = load_results(path)
+        except (OSError, ValueError):
+            # unreadable or from an incompatible version, simulate again
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        try:
+            os.utime(os.path.join(path, META_FILE))
+        except OSError:
+            pass
+        return summary, columns
+
+    def put(self, key: str, summary: Dict[str, Any], columns: ColumnarResults) -> None:
+        """
+        Store a run under ``key`` and evict the least recently used runs beyond
+        ``max_bytes``. Runs larger than ``max_bytes`` on their own, counting the
+        event offsets, are not stored.
+        A key that is already stored, e.g. by another process, holds the same
+        run and is kept as it is.
+        """
+        size = sum(m.nbytes for m in columns.matrices.values())
+        if columns.offsets is not None:
+            size += columns.offsets.nbytes
+        if size > self.max_bytes:
+            return
+        if key not in self:
+            save_results(self._path(key), summary, columns)
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove the least recently used runs until the cache fits in ``max_bytes``."""
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached run."""
+        for _, key, _ in self._entries():
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def size(self) -> int:
+        """Total size of the cached runs in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return is_results_dir(self._path(key))
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        """``(last use, key, bytes)`` of every cached run."""
+        entries = []
+        for key in os.listdir(self.directory):
+            if key.startswith("."):
+                # runs being written by save_results
+                continue
+            path = self._path(key)
+            try:
+                used = os.stat(os.path.join(path, META_FILE)).st_mtime
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            except OSError:
+                # not a run, or evicted by another process meanwhile
+                continue
+            entries.append((used, key, size))
+        return entries
@@ -0,0 +1,75 @@
+# src/QRALib/utils/checkpoint.py
+# ------------------------------
+"""
+Checkpoints of long simulation runs.
+
+A checkpoint is a directory holding the blocks of a run simulated so far, each
+saved with ``save_results`` in a ``part-<first iteration>`` directory. Blocks
+are written atomically as they complete, so an interrupted run loses at most
+the block in progress, and the run resumes from the blocks on disk: its streams
+continue where the last block stopped (see ``extend_simulation``).
+"""
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..simulation.columnar import ColumnarResults, concatenate
+from .storage import is_results_dir, load_results, read_meta, save_results
+
+PREFIX = "part-"
+
+
+class Checkpoint:
+    """
+    Directory of the consecutive blocks of one simulation run.
+
+    :param directory: Checkpoint directory, created if missing
+    """
+    def __init__(self, directory: str) -> None:
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def parts(self) -> List[str]:
+        """Paths of the saved blocks, in iteration order."""
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(PREFIX) and is_results_dir(os.path.join(self.directory, name))
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Summary of the first block, None for an empty checkpoint."""
+        parts = self.parts()
+        return read_meta(parts[0])["summary"] if parts else None
+
+    def append(self, summary: Dict[str, Any], columns: ColumnarResults, first_iteration: int) -> None:
+        """Save the block of iterations starting at ``first_iteration``."""
+        save_results(
+            os.path.join(self.directory, f"{PREFIX}{first_iteration:015d}"),
+            dict(summary, first_iteration=first_iteration), columns
+        )
+
+    def load(self) -> Optional[Tuple[Dict[str, Any], ColumnarResults]]:
+        """
+        Join the saved blocks into the run simulated so far.
+
+        :return: Tuple ``(summary, columns)``, None for an empty checkpoint
+        :raises ValueError: If the blocks do not cover consecutive iterations from 0
+        """
+        parts = [load_results(path) for path in self.parts()]
+        if not parts:
+            return None
+        done = 0
+        for summary, _ in parts:
+            if summary["first_iteration"] != done:
+                raise ValueError(f"{self.directory} misses iterations {done} to {summary['first_iteration']}")
+            done += summary["number_of_iterations"]
+        summary = dict(parts[0][0], number_of_iterations=done)
+        del summary["first_iteration"]
+        columns = parts[0][1] if len(parts) == 1 else concatenate([columns for _, columns in parts])
+        return summary, columns
+
+    def clear(self) -> None:
+        """Remove the saved blocks."""
+        for path in self.parts():
+            shutil.rmtree(path, ignore_errors=True)
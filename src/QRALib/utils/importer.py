@@ -4,7 +4,7 @@ import csv
 import json
 import os
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 import pandas as pd
 
@@ -13,6 +13,7 @@ from ..distributions.beta import Beta
 from ..distributions.uniform import Uniform
 from ..distributions.lognormal import Lognormal
 from ..distributions.pert import PERT
+from ..distributions.protocol import BufferedDistribution
 
 
 class RiskDataImporter:
@@ -27,6 +28,33 @@ class RiskDataImporter:
         "Lognormal": Lognormal,
         "PERT": PERT,
     }
+    # CSV/XLSX parameter columns of registered third-party distributions
+    _CSV_PARAMETERS: Dict[str, Tuple[str, ...]] = {}
+
+    @staticmethod
+    def register_distribution(name: str, dist_cls: type, parameter_names: Sequence[str] = ()) -> None:
+        """
+        Register a third-party distribution under ``name``.
+
+        The class is instantiated with the ``parameters`` of a JSON risk
+        definition as keyword arguments. ``parameter_names`` gives, in order,
+        the keywords read from the ``*_parameter0``, ``*_parameter1``, ...
+        columns of CSV and XLSX files.
+
+        Besides ``draw`` and ``draw_ppf``, the class must implement the buffer
+        protocol (``draw_into``/``ppf_into``, see ``BufferedDistribution``).
+        """
+        missing = [
+            method for method in ("draw", "draw_ppf", "draw_into", "ppf_into")
+            if not callable(getattr(dist_cls, method, None))
+        ]
+        if missing or not issubclass(dist_cls, BufferedDistribution):
+            raise TypeError(f"{dist_cls.__name__} does not implement {missing or 'the distribution protocol'}")
+        registered = RiskDataImporter._DIST_REGISTRY.get(name)
+        if registered is not None and registered is not dist_cls:
+            raise ValueError(f"Distribution {name!r} is already registered as {registered.__name__}")
+        RiskDataImporter._DIST_REGISTRY[name] = dist_cls
+        RiskDataImporter._CSV_PARAMETERS[name] = tuple(parameter_names)
 
     @staticmethod
     def import_risks(file_path: str) -> List[Risk]:
@@ -141,6 +169,9 @@ def _normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
         params["minimum"] = float(row.get("frequency_parameter0", 0))
         params["mid"] = float(row.get("frequency_parameter1", 0))
         params["maximum"] = float(row.get("frequency_parameter2", 0))
+    elif dist in RiskDataImporter._CSV_PARAMETERS:
+        for i, key in enumerate(RiskDataImporter._CSV_PARAMETERS[dist]):
+            params[key] = float(row.get(f"frequency_parameter{i}", 0))
 
     # impact parameters
     dist = rd["impact"]["distribution"]
@@ -158,6 +189,9 @@ def _normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
         params["minimum"] = float(row.get("impact_parameter0", 0))
         params["mid"] = float(row.get("impact_parameter1", 0))
         params["maximum"] = float(row.get("impact_parameter2", 0))
+    elif dist in RiskDataImporter._CSV_PARAMETERS:
+        for i, key in enumerate(RiskDataImporter._CSV_PARAMETERS[dist]):
+            params[key] = float(row.get(f"impact_parameter{i}", 0))
     return rd
 
 
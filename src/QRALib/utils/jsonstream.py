@@ -0,0 +1,222 @@
+# src/QRALib/utils/jsonstream.py
+# ------------------------------
+"""
+Streaming JSON and NDJSON serialization of simulation results.
+
+``SimulationResults.to_json`` builds the whole nested structure of Python
+lists before it can be dumped. The writers here format the result arrays
+chunk by chunk straight into the output file, so peak memory stays at the
+results plus one chunk of text. Files ending in ``.gz`` are gzip-compressed.
+
+``write_json`` produces the same document as ``json.dump(sim.to_json())``,
+readable with ``SimulationResults.from_json``. ``write_ndjson`` produces one
+header line followed by one line per chunk of a result row::
+
+    {"format": "qralib-ndjson", "version": 1, "summary": {...}, "risk_ids": [...],
+     "fields": {"total": {"dtype": "<f8", "shape": [2, 10000]}, ...}, "offsets": [...]}
+    {"id": "R0", "field": "total", "start": 0, "values": [0.0, 1520.3, ...]}
+    ...
+
+``read_ndjson`` preallocates the result arrays from the header and fills
+them line by line, parsing every chunk of values with one typed numpy call.
+Integer fields are parsed as float64 and must hold whole numbers.
+"""
+import gzip
+import json
+import warnings
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+import numpy as np
+
+from ..simulation.columnar import ColumnarResults
+from .storage import to_jsonable
+
+FORMAT = "qralib-ndjson"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 65_536
+
+# the values are the last key of a chunk line, and a JSON string cannot hold
+# this sequence unescaped, so the last match always starts the values
+_VALUES = ', "values": ['
+
+
+@contextmanager
+def _open(path: str, mode: str, compress: Optional[bool] = None) -> Iterator[TextIO]:
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        with gzip.open(path, mode + "t", encoding="utf-8") as f:
+            yield f
+    else:
+        with open(path, mode, encoding="utf-8") as f:
+            yield f
+
+
+def _format(values: np.ndarray) -> str:
+    # the shortest repr of the Python floats round-trips float32 and float64
+    # values exactly; NaN and infinities are written as json.dumps does
+    return json.dumps(values.tolist())[1:-1]
+
+
+def _row_chunks(columns: ColumnarResults, field: str, row: int, chunk_size: int) -> Iterator[Tuple[int, np.ndarray]]:
+    values = columns.impact(row) if field == "impact" else columns.matrix(field)[row]
+    values = np.atleast_1d(values)
+    for start in range(0, values.size, chunk_size):
+        yield start, values[start:start + chunk_size]
+
+
+def write_ndjson(
+    path: str,
+    summary: Dict[str, Any],
+    columns: ColumnarResults,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: Optional[bool] = None,
+) -> None:
+    """
+    Write results as NDJSON, at most ``chunk_size`` values per line.
+
+    :param compress: gzip the output, default when ``path`` ends in ``.gz``
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "summary": to_jsonable(summary),
+        "risk_ids": list(columns.risk_ids),
+        "fields": {
+            field: {"dtype": matrix.dtype.str, "shape": list(matrix.shape)}
+            for field, matrix in columns.matrices.items()
+        },
+        "offsets": None if columns.offsets is None else np.asarray(columns.offsets).tolist(),
+    }
+    with _open(path, "w", compress) as f:
+        f.write(json.dumps(header) + "\n")
+        for row, rid in enumerate(columns.risk_ids):
+            key = json.dumps(rid)
+            for field in columns.matrices:
+                for start, values in _row_chunks(columns, field, row, chunk_size):
+                    f.write(f'{{"id": {key}, "field": {json.dumps(field)}, "start": {start}'
+                            f'{_VALUES}{_format(values)}]}}\n')
+
+
+def write_json(
+    path: str,
+    summary: Dict[str, Any],
+    columns: ColumnarResults,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: Optional[bool] = None,
+) -> None:
+    """
+    Write results as the single JSON document of ``SimulationResults.to_json``,
+    formatting at most ``chunk_size`` values at a time.
+
+    :param compress: gzip the output, default when ``path`` ends in ``.gz``
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    with _open(path, "w", compress) as f:
+        f.write('{"summary": ' + json.dumps(to_jsonable(summary)) + ', "results": {')
+        for row, rid in enumerate(columns.risk_ids):
+            f.write((", " if row else "") + json.dumps(rid) + ": {")
+            for i, (field, matrix) in enumerate(columns.matrices.items()):
+                f.write((", " if i else "") + json.dumps(field) + ": ")
+                if field != "impact" and matrix.ndim == 1:
+                    f.write(json.dumps(matrix[row].item()))
+                    continue
+                f.write("[")
+                for start, values in _row_chunks(columns, field, row, chunk_size):
+                    f.write((", " if start else "") + _format(values))
+                f.write("]")
+            f.write("}")
+        f.write("}}")
+
+
+def read_ndjson(path: str, compress: Optional[bool] = None) -> Tuple[Dict[str, Any], ColumnarResults]:
+    """
+    Read results written by ``write_ndjson``, line by line.
+
+    :param compress: The input is gzipped, default when ``path`` ends in ``.gz``
+    :return: Tuple ``(summary, columns)``
+    :raises ValueError: If the file is not in the NDJSON results format, or
+        does not hold every value announced by its header (e.g. a truncated file)
+    """
+    with _open(path, "r", compress) as f:
+        return _read(f)
+
+
+def _parse_values(text: str, dtype: np.dtype, number: int) -> np.ndarray:
+    """
+    Parse the comma-separated values of line ``number`` as ``dtype``.
+
+    :raises ValueError: If a value is not a number, or not a whole number for an integer ``dtype``
+    """
+    if not text.strip():
+        return np.empty(0, dtype=dtype)
+    parse = dtype if dtype.kind == "f" else np.dtype(np.float64)
+    try:
+        with warnings.catch_warnings():
+            # numpy warns, and stops, at the first token it cannot parse
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(text, dtype=parse, sep=",")
+    except (ValueError, DeprecationWarning):
+        values = None
+    if values is None or values.size != text.count(",") + 1:
+        raise ValueError(f"Line {number} holds a value that is not a number")
+    if parse is dtype:
+        return values
+    if not np.all(np.isfinite(values) & (values == np.trunc(values))):
+        raise ValueError(f"Line {number} holds a value that is not a whole number")
+    return values.astype(dtype)
+
+
+def _read(f: TextIO) -> Tuple[Dict[str, Any], ColumnarResults]:
+    header = json.loads(f.readline() or "{}")
+    if header.get("format") != FORMAT or header.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported results format {header.get('format')!r} version {header.get('version')!r}")
+    risk_ids = header["risk_ids"]
+    index = {rid: row for row, rid in enumerate(risk_ids)}
+    offsets = None if header.get("offsets") is None else np.asarray(header["offsets"], dtype=np.int64)
+    arrays = {
+        field: np.zeros(spec["shape"], dtype=np.dtype(spec["dtype"]))
+        for field, spec in header["fields"].items()
+    }
+    # values received per risk and field, checked against the header at the end
+    received = {field: np.zeros(len(risk_ids), dtype=np.int64) for field in arrays}
+
+    for number, line in enumerate(f, start=2):
+        split = line.rfind(_VALUES)
+        if split < 0:
+            raise ValueError(f"Line {number} holds no values")
+        if not line.rstrip().endswith("]}"):
+            raise ValueError(f"Line {number} is incomplete: the file is truncated or corrupt")
+        try:
+            key = json.loads(line[:split] + "}")
+            target, row, start = arrays[key["field"]], index[key["id"]], int(key["start"])
+        except (ValueError, KeyError, TypeError) as err:
+            raise ValueError(f"Line {number} does not name a field and risk of the header: {err!r}") from None
+        values = _parse_values(line[split + len(_VALUES):line.rindex("]")], target.dtype, number)
+        received[key["field"]][row] += values.size
+        if key["field"] == "impact":
+            start += offsets[row]
+            target[start:start + values.size] = values
+        elif target.ndim == 1:
+            target[row] = values[0]
+        else:
+            target[row, start:start + values.size] = values
+
+    for field, counts in received.items():
+        if field == "impact":
+            expected = np.diff(offsets)
+        else:
+            expected = np.full(len(risk_ids), arrays[field][0].size if len(risk_ids) else 0)
+        incomplete = np.flatnonzero(counts != expected)
+        if incomplete.size:
+            row = incomplete[0]
+            raise ValueError(
+                f"{risk_ids[row]!r} has {counts[row]} values of {field!r}, expected {expected[row]}: "
+                "the file is truncated or corrupt"
+            )
+    return header["summary"], ColumnarResults(risk_ids, arrays, offsets)
+
@@ -0,0 +1,189 @@
+# src/QRALib/utils/storage.py
+# ---------------------------
+"""
+Binary on-disk storage of simulation results.
+
+A run is saved as a directory holding one ``.npy`` file per result field (the
+``(n_risks, num_of_iter)`` matrices of a ``ColumnarResults``, the flat event
+impacts and their offsets) next to a ``meta.json`` header with the summary, the
+risk IDs and the dtype and shape of every field. The arrays keep their dtype
+and are loaded memory-mapped by default, so opening a run costs the header
+only and a reader pages in just the rows it touches.
+"""
+import errno
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..simulation.columnar import ColumnarResults
+
+FORMAT = "qralib-results"
+VERSION = 1
+META_FILE = "meta.json"
+
+# memory-map mode -> access of the mapping
+MMAP_ACCESS = {"r": mmap.ACCESS_READ, "c": mmap.ACCESS_COPY, "r+": mmap.ACCESS_WRITE}
+
+
+def to_jsonable(obj: Any) -> Any:
+    """Convert arrays, numpy scalars and nested containers into JSON types."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Mapping):
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    return obj
+
+
+def is_results_dir(path: str) -> bool:
+    """True if ``path`` is a directory written by ``save_results``."""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def save_results(path: str, summary: Dict[str, Any], columns: ColumnarResults) -> None:
+    """
+    Write a simulation run to the directory ``path``.
+
+    The run is written to a temporary directory next to ``path`` and moved in
+    place at the end, so readers never see a partial run. An existing run at
+    ``path`` is renamed aside and replaced; several processes may write the
+    same path at once.
+
+    :param path: Target directory
+    :param summary: Summary of the run, must be JSON serializable once arrays are converted
+    :param columns: The per-risk results
+    :raises FileExistsError: If ``path`` exists and is not a saved run
+    """
+    path = os.path.abspath(path)
+    # a directory is checked once it is moved aside, as a concurrent writer may
+    # be replacing it right now
+    if os.path.isfile(path):
+        raise FileExistsError(f"{path} exists and does not hold saved simulation results")
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".qralib-", dir=parent)
+    try:
+        arrays = dict(columns.matrices)
+        if columns.offsets is not None:
+            arrays["offsets"] = np.asarray(columns.offsets, dtype=np.int64)
+        fields = {}
+        for field, array in arrays.items():
+            np.save(os.path.join(tmp, f"{field}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+            fields[field] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        meta = {
+            "format": FORMAT,
+            "version": VERSION,
+            "summary": to_jsonable(summary),
+            "risk_ids": list(columns.risk_ids),
+            "fields": fields,
+        }
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        _move_into_place(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _move_into_place(tmp: str, path: str) -> None:
+    """
+    Rename the directory ``tmp`` to ``path``. A run already at ``path`` is first
+    renamed aside and removed afterwards: ``path`` is missing for a moment but
+    never holds a partial run, and concurrent writers of the same path all
+    succeed, the last one winning. Readers that opened the old run keep its files.
+
+    :raises FileExistsError: If ``path`` is taken by anything but a saved run
+    """
+    parent = os.path.dirname(path)
+    while True:
+        if os.path.exists(path):
+            aside = tempfile.mkdtemp(prefix=".qralib-old-", dir=parent)
+            try:
+                os.rename(path, aside)
+            except FileNotFoundError:
+                # another writer moved it aside meanwhile
+                os.rmdir(aside)
+            else:
+                if not is_results_dir(aside):
+                    os.rename(aside, path)
+                    raise FileExistsError(f"{path} exists and does not hold saved simulation results")
+                shutil.rmtree(aside, ignore_errors=True)
+        try:
+            os.rename(tmp, path)
+            return
+        except OSError as err:
+            # another writer moved its run in meanwhile, replace that one
+            if err.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    """
+    Read and check the header of a saved run.
+
+    :raises ValueError: If ``path`` does not hold a run in a supported format
+    """
+    try:
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"{path} does not hold saved simulation results") from None
+    if meta.get("format") != FORMAT or meta.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported results format {meta.get('format')!r} version {meta.get('version')!r}")
+    return meta
+
+
+def load_results(path: str, mmap_mode: Optional[str] = "r") -> Tuple[Dict[str, Any], ColumnarResults]:
+    """
+    Open a run written by ``save_results``.
+
+    :param path: Directory of the run
+    :param mmap_mode: Memory-map mode, ``"r"`` (default) for read-only maps,
+        ``"c"`` for copy-on-write, ``"r+"`` to write through to the files,
+        ``None`` to read the arrays into memory
+    :return: Tuple ``(summary, columns)``
+    """
+    meta = read_meta(path)
+    arrays = {
+        field: _load_array(os.path.join(path, f"{field}.npy"), mmap_mode)
+        for field in meta["fields"]
+    }
+    for field, array in arrays.items():
+        spec = meta["fields"][field]
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ValueError(f"{field}.npy does not match the header of {path}")
+    offsets = arrays.pop("offsets", None)
+    return meta["summary"], ColumnarResults(meta["risk_ids"], arrays, offsets)
+
+
+def _load_array(file: str, mmap_mode: Optional[str]) -> np.ndarray:
+    """
+    Read the ``.npy`` file ``file`` into memory, or map it with ``mmap_mode``.
+    A mapped array is backed by its ``mmap.mmap``, its ``base``, which
+    ``columnar.release`` uses to drop the pages it read.
+    """
+    if mmap_mode is None:
+        return np.load(file, allow_pickle=False)
+    if mmap_mode not in MMAP_ACCESS:
+        raise ValueError(f"Unknown mmap_mode {mmap_mode!r}, choose from {list(MMAP_ACCESS)} or None")
+    with open(file, "r+b" if mmap_mode == "r+" else "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            raise ValueError(f"Unsupported .npy format version {version} of {file}")
+        if dtype.hasobject:
+            raise ValueError(f"{file} holds Python objects")
+        offset = f.tell()
+        buffer = mmap.mmap(f.fileno(), 0, access=MMAP_ACCESS[mmap_mode])
+    return np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset, order="F" if fortran_order else "C")
@@ -1,10 +1,37 @@
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for QRALib.
-
-    If you don't know what this is for, just leave it empty.
-    Read more about conftest.py under:
-    https://pytest.org/latest/plugins.html
+    Shared fixtures for the QRALib tests.
 """
+import pytest
+
+from QRALib.distributions import Beta, Lognormal, PERT, Uniform
+from QRALib.risk.model import Risk
+
+# frequency and impact of the test risks, cycled through; together they cover
+# every distribution the simulators draw from
+_TEMPLATES = [
+    ("Uniform", lambda: Uniform(0.5, 2.0), "Lognormal", lambda s: Lognormal(10.0 * s, 90.0 * s)),
+    ("Uniform", lambda: Uniform(0.1, 0.3), "PERT", lambda s: PERT(100.0 * s, 1000.0 * s, 50000.0 * s)),
+    ("Beta", lambda: Beta(2.0, 8.0), "Lognormal", lambda s: Lognormal(1000.0 * s, 9000.0 * s)),
+    ("Uniform", lambda: Uniform(0.1, 0.4), "PERT", lambda s: PERT(10.0 * s, 20.0 * s, 90.0 * s)),
+]
+
+
+def build_risks(n=2):
+    """
+    Fresh list of ``n`` test risks with IDs ``R0`` to ``R<n-1>``. The first two
+    have a Uniform frequency and a Lognormal and a PERT impact, the third a Beta
+    frequency; beyond four the templates repeat with larger impacts.
+    """
+    risks = []
+    for i in range(n):
+        frequency_group, frequency, impact_group, impact = _TEMPLATES[i % len(_TEMPLATES)]
+        scale = 1.0 + i // len(_TEMPLATES)
+        risks.append(Risk(f"R{i}", chr(ord("a") + i % 26), frequency_group, frequency(), impact_group, impact(scale)))
+    return risks
+
 
-# import pytest
+@pytest.fixture
+def make_risks():
+    """Factory of test registers, ``make_risks(n)`` returns ``build_risks(n)``."""
+    return build_risks
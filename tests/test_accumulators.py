@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.analysis.accumulators import (
+    ExceedanceCounter,
+    QuantileSketch,
+    RunningExtrema,
+    RunningMoments,
+    SimulationAccumulator,
+)
+from QRALib.api import simulate, simulate_blocks
+from QRALib.risk.model import Risk
+from QRALib.distributions import Lognormal, Uniform
+from QRALib.simulation.matrix import MatrixMonteCarlo
+from QRALib.simulation.streaming import stream_simulation
+
+
+def test_moments_and_extrema_merge():
+    rng = np.random.default_rng(1)
+    data = rng.lognormal(size=(3, 5000))
+    left, right = RunningMoments((3,)), RunningMoments((3,))
+    left.update(data[:, :1234])
+    right.update(data[:, 1234:3000])
+    right.update(data[:, 3000:])
+    left.merge(right)
+    np.testing.assert_allclose(left.mean, data.mean(axis=1))
+    np.testing.assert_allclose(left.variance, data.var(axis=1, ddof=1))
+    ext = RunningExtrema((3,))
+    ext.update(data[:, :10])
+    other = RunningExtrema((3,))
+    other.update(data[:, 10:])
+    ext.merge(other)
+    np.testing.assert_array_equal(ext.max, data.max(axis=1))
+
+
+def test_moments_of_float32_blocks_in_chunks(monkeypatch):
+    from QRALib.analysis import accumulators
+
+    monkeypatch.setattr(accumulators, "MOMENTS_CHUNK", 100)
+    data = np.random.default_rng(2).lognormal(size=(3, 1001)).astype(np.float32)
+    moments = RunningMoments((3,))
+    moments.update(data)
+    exact = data.astype(np.float64)
+    np.testing.assert_allclose(moments.mean, exact.mean(axis=1))
+    np.testing.assert_allclose(moments.variance, exact.var(axis=1, ddof=1))
+
+
+def test_exceedance_counter():
+    values = np.array([0.0, 1.0, 2.0, 2.0, 5.0])
+    counter = ExceedanceCounter([0.0, 2.0, 6.0])
+    counter.update(values[:2])
+    other = ExceedanceCounter([0.0, 2.0, 6.0])
+    other.update(values[2:])
+    counter.merge(other)
+    np.testing.assert_allclose(counter.exceedance(), [1.0, 0.6, 0.0])
+
+
+def test_quantile_sketch_relative_accuracy():
+    rng = np.random.default_rng(2)
+    data = np.concatenate((np.zeros(2000), rng.lognormal(10, 2, size=20000)))
+    sketch, other = QuantileSketch(0.01), QuantileSketch(0.01)
+    sketch.update(data[:7000])
+    other.update(data[7000:])
+    sketch.merge(other)
+    q = np.array([0.05, 0.5, 0.95, 0.99])
+    expected = np.quantile(data, q, method="lower")
+    assert sketch.quantile(0.05) == 0.0
+    np.testing.assert_allclose(sketch.quantile(q)[1:], expected[1:], rtol=0.011)
+    grid = np.array([0.0, np.median(data[data > 0])])
+    np.testing.assert_allclose(sketch.exceedance(grid), [np.mean(data >= g) for g in grid], atol=0.01)
+
+
+def test_simulation_accumulator_matches_full_run():
+    risks = [
+        Risk("R0", "a", "Uniform", Uniform(0.5, 2.0), "Lognormal", Lognormal(10.0, 90.0)),
+        Risk("R1", "b", "Uniform", Uniform(0.1, 0.5), "Lognormal", Lognormal(100.0, 900.0)),
+    ]
+    blocks = list(stream_simulation(MatrixMonteCarlo(risks), 5000, block_size=1500))
+    acc = SimulationAccumulator.from_blocks(blocks, grid=[0.0, 100.0])
+    totals = np.hstack([np.vstack([r["total"] for r in b["results"]]) for b in blocks])
+    assert acc.count == 5000
+    np.testing.assert_allclose(acc.ale()["ale"], totals.mean(axis=1))
+    np.testing.assert_allclose(acc.portfolio_exceedance.exceedance(),
+                               [1.0, np.mean(totals.sum(axis=0) >= 100.0)])
+    np.testing.assert_allclose(acc.stats("total")["max"], totals.max(axis=1))
+
+
+@pytest.mark.parametrize("detail", ["full", "totals", "summary"])
+def test_simulation_accumulator_at_every_detail_level(detail):
+    risks = [
+        Risk("R0", "a", "Uniform", Uniform(0.5, 2.0), "Lognormal", Lognormal(10.0, 90.0)),
+        Risk("R1", "b", "Uniform", Uniform(0.1, 0.5), "Lognormal", Lognormal(100.0, 900.0)),
+    ]
+    blocks = simulate_blocks(risks, iterations=3000, block_size=1000, seed=3, backend="serial", detail=detail)
+    if detail == "summary":
+        with pytest.raises(ValueError):
+            SimulationAccumulator.from_blocks(blocks)
+        return
+    acc = SimulationAccumulator.from_blocks(blocks)
+    totals = simulate(risks, iterations=3000, seed=3, backend="serial", detail="totals").results.matrix("total")
+    assert acc.count == 3000
+    assert acc.fields == (SimulationAccumulator.FIELDS if detail == "full" else ("total",))
+    np.testing.assert_allclose(acc.ale()["ale"], totals.mean(axis=1))
+    np.testing.assert_allclose(acc.stats("total")["max"], totals.max(axis=1))
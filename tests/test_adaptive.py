@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+import numpy as np
+import pytest
+
+from QRALib.api import simulate, simulate_adaptive
+from QRALib.simulation.adaptive import portfolio_precision
+
+
+def test_adaptive_run_meets_targets_and_equals_a_fixed_run(make_risks):
+    sim = simulate_adaptive(make_risks(), ale_rel_se=0.01, var_rel_ci_width=0.2, batch_size=1000, seed=6,
+                            backend="serial", detail="totals")
+    precision = sim.summary["precision"]
+    n = sim.summary["number_of_iterations"]
+    assert precision["converged"] and precision["iterations"] == n > 1000
+    assert precision["ale_rel_se"] <= 0.01 and precision["var_rel_ci_width"] <= 0.2
+
+    fixed = simulate(make_risks(), iterations=n, seed=6, backend="serial", detail="totals")
+    np.testing.assert_array_equal(sim.results.matrix("total"), fixed.results.matrix("total"))
+    assert precision["ale"] == pytest.approx(fixed.results.matrix("total").sum(axis=0).mean())
+
+
+def test_adaptive_run_stops_at_the_cap(make_risks):
+    sim = simulate_adaptive(make_risks(), method="rmc", ale_rel_se=1e-5, batch_size=700, max_iterations=3000,
+                            seed=6, backend="serial")
+    assert sim.summary["number_of_iterations"] == 3000
+    assert not sim.summary["precision"]["converged"]
+    with pytest.raises(ValueError):
+        simulate_adaptive(make_risks(), ale_rel_se=None)
+
+
+def test_var_interval_covers_the_quantile():
+    total = np.random.default_rng(0).exponential(size=200_000)
+    precision = portfolio_precision(total, quantile=0.99, confidence=0.95)
+    lo, hi = precision["var_ci"]
+    assert lo < math.log(100) < hi
+    assert lo <= precision["var"] <= hi
+    assert precision["ale_std_error"] == pytest.approx(1 / math.sqrt(total.size), rel=0.02)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, simulate
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_year_loss_table_layout(make_risks):
+    sim = simulate(make_risks(3), iterations=500, seed=3, backend="serial")
+    table = sim.to_arrow(chunk_size=400)
+    assert table.column_names == ["risk_id", "iteration", "occurrences", "total"]
+    assert pa.types.is_dictionary(table.schema.field("risk_id").type)
+    assert table.num_rows == 1500 and table.column("total").num_chunks == 4
+
+    frame = table.to_pandas()
+    r1 = frame[frame["risk_id"] == "R1"]
+    np.testing.assert_array_equal(r1["iteration"], np.arange(500))
+    np.testing.assert_array_equal(r1["total"], sim.results["R1"]["total"])
+    np.testing.assert_array_equal(r1["occurrences"], sim.results["R1"]["occurances"])
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_parquet_roundtrip(make_risks, tmp_path, dtype):
+    sim = simulate(make_risks(3), iterations=300, seed=4, backend="serial", dtype=dtype)
+    sim.to_parquet(str(tmp_path / "ylt.parquet"), chunk_size=250)
+    restored = SimulationResults.from_parquet(str(tmp_path / "ylt.parquet"))
+    assert restored.summary == sim.summary
+    assert list(restored.results) == ["R0", "R1", "R2"]
+    for field in ("occurances", "total"):
+        assert restored.results.matrix(field).dtype == sim.results.matrix(field).dtype
+        np.testing.assert_array_equal(restored.results.matrix(field), sim.results.matrix(field))
+
+
+def test_from_arrow_reorders_a_shuffled_table(make_risks):
+    sim = simulate(make_risks(3), iterations=50, seed=5, backend="serial", detail="totals")
+    table = sim.to_arrow()
+    shuffled = table.take(np.random.default_rng(0).permutation(table.num_rows))
+    restored = SimulationResults.from_arrow(shuffled)
+    np.testing.assert_array_equal(restored.results.matrix("total"), sim.results.matrix("total"))
+    with pytest.raises(ValueError, match="one row per iteration"):
+        SimulationResults.from_arrow(table.slice(0, 149))
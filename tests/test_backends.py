@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.simulation import backends
+from QRALib.simulation.backends import available_workers, resolve_backend
+from QRALib.simulation.matrix import MatrixMonteCarlo
+from QRALib.simulation.qmc import QuasiMonteCarlo
+from QRALib.simulation.smc import StandardMonteCarlo
+
+
+@pytest.mark.parametrize("simulator", [StandardMonteCarlo, QuasiMonteCarlo])
+def test_backends_give_identical_results(make_risks, simulator):
+    runs = [
+        simulator(make_risks(3), seed=5, backend=backend, max_workers=2).simulation(700)["results"]
+        for backend in ("serial", "threads", "processes")
+    ]
+    for other in runs[1:]:
+        for a, b in zip(runs[0], other):
+            for field in ("frequency", "occurances", "impact", "single_risk_impact", "total"):
+                np.testing.assert_array_equal(a[field], b[field])
+
+
+def test_auto_backend_follows_workload(make_risks):
+    assert resolve_backend("auto", 600, 10, 8) == "serial"
+    assert resolve_backend("auto", 600, 10000, 8) == "threads"
+    assert resolve_backend("auto", 600, 1000000, 8) == "processes"
+    assert resolve_backend("auto", 600, 1000000, 1) == "serial"
+    assert resolve_backend("threads", 1, 1, 1) == "threads"
+    with pytest.raises(ValueError):
+        resolve_backend("gpu", 1, 1, 1)
+    with pytest.raises(ValueError):
+        StandardMonteCarlo(make_risks(3), backend="gpu")
+
+
+def test_matrix_engine_rejects_backends_it_cannot_honour(make_risks):
+    assert MatrixMonteCarlo(make_risks(3), backend="serial").backend == "serial"
+    for backend in ("gpu", "threads", "processes"):
+        with pytest.raises(ValueError):
+            MatrixMonteCarlo(make_risks(3), backend=backend)
+    with pytest.raises(ValueError):
+        MatrixMonteCarlo(make_risks(3), max_workers=0)
+
+
+def test_max_workers_caps_available_cpus(monkeypatch):
+    monkeypatch.setattr(backends.joblib, "cpu_count", lambda only_physical_cores=False: 16)
+    assert available_workers() == 16
+    assert available_workers(4) == 4
+    assert available_workers(64) == 16
+    with pytest.raises(ValueError):
+        available_workers(0)
+
+
+def test_simulator_is_shared_safely_between_threads(make_risks):
+    from concurrent.futures import ThreadPoolExecutor
+    from QRALib.analysis.accumulators import SimulationAccumulator
+
+    sim = StandardMonteCarlo(make_risks(3), seed=3, backend="serial")
+    ranges = [(0, 400), (400, 1000), (1000, 1300), (1300, 2000)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        blocks = list(pool.map(lambda r: sim.simulation(r[1] - r[0], start=r[0]), ranges))
+    whole = sim.simulation(2000)
+    for row, expected in enumerate(whole["results"]):
+        np.testing.assert_array_equal(
+            np.concatenate([b["results"][row]["total"] for b in blocks]), expected["total"]
+        )
+
+    acc = SimulationAccumulator([r.uniq_id for r in make_risks(3)])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(acc.update, blocks))
+    assert acc.count == 2000
+    np.testing.assert_allclose(
+        acc.moments["total"].mean, [r["total"].mean() for r in whole["results"]]
+    )
+
+
+def test_sensitivity_indices_are_reproducible_across_threads(make_risks):
+    from concurrent.futures import ThreadPoolExecutor
+    from QRALib.analysis.sensitivity_analysis import SensitivityAnalysis
+
+    sa = SensitivityAnalysis(make_risks(3))
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        runs = list(pool.map(lambda _: sa.morris_indices(N=20, seed=4), range(3)))
+    for other in runs[1:]:
+        np.testing.assert_array_equal(runs[0]["mu_star"], other["mu_star"])
+        np.testing.assert_array_equal(runs[0]["mu_star_conf"], other["mu_star_conf"])
+
+
+@pytest.mark.parametrize("seed", [None, 0])
+def test_sensitivity_leaves_the_global_random_state_alone(make_risks, seed):
+    from QRALib.analysis.sensitivity_analysis import SensitivityAnalysis
+    sa = SensitivityAnalysis(make_risks(3))
+    state = np.random.get_state()
+    sa.sobol_indices(N=64, seed=seed)
+    sa.morris_indices(N=10, seed=seed)
+    after = np.random.get_state()
+    assert after[2:] == state[2:] and np.array_equal(after[1], state[1])
+    if seed is not None:
+        np.testing.assert_array_equal(sa.sobol_indices(N=64, seed=seed)["S1_conf"],
+                                      sa.sobol_indices(N=64, seed=seed)["S1_conf"])
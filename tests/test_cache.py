@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import mmap
+import os
+
+import numpy as np
+
+from QRALib.api import simulate
+from QRALib.distributions import PERT
+from QRALib.utils.cache import ResultCache, cache_key
+
+
+def test_repeated_simulation_is_served_from_the_cache(make_risks, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = simulate(make_risks(), iterations=500, seed=3, backend="serial", cache=cache)
+    assert len(cache) == 1
+
+    import QRALib.api as api
+    monkeypatch.setattr(api, "_get_simulator", None)  # a hit must not simulate
+    second = simulate(make_risks(), iterations=500, seed=3, backend="threads", cache=cache)
+    assert second.summary == first.summary
+    assert isinstance(second.results.matrix("total").base, mmap.mmap)
+    for field in first.results.fields:
+        np.testing.assert_array_equal(second.results.matrix(field), first.results.matrix(field))
+
+
+def test_key_covers_the_run_definition(make_risks):
+    edited = make_risks()
+    edited[1].impact_model = PERT(100.0, 1000.0, 60000.0)
+    key = cache_key(make_risks(), "smc", 500, 3)
+    assert key == cache_key(make_risks(), "smc", 500, 3)
+    assert len({
+        key,
+        cache_key(edited, "smc", 500, 3),
+        cache_key(make_risks(), "qmc", 500, 3),
+        cache_key(make_risks(), "smc", 501, 3),
+        cache_key(make_risks(), "smc", 500, 4),
+        cache_key(make_risks(), "smc", 500, 3, dtype="float32"),
+        cache_key(make_risks(), "smc", 500, 3, detail="totals"),
+    }) == 7
+
+
+def test_least_recently_used_runs_are_evicted(make_risks, tmp_path):
+    one = simulate(make_risks(), iterations=1000, seed=1, backend="serial")
+    run_bytes = sum(m.nbytes for m in one.results.matrices.values())
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=int(2.5 * run_bytes))
+
+    cache.put("a", one.summary, one.columns)
+    cache.put("b", one.summary, one.columns)
+    os.utime(os.path.join(cache.directory, "a", "meta.json"), (0, 0))
+    os.utime(os.path.join(cache.directory, "b", "meta.json"), (1, 1))
+    assert cache.get("a") is not None  # now the most recently used
+    cache.put("c", one.summary, one.columns)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.size() <= cache.max_bytes
+
+    simulate(make_risks(), iterations=100, seed=None, backend="serial", cache=cache)
+    assert len(cache) == 2  # unseeded runs are not cached
+
+
+def test_run_size_counts_the_event_offsets(make_risks, tmp_path):
+    one = simulate(make_risks(), iterations=1000, seed=1, backend="serial")
+    run_bytes = sum(m.nbytes for m in one.results.matrices.values())
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=run_bytes)
+    cache.put("a", one.summary, one.columns)
+    assert "a" not in cache
+    cache.max_bytes = run_bytes + one.columns.offsets.nbytes
+    cache.put("a", one.summary, one.columns)
+    assert "a" in cache
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, analyze_mariq, compute_tornado, simulate
+from QRALib.analysis.mariq import MaRiQAnalysis
+from QRALib.analysis.tornado import TornadoAnalysis
+from QRALib.simulation.columnar import ColumnarResults
+
+
+@pytest.mark.parametrize("method", ["smc", "matrix"])
+def test_results_are_views_of_the_matrices(make_risks, method):
+    sim = simulate(make_risks(3), method=method, iterations=800, seed=2, backend="serial")
+    columns = sim.results
+    assert isinstance(columns, ColumnarResults)
+    assert columns.matrix("total").shape == (3, 800)
+    assert list(columns) == ["R0", "R1", "R2"]
+    for row, rid in enumerate(columns):
+        assert columns.index[rid] == row
+        for field, values in columns[rid].items():
+            assert np.shares_memory(values, columns.matrix(field))
+        assert columns[rid]["impact"].size == columns[rid]["occurances"].sum()
+
+
+def test_analyses_on_columns_match_per_risk_lists(make_risks):
+    sim = simulate(make_risks(3), iterations=1000, seed=6, backend="serial")
+    rows = {
+        "summary": {"number_of_iterations": 1000},
+        "results": [{"id": rid, **{k: np.array(v) for k, v in fields.items()}} for rid, fields in sim.results.items()],
+    }
+    tolerance = ([0.0, 1e5], [100.0, 1.0])
+    columnar = MaRiQAnalysis(sim, tolerance)
+    assert np.shares_memory(columnar.uncertainty, sim.results.matrix("single_risk_impact"))
+    listed = MaRiQAnalysis(rows, tolerance)
+    for key in ("mean_frequency", "mean_impact", "mean_expected_loss"):
+        np.testing.assert_array_equal(columnar.compute_single()[key], listed.compute_single()[key])
+    np.testing.assert_array_equal(analyze_mariq(sim, tolerance)["total"]["exceedance"], listed.compute_total()["exceedance"])
+    np.testing.assert_array_equal(
+        compute_tornado(sim, "total")["positive_variation"],
+        TornadoAnalysis(rows).compute_variation("total")["positive_variation"],
+    )
+
+
+def test_json_roundtrip_rebuilds_columns(make_risks):
+    sim = simulate(make_risks(3), iterations=300, seed=1, backend="serial")
+    restored = SimulationResults.from_json(sim.to_json())
+    assert isinstance(restored.results, ColumnarResults)
+    for field in ("frequency", "occurances", "impact", "single_risk_impact", "total"):
+        np.testing.assert_array_equal(restored.results.matrix(field), sim.results.matrix(field))
+    np.testing.assert_array_equal(restored.results.offsets, sim.results.offsets)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from QRALib.api import analyze_mariq, simulate
+from QRALib.pipeline import QRAPipeline
+
+REGISTER = Path(__file__).resolve().parent.parent / "examples" / "test_data_18.csv"
+
+
+@pytest.mark.parametrize("method", ["smc", "qmc", "matrix"])
+def test_totals_detail_keeps_only_identical_totals(make_risks, method):
+    full = simulate(make_risks(), method=method, iterations=1500, seed=9, backend="serial")
+    totals = simulate(make_risks(), method=method, iterations=1500, seed=9, backend="serial", detail="totals")
+    assert totals.summary["detail"] == "totals"
+    for rid, result in totals.results.items():
+        assert list(result) == ["total"]
+        np.testing.assert_array_equal(result["total"], full.results[rid]["total"])
+
+    mariq = analyze_mariq(totals, ([0.0, 1e5], [100.0, 1.0]))
+    assert mariq["single"] is None
+    np.testing.assert_array_equal(
+        mariq["total"]["exceedance"], analyze_mariq(full, ([0.0, 1e5], [100.0, 1.0]))["total"]["exceedance"]
+    )
+
+
+def test_summary_detail_reduces_every_risk(make_risks):
+    full = simulate(make_risks(), iterations=2000, seed=4, backend="serial")
+    summary = simulate(make_risks(), iterations=2000, seed=4, backend="serial", detail="summary")
+    for rid, stats in summary.results.items():
+        total = full.results[rid]["total"]
+        assert stats["ale"] == pytest.approx(total.mean())
+        assert stats["ale_std_error"] == pytest.approx(total.std(ddof=1) / np.sqrt(total.size))
+        assert stats["mean_frequency"] == pytest.approx(full.results[rid]["frequency"].mean())
+        assert stats["mean_occurances"] == pytest.approx(full.results[rid]["occurances"].mean())
+
+
+def test_unknown_detail_is_rejected(make_risks):
+    with pytest.raises(ValueError, match="detail"):
+        simulate(make_risks(), iterations=10, detail="everything")
+
+
+def test_pipeline_analyses_follow_the_detail_level():
+    tolerance = ([0.0, 1e6], [100.0, 1.0])
+    totals = QRAPipeline(str(REGISTER), iterations=500, seed=5, backend="serial", detail="totals")
+    totals.run_simulation()
+    assert totals.analyze_mariq(tolerance)["single"] is None
+    assert len(totals.analyze_tornado("total")["id"]) == 18
+    with pytest.raises(ValueError, match="frequency"):
+        totals.analyze_tornado("frequency")
+
+    summary = QRAPipeline(str(REGISTER), iterations=500, seed=5, backend="serial", detail="summary")
+    summary.run_simulation()
+    for analysis in (lambda: summary.analyze_mariq(tolerance), summary.analyze_tornado,
+                     lambda: summary.analyze_single_risk(0)):
+        with pytest.raises(ValueError, match="detail='summary'"):
+            analysis()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, analyze_mariq, simulate
+from QRALib.analysis.accumulators import SimulationAccumulator
+
+
+@pytest.mark.parametrize("method", ["smc", "rmc", "matrix"])
+def test_float32_results_round_the_float64_results(make_risks, method):
+    full = simulate(make_risks(), method=method, iterations=2000, seed=5, backend="serial")
+    compact = simulate(make_risks(), method=method, iterations=2000, seed=5, backend="serial", dtype="float32")
+    assert compact.summary["dtype"] == "float32"
+    for rid, result in compact.results.items():
+        assert result["occurances"].dtype == np.int32
+        for field in ("frequency", "impact", "single_risk_impact", "total"):
+            assert result[field].dtype == np.float32
+            # stored values are the float64 values rounded once
+            np.testing.assert_array_equal(result[field], full.results[rid][field].astype(np.float32))
+        np.testing.assert_array_equal(result["occurances"], full.results[rid]["occurances"])
+
+
+def test_float32_results_roundtrip_json_and_analyses(make_risks):
+    sim = simulate(make_risks(), iterations=1000, seed=3, backend="serial", dtype="float32")
+    restored = SimulationResults.from_json(sim.to_json())
+    for rid, result in restored.results.items():
+        assert result["total"].dtype == np.float32
+        np.testing.assert_array_equal(result["total"], sim.results[rid]["total"])
+
+    reference = simulate(make_risks(), iterations=1000, seed=3, backend="serial")
+    tolerance = ([0.0, 1e5], [100.0, 1.0])
+    mean = analyze_mariq(sim, tolerance)["single"]["mean_expected_loss"]
+    assert mean.dtype == np.float64
+    np.testing.assert_allclose(mean, analyze_mariq(reference, tolerance)["single"]["mean_expected_loss"], rtol=1e-6)
+
+    acc = SimulationAccumulator.from_blocks([sim])
+    np.testing.assert_allclose(acc.ale()["ale"], [sim.results[r]["total"].mean(dtype=np.float64) for r in acc.risk_ids])
+
+
+def test_unknown_dtype_is_rejected(make_risks):
+    with pytest.raises(ValueError, match="dtype"):
+        simulate(make_risks(), iterations=10, dtype="float16")
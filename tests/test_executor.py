@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from QRALib.distributions import Lognormal
+from QRALib.risk.portfolio import RiskPortfolio
+from QRALib.simulation.executor import SimulationExecutor
+from QRALib.simulation.smc import StandardMonteCarlo
+
+
+def test_fingerprint_follows_definition(make_risks):
+    assert RiskPortfolio(make_risks(3)).fingerprint() == RiskPortfolio(make_risks(3)).fingerprint()
+    edited = make_risks(3)
+    edited[0].impact_model = Lognormal(10.0, 95.0)
+    assert make_risks(3)[1].fingerprint() == edited[1].fingerprint()
+    assert make_risks(3)[0].fingerprint() != edited[0].fingerprint()
+    assert make_risks(3)[2].to_dict()["frequency"] == {"distribution": "Beta", "parameters": {"alpha": 2.0, "beta": 8.0}}
+
+
+def test_executor_matches_joblib_and_caches_portfolio(make_risks):
+    risks = make_risks(3)
+    expected = StandardMonteCarlo(risks, seed=9).simulation(800)["results"]
+    with SimulationExecutor(max_workers=2) as executor:
+        for _ in range(2):
+            result = StandardMonteCarlo(risks, seed=9, executor=executor).simulation(800)["results"]
+            for a, b in zip(result, expected):
+                np.testing.assert_array_equal(a["total"], b["total"])
+        assert executor._sent == {RiskPortfolio(risks).fingerprint()}
+
+
+def test_default_workers_follow_available_cpus(monkeypatch):
+    import QRALib.simulation.executor as executor_module
+    monkeypatch.setattr(executor_module, "available_workers", lambda max_workers=None: 3)
+    executor = SimulationExecutor()
+    try:
+        assert executor.max_workers == 3
+    finally:
+        executor.shutdown()
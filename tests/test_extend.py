@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, extend, simulate
+from QRALib.distributions import PERT
+
+
+def _assert_same(a, b):
+    assert a.summary["number_of_iterations"] == b.summary["number_of_iterations"]
+    assert a.results.fields == b.results.fields
+    for field in b.results.fields:
+        np.testing.assert_array_equal(a.results.matrix(field), b.results.matrix(field))
+    if b.results.offsets is not None:
+        np.testing.assert_array_equal(a.results.offsets, b.results.offsets)
+
+
+@pytest.mark.parametrize("method", ["smc", "qmc", "rmc", "matrix"])
+def test_extended_run_equals_longer_run(make_risks, method):
+    # the extension crosses a stream block boundary (65 536 iterations)
+    run = simulate(make_risks(), method=method, iterations=40000, seed=11, backend="serial")
+    extended = extend(run, make_risks(), 40000, backend="serial", block_size=30000)
+    _assert_same(extended, simulate(make_risks(), method=method, iterations=80000, seed=11, backend="serial"))
+    assert extended.summary["seed"] == 11 and extended.summary["method"] == method
+
+
+def test_checkpointed_run_resumes_after_interruption(make_risks, tmp_path):
+    path = str(tmp_path / "checkpoint")
+    expected = simulate(make_risks(), iterations=1000, seed=4, backend="serial", dtype="float32")
+    _assert_same(simulate(make_risks(), iterations=1000, seed=4, backend="serial", dtype="float32",
+                          checkpoint=path, checkpoint_every=300), expected)
+    parts = sorted(os.listdir(path))
+    assert parts == [f"part-{first:015d}" for first in (0, 300, 600, 900)]
+
+    # lose the last two blocks, the unseeded call picks up the checkpoint's seed
+    for name in parts[2:]:
+        shutil.rmtree(os.path.join(path, name))
+    resumed = simulate(make_risks(), iterations=1000, backend="serial", dtype="float32",
+                       checkpoint=path, checkpoint_every=300)
+    _assert_same(resumed, expected)
+    assert resumed.summary["seed"] == 4
+
+    with pytest.raises(ValueError):
+        simulate(make_risks(), iterations=1000, seed=5, backend="serial", dtype="float32", checkpoint=path)
+
+
+def test_extend_with_checkpoint_and_saved_runs(make_risks, tmp_path):
+    simulate(make_risks(), iterations=500, seed=2, backend="serial").save(str(tmp_path / "run"))
+    run = SimulationResults.load(str(tmp_path / "run"))
+    extended = extend(run, make_risks(), 700, backend="serial", checkpoint=str(tmp_path / "checkpoint"),
+                      checkpoint_every=400)
+    _assert_same(extended, simulate(make_risks(), iterations=1200, seed=2, backend="serial"))
+    assert len(os.listdir(tmp_path / "checkpoint")) == 3
+
+    summary_only = simulate(make_risks(), iterations=500, seed=2, backend="serial", detail="summary")
+    with pytest.raises(ValueError):
+        extend(summary_only, make_risks(), 100)
+
+
+def test_checkpoint_of_edited_risks_is_refused(make_risks, tmp_path):
+    path = str(tmp_path / "checkpoint")
+    simulate(make_risks(), iterations=600, seed=4, backend="serial", checkpoint=path, checkpoint_every=300)
+    edited = make_risks()
+    edited[1].impact_model = PERT(100.0, 2000.0, 50000.0)
+    with pytest.raises(ValueError, match="fingerprint"):
+        simulate(edited, iterations=900, seed=4, backend="serial", checkpoint=path, checkpoint_every=300)
+
+    run = simulate(edited, iterations=300, seed=4, backend="serial")
+    with pytest.raises(ValueError, match="fingerprint"):
+        extend(run, edited, 600, backend="serial", checkpoint=path, checkpoint_every=300)
+    assert len(os.listdir(path)) == 2
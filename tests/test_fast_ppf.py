@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.distributions import Beta, Lognormal, PERT, Uniform
+from QRALib.distributions.kernels import BetaPPFTable, beta_table
+from QRALib.risk.model import Risk
+
+U = np.concatenate((np.random.default_rng(0).random(100000), [0.0, 1e-12, 0.5, 1 - 1e-12]))
+
+
+def test_closed_forms_match_scipy():
+    for model in (Lognormal(10.0, 9000.0), Lognormal(0.5, 2.0), Uniform(0.5, 2.0), Uniform(3.0, 4.0)):
+        u = U[U < 1]
+        np.testing.assert_allclose(model.fast_ppf(u), model.draw_ppf(u), rtol=1e-12)
+
+
+@pytest.mark.parametrize("alpha,beta", [(2.0, 8.0), (0.5, 0.5), (1.0, 1.0), (5.0, 1.2), (0.3, 4.0), (1.5, 50.0)])
+@pytest.mark.parametrize("tolerance", [1e-4, 1e-6])
+def test_beta_table_error_is_bounded(alpha, beta, tolerance):
+    model = Beta(alpha, beta)
+    error = np.abs(model.fast_ppf(U, tolerance) - model.draw_ppf(U))
+    assert error.max() <= 1.05 * tolerance
+
+
+@pytest.mark.parametrize("alpha,beta", [(0.05, 0.05), (0.01, 0.01), (0.2, 0.2), (0.05, 5.0), (50.0, 50.0), (1000.0, 1000.0)])
+def test_beta_table_error_is_bounded_at_extreme_shapes(alpha, beta):
+    # the error of shapes far from 1 peaks away from the interval midpoints, and
+    # within a few ulps of 1 the cdf is too coarse to tabulate
+    u = np.concatenate((U, np.linspace(0.0, 1.0, 200001), 1 - np.logspace(-16, -2, 2000), [1.0]))
+    model = Beta(alpha, beta)
+    error = np.abs(model.fast_ppf(u) - model.draw_ppf(u))
+    assert error.max() <= 1e-6
+
+
+def test_pert_table_error_scales_with_support():
+    model = PERT(100.0, 1000.0, 50000.0)
+    u = U[U < 1]
+    error = np.abs(model.fast_ppf(u) - model.draw_ppf(u))
+    assert error.max() <= 1.05e-6 * (50000.0 - 100.0)
+
+
+def test_tables_are_shared_and_tolerance_checked():
+    assert beta_table(2.0, 8.0) is beta_table(2.0, 8.0)
+    assert len(beta_table(2.0, 8.0, 1e-3)) < len(beta_table(2.0, 8.0, 1e-6))
+    with pytest.raises(ValueError):
+        BetaPPFTable(2.0, 8.0, tolerance=0)
+
+
+def test_risk_ppf_uses_fast_kernel_on_request():
+    risk = Risk("R0", "a", "Beta", Beta(2.0, 8.0), "Lognormal", Lognormal(10.0, 90.0))
+    u = np.array([0.1, 0.5, 0.9])
+    np.testing.assert_array_equal(risk.get_frequency_ppf(u, fast=True), Beta(2.0, 8.0).fast_ppf(u))
+    np.testing.assert_array_equal(risk.get_frequency_ppf(u), Beta(2.0, 8.0).draw_ppf(u))
+    with pytest.raises(ValueError):
+        risk.get_impact_ppf(np.array([1.0]), fast=True)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from QRALib.pipeline import QRAPipeline
+
+TOLERANCE = ([0.0, 1e6], [100.0, 1.0])
+REGISTER = Path(__file__).resolve().parent.parent / "examples" / "test_data_18.csv"
+
+
+def _edit(path, old, new):
+    text = path.read_text()
+    assert old in text
+    path.write_text(text.replace(old, new, 1))
+
+
+@pytest.mark.parametrize("detail", ["full", "totals"])
+def test_incremental_run_equals_full_run(tmp_path, detail):
+    register = tmp_path / "register.csv"
+    shutil.copy(REGISTER, register)
+    pipeline = QRAPipeline(str(register), iterations=3000, seed=5, backend="serial", detail=detail)
+    pipeline.run_simulation()
+    if detail == "full":
+        pipeline.analyze_mariq(TOLERANCE)
+
+    # change one risk, drop one and add one
+    _edit(register, "UP01,UniformPert,Uniform,0.113,0.358", "UP01,UniformPert,Uniform,0.2,0.358")
+    _edit(register, "UP00,", "NEW0,")
+    pipeline.reload()
+    results = pipeline.run_simulation(incremental=True)
+    assert sorted(results["summary"]["resimulated"]) == ["NEW0", "UP01"]
+
+    full = QRAPipeline(str(register), iterations=3000, seed=5, backend="serial", detail=detail)
+    expected = full.run_simulation()["columns"]
+    columns = results["columns"]
+    assert columns.risk_ids == expected.risk_ids
+    for field in expected.fields:
+        np.testing.assert_array_equal(columns.matrix(field), expected.matrix(field))
+    if detail == "full":
+        np.testing.assert_array_equal(columns.offsets, expected.offsets)
+
+        updated, fresh = pipeline.analyze_mariq(TOLERANCE), full.analyze_mariq(TOLERANCE)
+        np.testing.assert_array_equal(pipeline._mariq.total_risk, full._mariq.total_risk)
+        for key in ("mean_frequency", "mean_impact", "mean_expected_loss", "uncertainty"):
+            np.testing.assert_array_equal(updated["single"][key], fresh["single"][key])
+
+
+def test_changed_settings_simulate_everything():
+    pipeline = QRAPipeline(str(REGISTER), iterations=500, seed=5, backend="serial")
+    pipeline.run_simulation()
+    assert pipeline.run_simulation(incremental=True)["summary"]["resimulated"] == []
+
+    pipeline.iterations = 600
+    results = pipeline.run_simulation(incremental=True)
+    assert results["summary"]["resimulated"] == pipeline.portfolio.ids()
+
+    qmc = QRAPipeline(str(REGISTER), method="qmc", iterations=500, seed=5, backend="serial")
+    qmc.run_simulation()
+    assert qmc.run_simulation(incremental=True)["summary"]["resimulated"] == qmc.portfolio.ids()
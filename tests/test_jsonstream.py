@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, simulate
+
+
+def _quoted(risks):
+    # an ID that needs escaping in JSON
+    risks[1].uniq_id = 'R "1"'
+    return risks
+
+
+@pytest.mark.parametrize("name", ["run.ndjson", "run.ndjson.gz"])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_ndjson_roundtrip(make_risks, tmp_path, name, dtype):
+    sim = simulate(_quoted(make_risks()), iterations=500, seed=2, backend="serial", dtype=dtype)
+    sim.to_ndjson(str(tmp_path / name), chunk_size=128)
+    restored = SimulationResults.from_ndjson(str(tmp_path / name))
+    assert restored.summary == sim.summary
+    assert list(restored.results) == list(sim.results)
+    for field in sim.results.fields:
+        matrix = restored.results.matrix(field)
+        assert matrix.dtype == sim.results.matrix(field).dtype
+        np.testing.assert_array_equal(matrix, sim.results.matrix(field))
+
+
+def test_ndjson_summary_detail(make_risks, tmp_path):
+    sim = simulate(_quoted(make_risks()), iterations=200, seed=2, backend="serial", detail="summary")
+    sim.to_ndjson(str(tmp_path / "run.ndjson"))
+    restored = SimulationResults.from_ndjson(str(tmp_path / "run.ndjson"))
+    np.testing.assert_array_equal(restored.results.matrix("ale"), sim.results.matrix("ale"))
+
+
+def test_streamed_json_matches_to_json(make_risks, tmp_path):
+    sim = simulate(_quoted(make_risks()), iterations=300, seed=6, backend="serial")
+    sim.write_json(str(tmp_path / "run.json.gz"), chunk_size=100)
+    with gzip.open(tmp_path / "run.json.gz", "rt") as f:
+        data = json.load(f)
+    assert data == sim.to_json()
+    restored = SimulationResults.from_json(data)
+    np.testing.assert_array_equal(restored.results.matrix("total"), sim.results.matrix("total"))
+
+
+def test_truncated_ndjson_is_rejected(make_risks, tmp_path):
+    sim = simulate(_quoted(make_risks()), iterations=500, seed=2, backend="serial")
+    path = tmp_path / "run.ndjson"
+    sim.to_ndjson(str(path), chunk_size=128)
+    lines = path.read_text().splitlines(keepends=True)
+
+    (tmp_path / "lines.ndjson").write_text("".join(lines[:-3]))
+    with pytest.raises(ValueError, match="truncated"):
+        SimulationResults.from_ndjson(str(tmp_path / "lines.ndjson"))
+    (tmp_path / "cut.ndjson").write_text("".join(lines)[:-40])
+    with pytest.raises(ValueError, match="truncated"):
+        SimulationResults.from_ndjson(str(tmp_path / "cut.ndjson"))
+
+
+def _corrupt(make_risks, tmp_path, field, edit):
+    sim = simulate(make_risks(), iterations=50, seed=2, backend="serial")
+    path = tmp_path / "run.ndjson"
+    sim.to_ndjson(str(path))
+    lines = path.read_text().splitlines(keepends=True)
+    number = next(i for i, line in enumerate(lines) if f'"field": "{field}"' in line)
+    lines[number] = edit(lines[number])
+    path.write_text("".join(lines))
+    return str(path), f"Line {number + 1}"
+
+
+@pytest.mark.parametrize("field, edit", [
+    ("total", lambda line: line.replace('"values": [', '"values": [1.5x, ')),
+    ("total", lambda line: line.replace('"values": [', '"values": [, ')),
+    ("occurances", lambda line: line.replace('"values": [', '"values": [0.9, ')),
+    ("occurances", lambda line: line.replace('"values": [', '"values": [NaN, ')),
+    ("total", lambda line: line.replace('"id": "R0"', '"id": "R9"')),
+    ("total", lambda line: line.replace('"field": "total"', '"field": "totals"')),
+])
+def test_corrupt_ndjson_line_is_rejected_on_its_line(make_risks, tmp_path, field, edit):
+    path, line = _corrupt(make_risks, tmp_path, field, edit)
+    with pytest.raises(ValueError, match=line):
+        SimulationResults.from_ndjson(path)
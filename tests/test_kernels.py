@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.simulation.kernels import aggregate_occurrences, poisson_ppf
+
+
+def test_aggregate_occurrences_matches_loop():
+    rng = np.random.default_rng(0)
+    occurrences = rng.poisson(1.5, size=1000)
+    impact = rng.random(occurrences.sum())
+    expected = []
+    last = 0
+    for n in occurrences:
+        expected.append(impact[last:last + n].sum())
+        last += n
+    total = aggregate_occurrences(occurrences, impact)
+    assert isinstance(total, np.ndarray)
+    np.testing.assert_allclose(total, expected)
+
+
+def test_aggregate_occurrences_edge_cases():
+    assert aggregate_occurrences(np.zeros(5, dtype=int), np.array([])).tolist() == [0.0] * 5
+    total = aggregate_occurrences(np.array([[0, 2], [1, 0]]), np.array([1.0, 2.0, 4.0]))
+    assert total.tolist() == [[0.0, 3.0], [4.0, 0.0]]
+    with pytest.raises(ValueError):
+        aggregate_occurrences(np.array([1, 1]), np.array([1.0]))
+
+
+def test_poisson_ppf_matches_scipy():
+    from scipy.stats import poisson
+
+    rng = np.random.default_rng(1)
+    u = rng.random((50, 400))
+    rate = rng.uniform(0, 80, size=(50, 400))
+    rate[0] = 0.0
+    counts = poisson_ppf(u, rate)
+    assert counts.shape == u.shape and counts.dtype == np.int64
+    np.testing.assert_array_equal(counts, poisson.ppf(u, rate))
+    # uniforms rounding to a cdf of 1 must terminate
+    assert poisson_ppf(np.array([1 - 1e-16]), np.array([3.0]))[0] > 0
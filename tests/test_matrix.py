@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from QRALib.simulation.matrix import MatrixMonteCarlo
+
+
+def test_matrix_simulation_shapes(make_risks):
+    result = MatrixMonteCarlo(make_risks(3)).simulation(2000)
+    assert result["summary"]["number_of_iterations"] == 2000
+    assert [r["id"] for r in result["results"]] == ["R0", "R1", "R2"]
+    for r in result["results"]:
+        assert r["frequency"].shape == (2000,)
+        assert r["single_risk_impact"].shape == (2000,)
+        assert r["impact"].shape == (r["occurances"].sum(),)
+        np.testing.assert_allclose(r["total"].sum(), r["impact"].sum())
+
+
+def test_matrix_engine_draws_the_streams_of_smc(make_risks):
+    from QRALib.simulation.smc import StandardMonteCarlo
+
+    matrix = MatrixMonteCarlo(make_risks(4), seed=3).simulation(1500)["columns"]
+    smc = StandardMonteCarlo(make_risks(4), seed=3, backend="serial").simulation(1500)["columns"]
+    for field in smc.fields:
+        np.testing.assert_array_equal(matrix.matrix(field), smc.matrix(field))
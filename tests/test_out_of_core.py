@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, simulate
+from QRALib.analysis.mariq import MaRiQAnalysis
+from QRALib.analysis.single_risk_analysis import SingleRiskAnalysis
+from QRALib.analysis.tornado import TornadoAnalysis
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_memory_mapped_blocks_match_in_memory(make_risks, tmp_path, dtype):
+    sim = simulate(make_risks(7), iterations=3000, seed=12, backend="serial", dtype=dtype)
+    sim.save(str(tmp_path / "run"))
+    mapped = SimulationResults.load(str(tmp_path / "run"))
+    tolerance = ([0.0, 1e4, 1e5], [100.0, 50.0, 1.0])
+
+    reference = MaRiQAnalysis(sim, tolerance)
+    blocked = MaRiQAnalysis(mapped, tolerance, block_bytes=5000)
+    np.testing.assert_array_equal(blocked.total_risk, reference.total_risk)
+    np.testing.assert_array_equal(blocked.total_risk, sim.results.matrix("total").sum(axis=0, dtype=np.float64))
+    for key, values in reference.compute_total().items():
+        np.testing.assert_array_equal(blocked.compute_total()[key], values)
+    for key in ("mean_frequency", "mean_impact", "mean_expected_loss", "top_ids", "uncertainty"):
+        np.testing.assert_array_equal(blocked.compute_single(top_n=3)[key], reference.compute_single(top_n=3)[key])
+
+    for attribute in ("total", "frequency", "single_risk_impact"):
+        expected = TornadoAnalysis(sim).compute_variation(attribute)
+        for key, values in TornadoAnalysis(mapped, block_bytes=5000).compute_variation(attribute).items():
+            np.testing.assert_array_equal(values, expected[key])
+
+    expected = SingleRiskAnalysis(sim).compute_exceedance(3)
+    np.testing.assert_array_equal(SingleRiskAnalysis(mapped).compute_exceedance(3)["exceedance"], expected["exceedance"])
+    # released pages are read back from the file
+    np.testing.assert_array_equal(mapped.results.matrix("total"), sim.results.matrix("total"))
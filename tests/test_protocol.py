@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from QRALib.distributions import Beta, BufferedDistribution, Lognormal, PERT, Uniform
+from QRALib.simulation.matrix import MatrixMonteCarlo
+from QRALib.utils.importer import RiskDataImporter
+
+MODELS = [Lognormal(10.0, 900.0), Uniform(0.5, 2.0), Beta(2.0, 8.0), PERT(1.0, 5.0, 30.0)]
+
+
+class Triangular:
+    """Third-party distribution implementing the buffer protocol."""
+
+    def __init__(self, low: float, mode: float, high: float) -> None:
+        self.low, self.mode, self.high = low, mode, high
+
+    def draw(self, n=1, random_state=None):
+        return np.random.default_rng(random_state).triangular(self.low, self.mode, self.high, n)
+
+    def draw_ppf(self, percentile_sequences):
+        raise NotImplementedError
+
+    def draw_into(self, out, rng, trusted=False):
+        out[...] = rng.triangular(self.low, self.mode, self.high, out.shape)
+        return out
+
+    def ppf_into(self, u, out, trusted=False):
+        raise NotImplementedError
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda m: type(m).__name__)
+def test_buffer_protocol_matches_allocating_methods(model):
+    assert isinstance(model, BufferedDistribution)
+    out = np.empty(1000)
+    assert model.draw_into(out, np.random.default_rng(3)) is out
+    np.testing.assert_array_equal(out, model.draw(1000, random_state=np.random.default_rng(3)))
+    u = np.random.default_rng(1).random(1000)
+    np.testing.assert_allclose(model.ppf_into(u, np.empty(1000)), model.draw_ppf(u), rtol=1e-12)
+
+
+def test_untrusted_calls_are_validated():
+    model = Uniform(0.5, 2.0)
+    with pytest.raises(ValueError):
+        model.draw_into(np.empty(10, dtype=np.float32), np.random.default_rng())
+    with pytest.raises(ValueError):
+        model.draw_into(np.empty((10, 2))[:, 0], np.random.default_rng())
+    with pytest.raises(ValueError):
+        model.ppf_into(np.array([0.5, 1.0]), np.empty(2))
+    with pytest.raises(ValueError):
+        model.ppf_into(np.array([0.5, np.nan]), np.empty(2))
+    with pytest.raises(ValueError):
+        model.ppf_into(np.array([0.5]), np.empty(2))
+    # trusted calls skip the checks
+    assert model.ppf_into(np.array([1.0]), np.empty(1), trusted=True)[0] == model.loc + model.scale
+
+
+def test_register_third_party_distribution(tmp_path):
+    with pytest.raises(TypeError):
+        RiskDataImporter.register_distribution("Bad", type("Bad", (), {"draw": lambda self: None}))
+    with pytest.raises(ValueError):
+        RiskDataImporter.register_distribution("Beta", Triangular)
+    RiskDataImporter.register_distribution("Triangular", Triangular, ("low", "mode", "high"))
+    path = tmp_path / "risks.csv"
+    path.write_text(
+        "ID,name,frequency_distribution,frequency_parameter0,frequency_parameter1,frequency_parameter2,"
+        "impact_distribution,impact_parameter0,impact_parameter1,impact_parameter2\n"
+        "T0,tri,Triangular,0.1,0.5,2.0,Lognormal,10,900,0\n"
+    )
+    try:
+        risks = RiskDataImporter.import_risks(str(path))
+        assert isinstance(risks[0].frequency_model, Triangular)
+        assert risks[0].frequency_model.mode == 0.5
+        frequency = MatrixMonteCarlo(risks, seed=1).simulation(500)["results"][0]["frequency"]
+        assert 0.1 <= frequency.min() and frequency.max() <= 2.0
+    finally:
+        RiskDataImporter._DIST_REGISTRY.pop("Triangular")
+        RiskDataImporter._CSV_PARAMETERS.pop("Triangular")
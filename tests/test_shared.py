@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import gc
+
+import numpy as np
+
+from QRALib.risk.model import Risk
+from QRALib.distributions import Lognormal, Uniform
+from QRALib.simulation.shared import SharedResults, simulate_shared
+from QRALib.simulation.streams import PseudoRandomSampler
+
+
+def test_shared_arrays_outlive_segments():
+    results = SharedResults(2, 100)
+    total = results.arrays["total"]
+    total[:] = 3.0
+    results.allocate_impact([0, 0])
+    results.release()
+    del results
+    gc.collect()
+    assert total.sum() == 600.0
+    # a row keeps the segment mapped once the matrix is gone
+    row = total[1]
+    del total
+    gc.collect()
+    assert row.sum() == 300.0
+
+
+def test_simulate_shared_matches_in_process_sampling():
+    risks = [
+        Risk("R0", "a", "Uniform", Uniform(0.5, 2.0), "Lognormal", Lognormal(10.0, 90.0)),
+        Risk("R1", "b", "Uniform", Uniform(0.1, 0.3), "Lognormal", Lognormal(100.0, 900.0)),
+    ]
+    sampler = PseudoRandomSampler(11)
+    outcome = simulate_shared(sampler, risks, 1000, 0, n_jobs=2)
+    for risk, result in zip(risks, outcome):
+        frequency, occurances, impact, sr_impact = sampler.sample(risk, 1000)
+        np.testing.assert_array_equal(result["frequency"], frequency)
+        np.testing.assert_array_equal(result["occurances"], occurances)
+        np.testing.assert_array_equal(result["impact"], impact)
+        np.testing.assert_array_equal(result["single_risk_impact"], sr_impact)
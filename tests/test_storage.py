@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import mmap
+import os
+
+import numpy as np
+import pytest
+
+from QRALib.api import SimulationResults, analyze_mariq, simulate
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_save_and_memory_mapped_load(make_risks, tmp_path, dtype):
+    sim = simulate(make_risks(), iterations=700, seed=8, backend="serial", dtype=dtype)
+    sim.save(str(tmp_path / "run"))
+    loaded = SimulationResults.load(str(tmp_path / "run"))
+
+    assert loaded.summary == sim.summary
+    assert list(loaded.results) == ["R0", "R1"]
+    for field in ("frequency", "occurances", "impact", "single_risk_impact", "total"):
+        matrix = loaded.results.matrix(field)
+        assert isinstance(matrix.base, mmap.mmap) and not matrix.flags.writeable
+        assert matrix.dtype == sim.results.matrix(field).dtype
+        np.testing.assert_array_equal(matrix, sim.results.matrix(field))
+    np.testing.assert_array_equal(loaded.results["R1"]["impact"], sim.results["R1"]["impact"])
+
+    tolerance = ([0.0, 1e5], [100.0, 1.0])
+    np.testing.assert_array_equal(
+        analyze_mariq(loaded, tolerance)["single"]["mean_expected_loss"],
+        analyze_mariq(sim, tolerance)["single"]["mean_expected_loss"],
+    )
+
+
+def test_save_replaces_a_run_but_nothing_else(make_risks, tmp_path):
+    simulate(make_risks(), iterations=100, seed=1, backend="serial").save(str(tmp_path / "run"))
+    simulate(make_risks(), iterations=50, seed=1, backend="serial", detail="totals").save(str(tmp_path / "run"))
+    loaded = SimulationResults.load(str(tmp_path / "run"), mmap=False)
+    assert loaded.results.fields == ["total"]
+    assert loaded.results.matrix("total").shape == (2, 50)
+
+    (tmp_path / "other").mkdir()
+    with pytest.raises(FileExistsError):
+        loaded.save(str(tmp_path / "other"))
+
+
+def test_concurrent_saves_of_one_path(make_risks, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    runs = [simulate(make_risks(), iterations=200 + 10 * i, seed=i, backend="serial") for i in range(4)]
+    path = str(tmp_path / "run")
+    runs[0].save(path)
+
+    def save(i):
+        for _ in range(10):
+            runs[i % len(runs)].save(path)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(save, range(8)))
+
+    loaded = SimulationResults.load(path, mmap=False)
+    assert any(np.array_equal(loaded.results.matrix("total"), run.results.matrix("total")) for run in runs)
+    assert os.listdir(tmp_path) == ["run"]
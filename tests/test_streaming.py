@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from QRALib.risk.model import Risk
+from QRALib.distributions import Lognormal, Uniform
+from QRALib.simulation.matrix import MatrixMonteCarlo
+from QRALib.simulation.streaming import iter_blocks, stream_simulation
+
+
+def test_iter_blocks():
+    assert list(iter_blocks(10, 4)) == [(0, 4), (4, 8), (8, 10)]
+    with pytest.raises(ValueError):
+        list(iter_blocks(10, 0))
+
+
+def test_stream_simulation_blocks():
+    risks = [Risk("R0", "a", "Uniform", Uniform(0.1, 0.5), "Lognormal", Lognormal(10.0, 90.0))]
+    blocks = list(stream_simulation(MatrixMonteCarlo(risks), 2500, block_size=1000))
+    assert [b["summary"]["first_iteration"] for b in blocks] == [0, 1000, 2000]
+    assert [len(b["results"][0]["total"]) for b in blocks] == [1000, 1000, 500]
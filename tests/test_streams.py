@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from QRALib.simulation import streams
+from QRALib.simulation.matrix import MatrixMonteCarlo
+from QRALib.simulation.qmc import QuasiMonteCarlo
+from QRALib.simulation.rmc import RandomQuasiMonteCarlo
+from QRALib.simulation.smc import StandardMonteCarlo
+from QRALib.simulation.streaming import stream_simulation
+
+FIELDS = ["frequency", "occurances", "impact", "single_risk_impact", "total"]
+
+
+def test_iter_stream_blocks(monkeypatch):
+    monkeypatch.setattr(streams, "STREAM_BLOCK", 10)
+    assert list(streams.iter_stream_blocks(7, 15)) == [(0, 7, 10), (1, 0, 10), (2, 0, 2)]
+
+
+@pytest.mark.parametrize("engine", [StandardMonteCarlo, QuasiMonteCarlo, RandomQuasiMonteCarlo, MatrixMonteCarlo])
+def test_seeded_runs_are_chunk_invariant(make_risks, monkeypatch, engine):
+    monkeypatch.setattr(streams, "STREAM_BLOCK", 1000)
+    full = engine(make_risks(3), seed=42).simulation(2500)
+    blocks = list(stream_simulation(engine(make_risks(3), seed=42), 2500, block_size=700))
+    assert full["summary"]["seed"] == 42
+    for i, risk in enumerate(full["results"]):
+        for f in FIELDS:
+            chunked = np.concatenate([b["results"][i][f] for b in blocks])
+            np.testing.assert_array_equal(risk[f], chunked)
+
+
+@pytest.mark.parametrize("engine", [StandardMonteCarlo, MatrixMonteCarlo])
+def test_chunks_continue_the_kept_streams(make_risks, monkeypatch, engine):
+    monkeypatch.setattr(streams, "STREAM_BLOCK", 1024)
+    risks = make_risks(4)
+    resumed = []
+
+    def resume_stream(cursors, key, position):
+        drawn, state = original(cursors, key, position)
+        resumed.append((position, state is not None))
+        return drawn, state
+
+    original = streams.resume_stream
+    monkeypatch.setattr(streams, "resume_stream", resume_stream)
+    full = engine(risks, seed=4).simulation(2500)
+    resumed.clear()
+    blocks = list(stream_simulation(engine(risks, seed=4), 2500, block_size=300))
+    for i, risk in enumerate(full["results"]):
+        for f in FIELDS:
+            np.testing.assert_array_equal(risk[f], np.concatenate([b["results"][i][f] for b in blocks]))
+    # the chunks after the first of a block continue the streams of the previous one
+    assert any(position for position, _ in resumed)
+    assert all(kept for position, kept in resumed if position)
+
+
+@pytest.mark.parametrize("engine", [StandardMonteCarlo, MatrixMonteCarlo])
+def test_only_runs_with_a_next_chunk_keep_streams(make_risks, engine):
+    cursors = streams.StreamCursors()
+    engine(make_risks(3), seed=4).simulation(300, cursors=cursors)
+    assert len(cursors) > 0
+    cursors = streams.StreamCursors()
+    cursors.follows = False
+    engine(make_risks(3), seed=4).simulation(300, cursors=cursors)
+    assert len(cursors) == 0
+
+
+def test_streams_depend_on_risk_id_not_order(make_risks):
+    risks = make_risks(3)
+    forward = StandardMonteCarlo(risks, seed=7).simulation(500)["results"]
+    backward = StandardMonteCarlo(risks[::-1], seed=7).simulation(500)["results"]
+    np.testing.assert_array_equal(forward[0]["total"], backward[-1]["total"])
+    other = StandardMonteCarlo(risks, seed=8).simulation(500)["results"]
+    assert not np.array_equal(forward[0]["frequency"], other[0]["frequency"])
+
+
+@pytest.mark.parametrize("start", [0, 40000])
+def test_sobol_sampler_uses_one_portfolio_sequence(make_risks, start):
+    import torch
+    from scipy.stats import poisson
+    from torch.quasirandom import SobolEngine
+
+    risks = make_risks(3)
+    sampler = streams.SobolSampler(3, [r.uniq_id for r in risks], scramble=True)
+    engine = SobolEngine(3 * len(risks), scramble=True, seed=streams.torch_seed(3, "", streams.SEQUENCE))
+    engine.fast_forward(streams.SOBOL_SKIP + start)
+    points = engine.draw(300, dtype=torch.float64).numpy()
+    for row, risk in enumerate(risks):
+        frequency, occurances, _ = sampler.occurrences(risk, 300, start)
+        np.testing.assert_array_equal(frequency, risk.get_frequency_ppf(points[:, 3 * row], fast=True))
+        np.testing.assert_array_equal(occurances, poisson.ppf(points[:, 3 * row + 1], frequency))
+        np.testing.assert_array_equal(
+            sampler.single_risk_impact(risk, 300, start), risk.get_impact_ppf(points[:, 3 * row + 2], fast=True)
+        )
+    with pytest.raises(ValueError):
+        streams.SobolSampler(3, range(SobolEngine.MAXDIM))
+
+
+# peak memory of drawing one risk of a 600-risk portfolio, run in a fresh process
+_SOBOL_PEAK = """
+import resource
+from conftest import build_risks
+from QRALib.simulation import streams
+risks = build_risks(600)
+sampler = streams.SobolSampler(3, [r.uniq_id for r in risks])
+sampler.single_risk_impact(risks[0], 10)
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sampler.occurrences(risks[-1], 50000, start=1000)
+sampler.single_risk_impact(risks[-1], 50000, start=1000)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+"""
+
+
+def test_sobol_sampler_memory_does_not_grow_with_the_portfolio():
+    pytest.importorskip("resource")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run([sys.executable, "-c", _SOBOL_PEAK], cwd=os.path.dirname(__file__), env=env,
+                         capture_output=True, text=True, check=True)
+    growth = int(out.stdout) * (1 if sys.platform == "darwin" else 1024)
+    # the points of every risk over these iterations would take 51 000 * 1800 * 8 bytes, 734 MB
+    assert growth < 64 * 2 ** 20